@@ -4,6 +4,15 @@ import chromadb
 import time
 from datetime import datetime
 
+# Shared query-result cache (the app still works without src/ importable)
+try:
+    from src.query_cache import collection_version, get_query_cache
+except ImportError as e:
+    print(f"⚠️ Query cache disabled, src/ could not be imported: {e}")
+    get_query_cache = None
+
+VECTOR_STORE_PATH = "notebooks/vector_store_1768244751"
+
 # Page configuration
 st.set_page_config(
     page_title="Financial Complaints Analyzer",
@@ -206,7 +215,7 @@ st.markdown("""
 try:
     @st.cache_resource
     def get_collection():
-        client = chromadb.PersistentClient(path="notebooks/vector_store_1768244751")
+        client = chromadb.PersistentClient(path=VECTOR_STORE_PATH)
         return client.get_collection("financial_complaints")
     
     collection = get_collection()
@@ -252,11 +261,19 @@ try:
                     
                     # Actual search
                     start = time.time()
-                    results = collection.query(
+                    run_query = lambda: collection.query(
                         query_texts=[query],
                         n_results=5,
                         include=["documents", "metadatas", "distances"]
                     )
+                    if get_query_cache is not None:
+                        results = get_query_cache().get_or_compute(
+                            query, None, 5,
+                            collection_version(collection, VECTOR_STORE_PATH),
+                            run_query
+                        )
+                    else:
+                        results = run_query()
                     search_time = time.time() - start
                     
                     st.session_state.search_results = {
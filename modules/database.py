@@ -5,6 +5,8 @@ import chromadb
 import os
 from typing import Optional, List, Dict, Any
 from config import VECTOR_STORE_PATH, RAG_CONFIG
+from src.config import VECTOR_BACKEND
+from src.vector_index import FaissIndex, product_where_filter
 
 class VectorDatabase:
     """Manages connections to ChromaDB vector store"""
@@ -16,6 +18,15 @@ class VectorDatabase:
         
     def connect(self) -> bool:
         """Connect to vector store with fallback options"""
+        if VECTOR_BACKEND == "faiss":
+            try:
+                self.collection = FaissIndex.load()
+                self.connected = True
+                print(f"✅ Connected to FAISS index with {self.collection.count():,} vectors")
+                return True
+            except Exception as e:
+                print(f"⚠️ FAISS index unavailable, trying ChromaDB: {e}")
+        
         try:
             if not VECTOR_STORE_PATH.exists():
                 print(f"❌ Vector store not found at: {VECTOR_STORE_PATH}")
@@ -66,19 +77,23 @@ class VectorDatabase:
         
         return None
     
-    def query(self, query_text: str, product_filter: Optional[str] = None, n_results: int = 5) -> Optional[Dict]:
-        """Query the vector database"""
+    def query(self, query_text: str, product_filter: Optional[str] = None, n_results: int = 5,
+              query_embedding: Optional[List[float]] = None) -> Optional[Dict]:
+        """Query the vector database (by embedding when the caller already encoded it)"""
         if not self.collection:
             raise ConnectionError("Database not connected")
         
         try:
             where_filter = None
             if product_filter:
-                where_filter = {"product_category": product_filter}
+                where_filter = (product_where_filter(product_filter)
+                                or {"product_category": product_filter})
             
             print(f"🔍 Querying: '{query_text[:50]}...'")
+            query_args = ({"query_embeddings": [query_embedding]} if query_embedding is not None
+                          else {"query_texts": [query_text]})
             results = self.collection.query(
-                query_texts=[query_text],
+                **query_args,
                 n_results=n_results,
                 where=where_filter,
                 include=["documents", "metadatas", "distances"]
@@ -2,18 +2,21 @@
 RAG system for processing financial complaints queries
 """
 from typing import Dict, List, Optional, Set, Tuple
-from sentence_transformers import SentenceTransformer
 from .database import VectorDatabase
-from config import RAG_CONFIG
+from config import RAG_CONFIG, VECTOR_STORE_PATH
+from src.embeddings import get_embedder, embed_queries
+from src.metadata_store import normalize_record
+from src.query_cache import collection_version, get_query_cache
 
 class FinancialComplaintsRAG:
     """Main RAG system for analyzing financial complaints"""
     
     def __init__(self, verbose: bool = True):
         self.verbose = verbose
-        self.embedder = SentenceTransformer(RAG_CONFIG["embedding_model"])
+        self.embedder = get_embedder(RAG_CONFIG["embedding_model"])
         self.db = VectorDatabase()
         self.connected = self.db.connect()
+        self.result_cache = get_query_cache()
         
     def ask(self, question: str, product_filter: Optional[str] = None) -> Dict:
         """Process a user query"""
@@ -21,10 +24,15 @@ class FinancialComplaintsRAG:
             return self._no_data_response(question)
         
         try:
-            results = self.db.query(
-                query_text=question,
-                product_filter=product_filter,
-                n_results=RAG_CONFIG["search_results"]
+            results = self.result_cache.get_or_compute(
+                question, product_filter, RAG_CONFIG["search_results"],
+                collection_version(self.db.collection, str(VECTOR_STORE_PATH)),
+                lambda: self.db.query(
+                    query_text=question,
+                    product_filter=product_filter,
+                    n_results=RAG_CONFIG["search_results"],
+                    query_embedding=embed_queries(question, RAG_CONFIG["embedding_model"])[0]
+                )
             )
             
             return self._process_results(question, results)
@@ -73,13 +81,13 @@ class FinancialComplaintsRAG:
         companies = set()
         
         for meta in metadatas:
-            if meta:
-                if 'product_category' in meta and meta['product_category']:
-                    products.add(str(meta['product_category']))
-                if 'issue' in meta and meta['issue']:
-                    issues.add(str(meta['issue']))
-                if 'company' in meta and meta['company']:
-                    companies.add(str(meta['company']))
+            record = normalize_record(meta)
+            if 'product' in record:
+                products.add(record['product'])
+            if 'issue' in record:
+                issues.add(record['issue'])
+            if 'company' in record:
+                companies.add(record['company'])
         
         return products, issues, companies
     
@@ -104,12 +112,13 @@ class FinancialComplaintsRAG:
         """Prepare source information for display"""
         sources = []
         for i, (chunk, meta) in enumerate(zip(chunks, metadatas), 1):
+            record = normalize_record(meta)
             sources.append({
                 "id": i,
                 "text": chunk[:200] + "..." if len(chunk) > 200 else chunk,
-                "product": meta.get('product_category', 'Unknown') if meta else 'Unknown',
-                "issue": meta.get('issue', 'General') if meta else 'General',
-                "company": meta.get('company', 'Unknown') if meta else 'Unknown'
+                "product": record.get('product', 'Unknown'),
+                "issue": record.get('issue', 'General'),
+                "company": record.get('company', 'Unknown')
             })
         return sources
     
@@ -6,14 +6,17 @@ Complete implementation for retrieval and generation
 """
 
 import chromadb
-from sentence_transformers import SentenceTransformer
 import os
 
+# Share the process-wide embedder from src/ instead of loading another copy
+# (run from the repo root: python -m notebooks.task3_rag_pipeline)
+from src.embeddings import get_embedder, embed_queries
+
 class FinancialComplaintRAG:
     """RAG system for financial complaint analysis"""
 
     def __init__(self, vector_store_path="vector_store", collection_name="financial_complaints"):
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedder("all-MiniLM-L6-v2")
         self._init_vector_store(vector_store_path, collection_name)
 
     def _init_vector_store(self, path, collection_name):
@@ -29,7 +32,7 @@ class FinancialComplaintRAG:
     def retrieve(self, query, k=5):
         """Retrieve relevant complaint chunks"""
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=embed_queries([query], "all-MiniLM-L6-v2"),
             n_results=k,
             include=["documents", "metadatas", "distances"]
         )
@@ -6,6 +6,13 @@ Business Intelligence Pipeline
 __version__ = "1.0.0"
 __author__ = "CrediTrust Analytics Team"
 
-from .advanced_rag import AdvancedFinancialRAG
 from .config import *
-from .utils import load_sample_questions, analyze_response_quality
\ No newline at end of file
+
+
+def __getattr__(name):
+    # Loaded on first use, so `python -m src.<tool>` and `from src.x import ...`
+    # don't pull in the whole RAG stack
+    if name == "AdvancedFinancialRAG":
+        from .advanced_rag import AdvancedFinancialRAG
+        return AdvancedFinancialRAG
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,14 +2,18 @@
 Advanced RAG Pipeline - Main Business Intelligence Engine
 """
 import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import Dict, List, Optional
 from datetime import datetime
 
 # Import from local modules
 from .config import *
+from .centroid_classifier import get_classifier
+from .embeddings import get_embedder, embed_queries
+from .fusion import fuse_bucket_results, fuse_query_results
+from .metadata_store import resolve_fields
+from .query_cache import collection_version, get_query_cache
 from .query_enhancer import QueryEnhancer
-from .vector_store import get_chroma_collection
+from .vector_index import get_vector_index, product_where_filter, query_buckets, query_complaints
 
 class AdvancedFinancialRAG:
     """Professional RAG System for Business Intelligence"""
@@ -24,9 +28,11 @@ class AdvancedFinancialRAG:
             print("🚀 Initializing Advanced Financial RAG...")
         
         # Core components
-        self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+        self.embedder = get_embedder()
         self.query_enhancer = QueryEnhancer()
-        self.collection = get_chroma_collection()
+        self.classifier = get_classifier()
+        self.collection = get_vector_index()
+        self.result_cache = get_query_cache()
         
         # Analytics
         self.analytics = {
@@ -44,7 +50,11 @@ class AdvancedFinancialRAG:
     
     def analyze_query(self, question: str) -> Dict:
         """Analyze business query"""
-        return self.query_enhancer.analyze_query(question)
+        analysis = self.query_enhancer.analyze_query(question)
+        if self.classifier is not None:
+            # Cached query vector, reused by retrieval for the original question
+            self.classifier.refine(analysis, embed_queries([question])[0], product_name=str.title)
+        return analysis
     
     def retrieve_complaints(self, question: str, analysis: Dict, 
                           k: int = RETRIEVAL_K, 
@@ -52,33 +62,39 @@ class AdvancedFinancialRAG:
         """Intelligent complaint retrieval"""
         
         # Prepare filter
-        where_filter = None
-        if product_filter and product_filter in PRODUCT_CATEGORIES:
-            where_filter = {
-                "$or": [
-                    {"product_category": {"$in": PRODUCT_CATEGORIES[product_filter]}},
-                    {"product": {"$in": PRODUCT_CATEGORIES[product_filter]}}
-                ]
-            }
+        where_filter = product_where_filter(product_filter)
+        
+        # Serve repeated questions from the shared result cache
+        cache_key = self.result_cache.make_key(question, product_filter, k,
+                                               collection_version(self.collection))
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Enhanced queries
-        enhanced = self.query_enhancer.enhance_query(question, analysis)
-        
-        # Execute search
-        results = self.collection.query(
-            query_texts=enhanced[:2],
-            n_results=k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"]
-        )
+        enhanced = self.query_enhancer.enhance_query(question, analysis)[:RETRIEVAL_QUERY_VARIANTS]
+        rows = list(range(len(enhanced)))
         
-        return {
-            "chunks": results['documents'][0] if results['documents'] else [],
-            "metadata": results['metadatas'][0] if results['metadatas'] else [],
-            "distances": results['distances'][0] if results['distances'] else [],
-            "count": len(results['documents'][0]) if results['documents'] else 0,
-            "query_analysis": analysis
-        }
+        # Trend questions: top-k per month instead of top-k overall
+        buckets = None
+        if analysis["business_context"].get("trending"):
+            buckets, bucket_results = query_buckets(self.collection, embed_queries(enhanced), k,
+                                                    where=where_filter)
+        
+        if buckets:
+            fused = fuse_bucket_results(buckets, bucket_results, rows, limit=k)
+        else:
+            # Execute search (shared model; Chroma never loads its own encoder)
+            results = query_complaints(self.collection, embed_queries(enhanced), k,
+                                       where=where_filter)
+            
+            # Merge every variant's hits instead of keeping only the first list
+            fused = fuse_query_results(results, rows, limit=k)
+        fused["fields"] = resolve_fields(fused["metadata"], fused.pop("row_ids", None),
+                                         getattr(self.collection, "metadata_store", None))
+        fused.update({"count": len(fused["chunks"]), "query_analysis": analysis})
+        self.result_cache.put(cache_key, fused)
+        return fused
     
     def calculate_confidence(self, retrieved_data: Dict) -> Dict:
         """Calculate confidence score"""
@@ -109,6 +125,8 @@ class AdvancedFinancialRAG:
         
         # Step 1: Analyze query
         query_analysis = self.analyze_query(question)
+        if product_filter is None and CENTROID_AUTO_FILTER:
+            product_filter = query_analysis.get("suggested_filter")
         
         # Step 2: Retrieve complaints
         retrieved = self.retrieve_complaints(
@@ -122,6 +140,7 @@ class AdvancedFinancialRAG:
         insights = self._generate_insights(question, retrieved, confidence)
         
         # Prepare response
+        fields = self._fields(retrieved)
         response = {
             "question": question,
             "query_analysis": query_analysis,
@@ -129,10 +148,8 @@ class AdvancedFinancialRAG:
             "confidence_metrics": confidence,
             "retrieval_stats": {
                 "total_complaints": retrieved["count"],
-                "products_covered": len(set(self._extract_product(m) 
-                                         for m in retrieved["metadata"])),
-                "issues_identified": len(set(self._extract_issue(m) 
-                                          for m in retrieved["metadata"]))
+                "products_covered": len(set(fields["product"])),
+                "issues_identified": len(set(fields["issue"]))
             }
         }
         
@@ -145,8 +162,8 @@ class AdvancedFinancialRAG:
             return {"executive_summary": "No relevant complaints found."}
         
         # Simple insight generation
-        products = [self._extract_product(m) for m in retrieved["metadata"]]
-        issues = [self._extract_issue(m) for m in retrieved["metadata"]]
+        fields = self._fields(retrieved)
+        products, issues = fields["product"], fields["issue"]
         
         top_product = max(set(products), key=products.count) if products else "Unknown"
         top_issue = max(set(issues), key=issues.count) if issues else "General"
@@ -166,23 +183,11 @@ class AdvancedFinancialRAG:
             ]
         }
     
-    def _extract_product(self, meta: Dict) -> str:
-        """Extract product from metadata"""
-        if not meta:
-            return "Unknown"
-        for field in ['product_category', 'product', 'Product']:
-            if field in meta and meta[field]:
-                return str(meta[field])
-        return "Unknown"
-    
-    def _extract_issue(self, meta: Dict) -> str:
-        """Extract issue from metadata"""
-        if not meta:
-            return "General"
-        for field in ['issue', 'Issue', 'sub_issue']:
-            if field in meta and meta[field]:
-                return str(meta[field])
-        return "General"
+    def _fields(self, retrieved: Dict) -> Dict[str, List[str]]:
+        """Normalized product/issue columns for the retrieved chunks"""
+        if "fields" not in retrieved:
+            retrieved["fields"] = resolve_fields(retrieved["metadata"])
+        return retrieved["fields"]
     
     def get_performance_report(self) -> Dict:
         """Get performance report"""
@@ -197,6 +202,7 @@ class AdvancedFinancialRAG:
                 "avg_complaints_per_query": 3.5,  # Simplified
                 "system_uptime": "Active"
             },
+            "result_cache": self.result_cache.report(),
             "recommendations": [
                 "System performing optimally" if success_rate > 70 else "Monitor query success",
                 "Ready for production deployment"
@@ -0,0 +1,234 @@
+"""
+Corpus-wide complaint counts by product x issue x month x state x company
+
+Insight generators only see the top-k retrieved chunks; this cube holds
+exact counts over every indexed complaint, so findings from the sample
+can be set against the whole corpus. Ingest keeps it current through the
+ingest manifest: each added or replaced complaint removes its old cell
+and adds its new one. A roll-up over any subset of dimensions is grouped
+once, then answered with dict lookups until the cube changes.
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import AGGREGATES_FILE, VECTOR_STORE_DIR, COLLECTION_NAME
+from .metadata_store import FIELD_DEFAULTS, normalize_product, normalize_record
+
+DIMENSIONS = ("product", "issue", "month", "state", "company")
+# Taken from chunk metadata as is; month is derived from date_received
+RECORD_DIMENSIONS = ("product", "issue", "state", "company")
+
+_stores: Dict[str, Tuple[float, "AggregateStore"]] = {}
+_lock = threading.Lock()
+
+
+def month_of(dates: pd.Series) -> pd.Series:
+    """'YYYY-MM' from 'YYYY-MM-DD' strings, 'Unknown' where there is no date"""
+    months = dates.astype("string").str.slice(0, 7)
+    return months.where(months.str.fullmatch(r"\d{4}-\d{2}"), "Unknown").fillna("Unknown")
+
+
+def record_dimensions(meta: Dict) -> Dict[str, str]:
+    """Normalized cube fields of one chunk's metadata, missing ones defaulted"""
+    record = normalize_record(meta)
+    return {field: record.get(field, FIELD_DEFAULTS.get(field, "Unknown"))
+            for field in RECORD_DIMENSIONS}
+
+
+class AggregateStore:
+    """
+    Complaint counts per (product, issue, month, state, company) cell,
+    saved as a parquet file with one row per non-empty cell.
+    """
+
+    def __init__(self, path: Optional[str] = None, load: bool = True):
+        self.path = path
+        self.cells: Dict[Tuple[str, ...], int] = {}
+        if load and path and os.path.exists(path):
+            cube = pd.read_parquet(path)
+            keys = zip(*(cube[dimension].tolist() for dimension in DIMENSIONS))
+            self.cells = dict(zip(keys, cube["count"].tolist()))
+        self._rollups: Dict[Tuple, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    @property
+    def total(self) -> int:
+        return self.count()
+
+    def apply(self, added: Optional[pd.DataFrame] = None,
+              removed: Optional[pd.DataFrame] = None):
+        """
+        Count each complaint row of added and uncount each row of removed
+        (columns date_received + RECORD_DIMENSIONS). Rows without recorded
+        dimensions were never counted and are ignored.
+        """
+        for frame, sign in ((removed, -1), (added, 1)):
+            if frame is None or not len(frame) or not set(RECORD_DIMENSIONS) <= set(frame.columns):
+                continue
+            frame = frame.dropna(subset=list(RECORD_DIMENSIONS))
+            keys = frame[list(RECORD_DIMENSIONS)].assign(month=month_of(frame["date_received"]))
+            for key, n in keys[list(DIMENSIONS)].value_counts(sort=False).items():
+                count = self.cells.get(key, 0) + sign * int(n)
+                if count > 0:
+                    self.cells[key] = count
+                else:
+                    self.cells.pop(key, None)
+        self._rollups = {}
+
+    def frame(self) -> pd.DataFrame:
+        """The cube as a DataFrame: one row per non-empty cell"""
+        cube = pd.DataFrame(list(self.cells), columns=list(DIMENSIONS), dtype=str)
+        cube["count"] = pd.Series(list(self.cells.values()), dtype="int64")
+        return cube
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        self.frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _rollup(self, by: Tuple[str, ...], group: Optional[str] = None) -> Dict:
+        """
+        Counts keyed by value tuples of the `by` dimensions; with group, a
+        {value: count} dict of that dimension per key instead
+        """
+        key = (by, group)
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            cube = self.frame()
+            if not by and group is None:
+                rollup = {(): int(cube["count"].sum())}
+            elif group is None:
+                rollup = {k if isinstance(k, tuple) else (k,): int(n)
+                          for k, n in cube.groupby(list(by))["count"].sum().items()}
+            else:
+                rollup = {}
+                for k, n in cube.groupby(list(by) + [group])["count"].sum().items():
+                    k = k if isinstance(k, tuple) else (k,)
+                    rollup.setdefault(k[:-1], {})[k[-1]] = int(n)
+            self._rollups[key] = rollup
+        return rollup
+
+    @staticmethod
+    def _scope(filters: Dict[str, str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Filter dimensions in cube order, and their (normalized) values"""
+        unknown = set(filters) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown aggregate dimensions: {sorted(unknown)}")
+        by = tuple(d for d in DIMENSIONS if filters.get(d) is not None)
+        values = tuple(normalize_product(str(filters[d])) if d == "product" else str(filters[d])
+                       for d in by)
+        return by, values
+
+    def count(self, **filters) -> int:
+        """Complaints matching dimension=value filters, e.g. count(product="Mortgage")"""
+        by, values = self._scope(filters)
+        return self._rollup(by).get(values, 0)
+
+    def breakdown(self, dimension: str, top: Optional[int] = None,
+                  **filters) -> List[Tuple[str, int]]:
+        """
+        (value, count) of one dimension within the filters, largest first;
+        months come back in date order without 'Unknown'
+        """
+        by, values = self._scope(filters)
+        counts = self._rollup(by, dimension).get(values, {})
+        if dimension == "month":
+            items = sorted((m, n) for m, n in counts.items() if m != "Unknown")
+            return items[-top:] if top else items
+        items = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return items[:top] if top else items
+
+    def report(self) -> Dict:
+        return {"complaints": self.total, "cells": len(self.cells),
+                "products": len(self.breakdown("product")),
+                "issues": len(self.breakdown("issue")),
+                "months": len(self.breakdown("month"))}
+
+
+def _corpus_complaints(collection, page_size: int) -> Iterator[pd.DataFrame]:
+    """One row per complaint (date_received + RECORD_DIMENSIONS), FAISS store or Chroma pages"""
+    store = getattr(collection, "metadata_store", None)
+    if store is not None:
+        codes = store.complaint_codes()
+        chunk_index = store.table.column("chunk_index").to_numpy(zero_copy_only=False)
+        first = pd.Series(codes).drop_duplicates().index.to_numpy()
+        # Chunks without a complaint ID are counted once, through their first chunk
+        first = first[codes[first] >= 0]
+        loose = ((codes < 0) & ~(pd.Series(chunk_index).fillna(0).to_numpy() > 0)).nonzero()[0]
+        rows = sorted(first.tolist() + loose.tolist())
+        for start in range(0, len(rows), page_size):
+            block = store.lookup(rows[start:start + page_size],
+                                 ("date_received",) + RECORD_DIMENSIONS)
+            yield pd.DataFrame(block)
+        return
+
+    seen = set()
+    total, offset = collection.count(), 0
+    while offset < total:
+        page = collection.get(include=["metadatas"], limit=min(page_size, total - offset),
+                              offset=offset)
+        if not len(page["ids"]):
+            break
+        offset += len(page["ids"])
+        rows = []
+        for chunk_id, meta in zip(page["ids"], page["metadatas"]):
+            record = normalize_record(meta)
+            complaint_id = record.get("complaint_id")
+            if complaint_id is None and int(record.get("chunk_index") or 0) > 0:
+                continue
+            complaint_id = complaint_id or chunk_id
+            if complaint_id in seen:
+                continue
+            seen.add(complaint_id)
+            rows.append({"date_received": record.get("date_received"), **record_dimensions(meta)})
+        if rows:
+            yield pd.DataFrame(rows)
+
+
+def build_aggregates(collection, path: str, page_size: int = 50000,
+                     verbose: bool = True) -> AggregateStore:
+    """Count every complaint in an existing index from scratch and save the cube"""
+    store = AggregateStore()
+    for frame in _corpus_complaints(collection, page_size):
+        store.apply(frame)
+        if verbose:
+            print(f"   ✅ Counted {store.total:,} complaints")
+    store.save(path)
+    if verbose:
+        print(f"💾 Saved aggregates: {path} ({len(store):,} cells)")
+    return store
+
+
+def aggregates_path(vector_store_dir: str = VECTOR_STORE_DIR,
+                    collection_name: str = COLLECTION_NAME) -> str:
+    return os.path.join(vector_store_dir, AGGREGATES_FILE.format(collection=collection_name))
+
+
+def get_aggregates(path: str) -> Optional[AggregateStore]:
+    """
+    Shared cube for path, reloaded when ingest has rewritten the file;
+    None until ingest or python -m src.aggregate_store has built one
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _lock:
+        cached = _stores.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _stores[path] = (mtime, AggregateStore(path))
+        return cached[1]
+
+
+if __name__ == "__main__":
+    from .vector_index import get_vector_index
+
+    index = get_vector_index()
+    build_aggregates(index, aggregates_path(collection_name=getattr(index, "name", COLLECTION_NAME)))
@@ -0,0 +1,96 @@
+"""
+Metadata bitmap index for pre-filtered vector search
+
+One NumPy bool bitmap per (field, value), built lazily from the
+MetadataStore's category codes. A where clause is evaluated to a row mask
+before the ANN search, so filtered queries only rank rows that pass.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pyarrow.compute as pc
+
+from .metadata_store import MetadataStore
+
+# Fields with bitmaps; date_month ("YYYY-MM") is derived from date_received
+BITMAP_FIELDS = ["product", "issue", "state", "company", "date_month"]
+
+
+class BitmapIndex:
+    """Row masks over a MetadataStore for the where syntax the RAG classes use"""
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+        self._bitmaps: Dict[Tuple[str, str], np.ndarray] = {}
+        self._lookup: Dict[str, Dict[str, int]] = {}
+        self._month_codes: Optional[np.ndarray] = None
+        self._months: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _codes(self, field: str) -> np.ndarray:
+        if field != "date_month":
+            return self.store.codes(field)
+        if self._month_codes is None:
+            dates = self.store.table.column("date_received").combine_chunks()
+            months = pc.utf8_slice_codeunits(dates, 0, 7).dictionary_encode()
+            self._month_codes = months.indices.fill_null(-1).to_numpy().astype(np.int32)
+            self._months = np.array(months.dictionary.to_pylist(), dtype=object)
+        return self._month_codes
+
+    def _code(self, field: str, value) -> int:
+        """Category code for a value, -1 when no row has it"""
+        if field not in self._lookup:
+            self._codes(field)
+            values = self._months if field == "date_month" else self.store.categories(field)
+            self._lookup[field] = {v: code for code, v in enumerate(values)}
+        return self._lookup[field].get(value, -1)
+
+    def bitmap(self, field: str, value) -> np.ndarray:
+        """Rows whose field equals value"""
+        key = (field, value)
+        if key not in self._bitmaps:
+            code = self._code(field, value)
+            self._bitmaps[key] = (self._codes(field) == code if code >= 0
+                                  else np.zeros(len(self.store), dtype=bool))
+        return self._bitmaps[key]
+
+    def _any_of(self, field: str, values) -> np.ndarray:
+        mask = np.zeros(len(self.store), dtype=bool)
+        for value in values:
+            mask |= self.bitmap(field, value)
+        return mask
+
+    def mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Bool row mask for a canonical where clause (see canonical_where), or
+        None when it touches a field without bitmaps
+        """
+        result = np.ones(len(self.store), dtype=bool)
+        if not where:
+            return result
+        for field, condition in where.items():
+            if field in ("$or", "$and"):
+                masks = [self.mask(clause) for clause in condition]
+                if any(m is None for m in masks):
+                    return None
+                combine = np.logical_or if field == "$or" else np.logical_and
+                result &= combine.reduce(masks) if masks else (field == "$and")
+                continue
+            if field not in BITMAP_FIELDS:
+                return None
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, operand in condition.items():
+                if op == "$eq":
+                    result &= self.bitmap(field, operand)
+                elif op == "$ne":
+                    result &= ~self.bitmap(field, operand)
+                elif op == "$in":
+                    result &= self._any_of(field, operand)
+                elif op == "$nin":
+                    result &= ~self._any_of(field, operand)
+                else:
+                    return None
+        return result
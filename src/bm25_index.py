@@ -0,0 +1,258 @@
+"""
+BM25 keyword index over complaint chunks
+
+Postings are stored in CSR form as flat .npy arrays (term offsets, doc
+rows, term frequencies) and memory-mapped at query time, so a lookup reads
+only the postings of the query terms and scores them with NumPy. Chunk
+text and metadata live in a MetadataStore aligned with the doc rows.
+"""
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    VECTOR_STORE_DIR, COLLECTION_NAME, BM25_INDEX_DIR, BM25_K1, BM25_B
+)
+from .bitmap_index import BitmapIndex
+from .metadata_store import MetadataStore, MetadataWriter, canonical_where
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function words that carry no signal in complaint narratives
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be been before being but by can
+could did do does doing for from had has have having he her him his how i if in into
+is it its me my no not of on or our out she so than that the their them then there
+these they this those to too us was we were what when where which who why will with
+would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms, minus stopwords and XXXX redactions"""
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower())
+            if t not in STOPWORDS and t.strip("x")]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks:
+
+    - indptr.npy    int64, postings of term t are [indptr[t], indptr[t+1])
+    - docs.npy      int32 doc row per posting, ascending within a term
+    - tfs.npy       uint16 term frequency per posting
+    - doc_len.npy   int32 terms per doc
+    - vocab.json    term list (term id = position), k1, b
+    - metadata.arrow
+    """
+
+    def __init__(self, vocab: List[str], indptr: np.ndarray, docs: np.ndarray,
+                 tfs: np.ndarray, doc_len: np.ndarray, store: MetadataStore,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        self.indptr = indptr
+        self.docs = docs
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.store = store
+        self.k1 = k1
+        self.b = b
+        self.avg_len = float(doc_len.mean()) if len(doc_len) else 0.0
+        self._bitmaps: Optional[BitmapIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    @property
+    def bitmaps(self) -> BitmapIndex:
+        if self._bitmaps is None:
+            self._bitmaps = BitmapIndex(self.store)
+        return self._bitmaps
+
+    @classmethod
+    def load(cls, index_dir: str = BM25_INDEX_DIR) -> "BM25Index":
+        with open(os.path.join(index_dir, "vocab.json"), "r") as f:
+            vocab = json.load(f)
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+                  for name in ("indptr", "docs", "tfs", "doc_len")}
+        return cls(vocab["terms"], store=MetadataStore.open(os.path.join(index_dir, "metadata.arrow")),
+                   k1=vocab["k1"], b=vocab["b"], **arrays)
+
+    @classmethod
+    def build(cls, records: List[Dict], k1: float = BM25_K1, b: float = BM25_B) -> "BM25Index":
+        """Index chunk records (metadata plus 'chunk_text'); company names are indexed too"""
+        postings = _PostingsBuilder()
+        postings.add(records)
+        return postings.finish(MetadataStore.from_records(records), k1=k1, b=b)
+
+    def save(self, index_dir: str = BM25_INDEX_DIR, metadata: bool = True):
+        """Write the index files; metadata=False when metadata.arrow is already there"""
+        os.makedirs(index_dir, exist_ok=True)
+        for name in ("indptr", "docs", "tfs", "doc_len"):
+            np.save(os.path.join(index_dir, f"{name}.npy"), getattr(self, name))
+        terms = sorted(self.term_ids, key=self.term_ids.get)
+        with open(os.path.join(index_dir, "vocab.json"), "w") as f:
+            json.dump({"terms": terms, "k1": self.k1, "b": self.b}, f)
+        if metadata:
+            self.store.write(os.path.join(index_dir, "metadata.arrow"))
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (rows, scores) of the docs matching at least one query term, rows
+        ascending; only those docs are scored, not the whole corpus
+        """
+        total = len(self)
+        rows, weights = [], []
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = np.asarray(self.docs[start:end])
+            tfs = np.asarray(self.tfs[start:end], dtype=np.float32)
+            df = end - start
+            idf = np.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[docs] / self.avg_len)
+            rows.append(docs)
+            weights.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+        if not rows:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        touched, slots = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(slots, weights=np.concatenate(weights), minlength=len(touched))
+        return touched, scores.astype(np.float32)
+
+    def query(self, query_texts: List[str], n_results: int = 10,
+              where: Optional[Dict] = None) -> Dict:
+        """
+        Chroma-shaped results (ids, documents, metadatas, scores) per query
+        text; distances are None since BM25 scores are not distances
+        """
+        mask = self.bitmaps.mask(canonical_where(where)) if where else None
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "scores": []}
+        for text in query_texts:
+            rows, scores = self.scores(text)
+            keep = scores > 0
+            if mask is not None:
+                keep &= mask[rows]
+            rows, scores = rows[keep], scores[keep]
+            order = np.argsort(-scores, kind="stable")[:n_results]
+            top, scores = rows[order], scores[order]
+            metas = self.store.rows(top)
+            results["ids"].append([str(m.get("chunk_id", r)) for r, m in zip(top, metas)])
+            results["documents"].append([m.get("chunk_text", "") for m in metas])
+            results["metadatas"].append(metas)
+            results["distances"].append([None] * len(top))
+            results["scores"].append([float(s) for s in scores])
+        return results
+
+
+class _PostingsBuilder:
+    """
+    CSR postings built in two passes: add() tokenizes a page of records
+    into compact term-id / tf arrays, finish() counts each term's postings
+    and fills preallocated arrays at their final offsets, page by page
+    """
+
+    def __init__(self):
+        self.term_ids: Dict[str, int] = {}
+        # (term ids, tfs, distinct terms per doc) of each page, in row order
+        self.pages: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.doc_lens: List[np.ndarray] = []
+
+    def add(self, records: List[Dict]):
+        terms, tfs = [], []
+        doc_terms = np.zeros(len(records), dtype=np.int32)
+        doc_len = np.zeros(len(records), dtype=np.int32)
+        for row, record in enumerate(records):
+            tokens = tokenize(f"{record.get('chunk_text') or ''} {record.get('company') or ''}")
+            doc_len[row] = len(tokens)
+            counts = Counter(tokens)
+            doc_terms[row] = len(counts)
+            for term, tf in counts.items():
+                terms.append(self.term_ids.setdefault(term, len(self.term_ids)))
+                tfs.append(min(tf, np.iinfo(np.uint16).max))
+        self.pages.append((np.asarray(terms, dtype=np.int32),
+                           np.asarray(tfs, dtype=np.uint16), doc_terms))
+        self.doc_lens.append(doc_len)
+
+    def finish(self, store: MetadataStore, k1: float = BM25_K1, b: float = BM25_B) -> BM25Index:
+        n_terms = len(self.term_ids)
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        for terms, _, _ in self.pages:
+            indptr[1:] += np.bincount(terms, minlength=n_terms)
+        np.cumsum(indptr, out=indptr)
+        docs = np.empty(indptr[-1], dtype=np.int32)
+        tfs = np.empty(indptr[-1], dtype=np.uint16)
+
+        cursor = indptr[:-1].copy()
+        first_row = 0
+        self.pages.reverse()
+        while self.pages:
+            terms, page_tfs, doc_terms = self.pages.pop()
+            rows = np.repeat(np.arange(first_row, first_row + len(doc_terms), dtype=np.int32),
+                             doc_terms)
+            order = np.argsort(terms, kind="stable")  # docs stay ascending within a term
+            terms = terms[order]
+            unique, starts, counts = np.unique(terms, return_index=True, return_counts=True)
+            slots = np.repeat(cursor[unique] - starts, counts) + np.arange(len(terms))
+            docs[slots] = rows[order]
+            tfs[slots] = page_tfs[order]
+            cursor[unique] += counts
+            first_row += len(doc_terms)
+
+        doc_len = (np.concatenate(self.doc_lens) if self.doc_lens
+                   else np.zeros(0, dtype=np.int32))
+        self.doc_lens = []
+        return BM25Index(list(self.term_ids), indptr, docs, tfs, doc_len, store, k1=k1, b=b)
+
+
+def build_bm25_index(collection, index_dir: str = BM25_INDEX_DIR,
+                     page_size: int = 10000, verbose: bool = True) -> BM25Index:
+    """
+    Index every chunk of a Chroma collection (its cleaned narrative text),
+    one page at a time: metadata is streamed to disk and only the compact
+    postings of the pages read so far are kept
+    """
+    total = collection.count()
+    metadata_path = os.path.join(index_dir, "metadata.arrow")
+    postings = _PostingsBuilder()
+    read = 0
+    with MetadataWriter(metadata_path) as writer:
+        while read < total:
+            page = collection.get(include=["documents", "metadatas"],
+                                  limit=min(page_size, total - read), offset=read)
+            if not page["ids"]:
+                break
+            records = [{**(meta or {}), "chunk_id": chunk_id, "chunk_text": doc}
+                       for chunk_id, doc, meta in zip(page["ids"], page["documents"],
+                                                      page["metadatas"])]
+            postings.add(records)
+            writer.write(records)
+            read += len(records)
+            if verbose:
+                print(f"   ✅ Read {read:,}/{total:,} chunks")
+
+    index = postings.finish(MetadataStore.open(metadata_path))
+    index.save(index_dir, metadata=False)
+    if verbose:
+        print(f"💾 Saved BM25 index: {index_dir} ({len(index):,} chunks, "
+              f"{len(index.term_ids):,} terms, {len(index.docs):,} postings)")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .vector_store import get_chroma_collection
+
+    parser = argparse.ArgumentParser(description="Build the BM25 keyword index from a Chroma collection")
+    parser.add_argument("--vector-store", default=VECTOR_STORE_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--index-dir", default=BM25_INDEX_DIR)
+    args = parser.parse_args()
+
+    build_bm25_index(get_chroma_collection(args.vector_store, args.collection), args.index_dir)
@@ -0,0 +1,215 @@
+"""
+Nearest-centroid product and intent classifier over query embeddings
+
+Product centroids are the mean chunk embedding of each product category in
+the indexed corpus; intent centroids are the mean embedding of a few
+example questions per intent (INTENT_EXAMPLES). Both sets are centered on
+their own mean so the shared "financial complaint" direction does not
+dominate. A question is classified from the vector retrieval computes for
+it anyway, so routing costs no extra model call.
+"""
+import os
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    EMBEDDING_MODEL, PRODUCT_CATEGORIES, INTENT_EXAMPLES, CENTROIDS_PATH,
+    CENTROID_MIN_SCORE, CENTROID_MARGIN
+)
+from .metadata_store import normalize_record
+
+# Stored product spelling of each PRODUCT_CATEGORIES entry ("Credit card", ...)
+PRODUCT_LABELS = [variations[0] for variations in PRODUCT_CATEGORIES.values()]
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class CentroidSet:
+    """Unit centroids for one label set, centered on their mean"""
+
+    def __init__(self, labels: Sequence[str], centroids: np.ndarray):
+        self.labels = list(labels)
+        self.center = centroids.mean(axis=0) if len(self.labels) else np.zeros(centroids.shape[1])
+        self.centroids = _unit(centroids - self.center).astype(np.float32)
+
+    @classmethod
+    def from_sums(cls, labels: Sequence[str], sums: np.ndarray, counts: np.ndarray) -> "CentroidSet":
+        """Drop labels that never occurred; the rest become mean vectors"""
+        keep = counts > 0
+        return cls([label for label, k in zip(labels, keep) if k],
+                   _unit(sums[keep] / counts[keep, None]))
+
+    @classmethod
+    def restore(cls, labels: Sequence[str], center: np.ndarray, centroids: np.ndarray) -> "CentroidSet":
+        """Rebuild from saved arrays (already centered and normalized)"""
+        group = cls.__new__(cls)
+        group.labels, group.center, group.centroids = list(labels), center, centroids
+        return group
+
+    def scores(self, vector: np.ndarray) -> List[Tuple[str, float]]:
+        """(label, centered cosine) for every label, best first"""
+        sims = self.centroids @ _unit(np.asarray(vector, dtype=np.float32) - self.center)
+        return [(self.labels[i], round(float(sims[i]), 4)) for i in np.argsort(-sims)]
+
+
+class CentroidClassifier:
+    """Product and intent routing from a query embedding"""
+
+    def __init__(self, products: CentroidSet, intents: Optional[CentroidSet] = None,
+                 model_name: str = EMBEDDING_MODEL,
+                 min_score: float = CENTROID_MIN_SCORE, margin: float = CENTROID_MARGIN):
+        self.products = products
+        self.intents = intents
+        self.model_name = model_name
+        self.min_score = min_score
+        self.margin = margin
+
+    @property
+    def dim(self) -> int:
+        return self.products.centroids.shape[1]
+
+    @classmethod
+    def load(cls, path: str = CENTROIDS_PATH, **kwargs) -> "CentroidClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            def group(name: str) -> Optional[CentroidSet]:
+                if f"{name}_labels" not in data:
+                    return None
+                return CentroidSet.restore(data[f"{name}_labels"].tolist(),
+                                           data[f"{name}_center"], data[f"{name}_centroids"])
+
+            return cls(group("product"), group("intent"), model_name=str(data["model"]), **kwargs)
+
+    def save(self, path: str = CENTROIDS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {"model": np.array(self.model_name)}
+        for name, group in (("product", self.products), ("intent", self.intents)):
+            if group is not None:
+                arrays[f"{name}_labels"] = np.array(group.labels)
+                arrays[f"{name}_center"] = group.center
+                arrays[f"{name}_centroids"] = group.centroids
+        np.savez(path, **arrays)
+
+    def _confident(self, scores: List[Tuple[str, float]]) -> Optional[str]:
+        """Top label if it clears the score floor and leads the runner-up by the margin"""
+        if not scores or scores[0][1] < self.min_score:
+            return None
+        if len(scores) > 1 and scores[0][1] - scores[1][1] < self.margin:
+            return None
+        return scores[0][0]
+
+    def classify(self, vector: Sequence[float]) -> Dict:
+        """Ranked product and intent scores plus the confident picks (or None)"""
+        products = self.products.scores(vector)
+        intents = self.intents.scores(vector) if self.intents is not None else []
+        return {"product": self._confident(products), "intent": self._confident(intents),
+                "product_scores": products, "intent_scores": intents}
+
+    def refine(self, analysis: Dict, vector: Sequence[float], product_name=None) -> Dict:
+        """
+        Fill what keyword analysis missed: a product when none was named,
+        an intent when only the default was found. A confident product is
+        also offered as 'suggested_filter' unless the question names a
+        different one. product_name maps the stored
+        spelling onto the analyzer's own (e.g. str.title).
+        """
+        if len(vector) != self.dim:
+            return analysis  # built for another embedding model
+        result = self.classify(vector)
+        analysis["classifier"] = {"products": result["product_scores"][:3],
+                                  "intents": result["intent_scores"][:2]}
+        product, intent = result["product"], result["intent"]
+        named = [p.lower() for p in analysis.get("products") or []]
+        if product and (not named or product.lower() in named):
+            # Never suggest a filter that contradicts a product the question names
+            analysis["suggested_filter"] = product
+            if not named:
+                analysis["products"] = [product_name(product) if product_name else product]
+                if analysis.get("query_type") == "general_analysis":
+                    analysis["query_type"] = "product_analysis"
+        if intent and analysis.get("business_intent", "insight_generation") == "insight_generation":
+            analysis["business_intent"] = intent
+        return analysis
+
+
+def _corpus_blocks(collection, page_size: int) -> Iterator[Tuple[np.ndarray, List[str]]]:
+    """(embeddings, product labels) pages from a FAISS index or a Chroma collection"""
+    store = getattr(collection, "metadata_store", None)
+    vectors = getattr(collection, "vectors", None)
+    if store is not None and vectors is not None:
+        codes = store.codes("product")
+        names = np.append(store.categories("product"), "")
+        for start in range(0, len(vectors), page_size):
+            block = codes[start:start + page_size]
+            yield (np.asarray(vectors[start:start + page_size], dtype=np.float32),
+                   names[np.where(block < 0, len(names) - 1, block)].tolist())
+        return
+
+    total, offset = collection.count(), 0
+    while offset < total:
+        page = collection.get(include=["embeddings", "metadatas"],
+                              limit=min(page_size, total - offset), offset=offset)
+        if not len(page["ids"]):
+            break
+        offset += len(page["ids"])
+        yield (np.asarray(page["embeddings"], dtype=np.float32),
+               [normalize_record(meta).get("product", "") for meta in page["metadatas"]])
+
+
+def build_centroids(collection, embedder=None, path: str = CENTROIDS_PATH,
+                    model_name: str = EMBEDDING_MODEL, page_size: int = 10000,
+                    verbose: bool = True) -> CentroidClassifier:
+    """
+    Product centroids from every indexed chunk, intent centroids from
+    INTENT_EXAMPLES (skipped without an embedder), saved to path
+    """
+    label_ids = {label: i for i, label in enumerate(PRODUCT_LABELS)}
+    sums, counts = None, np.zeros(len(PRODUCT_LABELS), dtype=np.int64)
+    seen = 0
+    for vectors, products in _corpus_blocks(collection, page_size):
+        if sums is None:
+            sums = np.zeros((len(PRODUCT_LABELS), vectors.shape[1]), dtype=np.float64)
+        codes = np.array([label_ids.get(p, -1) for p in products], dtype=np.int64)
+        onehot = (codes[:, None] == np.arange(len(PRODUCT_LABELS))).astype(np.float32)
+        sums += onehot.T @ _unit(vectors)
+        counts += onehot.sum(axis=0).astype(np.int64)
+        seen += len(vectors)
+        if verbose:
+            print(f"   ✅ Averaged {seen:,} chunks")
+    if sums is None or not counts.any():
+        raise ValueError("No indexed chunks carry a known product category")
+    products = CentroidSet.from_sums(PRODUCT_LABELS, sums, counts)
+
+    intents = None
+    if embedder is not None:
+        labels = list(INTENT_EXAMPLES)
+        examples = [text for label in labels for text in INTENT_EXAMPLES[label]]
+        vectors = _unit(np.asarray(embedder.encode(examples, show_progress_bar=False),
+                                   dtype=np.float32))
+        owners = np.repeat(np.arange(len(labels)), [len(INTENT_EXAMPLES[l]) for l in labels])
+        intents = CentroidSet(labels, _unit(np.stack([vectors[owners == i].mean(axis=0)
+                                                      for i in range(len(labels))])))
+
+    classifier = CentroidClassifier(products, intents, model_name=model_name)
+    classifier.save(path)
+    if verbose:
+        print(f"💾 Saved centroids: {path} ({len(products.labels)} products, "
+              f"{len(intents.labels) if intents else 0} intents)")
+    return classifier
+
+
+def get_classifier(path: str = CENTROIDS_PATH) -> Optional[CentroidClassifier]:
+    """Saved classifier, or None until python -m src.centroid_classifier has built one"""
+    if not os.path.exists(path):
+        return None
+    return CentroidClassifier.load(path)
+
+
+if __name__ == "__main__":
+    from .embeddings import get_embedder
+    from .vector_index import get_vector_index
+
+    build_centroids(get_vector_index(), get_embedder())
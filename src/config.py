@@ -4,24 +4,133 @@ Configuration settings for the RAG system
 
 # Embedding model
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = "embedding_cache"  # written by ingest; set to None to always re-encode
+QUERY_READS_EMBEDDING_CACHE = False      # queries also look vectors up there (read-only) before encoding
+QUERY_EMBEDDING_CACHE_SIZE = 4096        # in-memory LRU of query vectors
+QUERY_EMBEDDING_SPILL_DIR = None         # set to a directory to keep encoded / evicted query vectors on disk
 
 # Retrieval settings
 RETRIEVAL_K = 5
 MIN_CONFIDENCE_SCORE = 30
+RETRIEVAL_QUERY_VARIANTS = 2  # enhanced queries sent per question, merged with RRF
+RRF_K = 60                    # reciprocal rank fusion damping constant
+
+# Query-result cache
+QUERY_CACHE_SIZE = 1024       # cached result sets (LRU beyond this)
+QUERY_CACHE_TTL = 900         # seconds before a cached result is re-fetched
+
+# Semantic answer cache: paraphrased questions reuse an earlier answer
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_SIZE = 2048      # cached answers across all filters
+ANSWER_CACHE_TTL = 900        # seconds an answer may be served
+ANSWER_CACHE_THRESHOLD = 0.92 # cosine similarity between question embeddings
 
 # Vector store settings
 VECTOR_STORE_DIR = "vector_store"
 COLLECTION_NAME = "complaint_embeddings"
+VECTOR_BACKEND = "chroma"  # "chroma" or "faiss"
+FAISS_INDEX_PATH = "vector_store/faiss_complaints.idx"  # IVF-PQ only; flat mode searches the vectors file
+FAISS_METADATA_PATH = "vector_store/faiss_metadata.arrow"  # memory-mapped Arrow IPC
+FAISS_LEGACY_METADATA_PATH = "vector_store/faiss_metadata.pkl"  # written by the chunking notebook
+FAISS_FILTER_OVERFETCH = 10  # candidates per requested hit when a filter is set
+FAISS_VECTORS_PATH = "vector_store/faiss_vectors.npy"  # normalized float32 rows, memory-mapped
+FAISS_INDEX_MODE = "flat"     # "flat" (exact) or "ivfpq" (compressed, for the full corpus)
+FAISS_NLIST = 4096            # IVF partitions
+FAISS_PQ_M = 48               # PQ sub-quantizers (48 bytes per vector at 8 bits)
+FAISS_TRAIN_SAMPLE = 150000   # vectors sampled to train IVF-PQ
+FAISS_NPROBE = 32             # partitions scanned per query
+FAISS_RERANK_CANDIDATES = 200 # PQ shortlist re-scored exactly from the float matrix
+FAISS_PREFILTER_EXACT_ROWS = 50000  # filters selecting fewer rows are scored exactly
+FAISS_COMPLAINTS_PATH = "vector_store/faiss_chunk_complaints.npy"  # row -> complaint index
+
+# Complaint-level retrieval: k results mean k distinct complaints
+COMPLAINT_SCORING = "max"     # "max" (best chunk) or "sum" (all matching chunks)
+COMPLAINT_OVERFETCH = 3       # chunk hits fetched per requested complaint
+COMPLAINT_FETCH_LIMIT = 1000  # widest chunk fetch when filling k complaints
+
+# Ingest settings
+SOURCE_PARQUET = "data/processed/complaint_metadata_full.parquet"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+INGEST_READ_ROWS = 5000      # rows pulled from a parquet row group at a time
+INGEST_BATCH_SIZE = 512      # chunks per encode + collection.add call
+INGEST_WORKERS = 1           # embedding processes; >1 starts a worker pool
+INGEST_CHECKPOINT = "ingest_checkpoint_{collection}.json"  # kept inside VECTOR_STORE_DIR
+INGEST_MANIFEST = "ingest_manifest_{collection}.parquet"    # kept inside VECTOR_STORE_DIR
+COLLECTION_VERSION_FILE = "collection_version_{collection}.txt"  # bumped by ingest
+AGGREGATES_FILE = "aggregates_{collection}.parquet"  # corpus-wide counts, kept inside VECTOR_STORE_DIR
+TEXT_CLEAN_WORKERS = 8        # threads cleaning narrative slices (Arrow releases the GIL)
+TEXT_CLEAN_CHUNK_ROWS = 20000 # narratives per cleaning slice
+
+# BM25 keyword index (HybridRetriever)
+BM25_INDEX_DIR = "vector_store/bm25"
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Cross-encoder reranking (off by default; adds one model call per question)
+RERANK_ENABLED = False
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_CANDIDATES = 20        # first-stage hits scored by the cross-encoder
+RERANK_TIMEOUT = 1.5          # seconds per question before falling back to first-stage order
+RERANK_BATCH_SIZE = 32
+
+# Centroid classifier: product / intent routing from the query embedding
+CENTROIDS_PATH = "vector_store/centroids.npz"  # python -m src.centroid_classifier builds it
+CENTROID_MIN_SCORE = 0.15     # centered cosine the best label must reach
+CENTROID_MARGIN = 0.05        # lead over the runner-up before a label is trusted
+CENTROID_AUTO_FILTER = False  # apply a confident product as the filter when none is given
+
+# Trend retrieval: top-k per time bucket
+TREND_BUCKET = "month"        # "week", "month", "quarter" or "year"
+TREND_BUCKETS = 6             # buckets ending at the newest complaint when no date range is given
+TREND_OVERFETCH = 10          # hits fetched per bucket slot on backends without a date index
 
 # Business intelligence settings
 BUSINESS_CONTEXTS = {
     "urgent": ["urgent", "critical", "emergency", "immediate"],
-    "trending": ["trend", "pattern", "increase", "decrease", "over time"],
+    "trending": ["trend", "pattern", "increase", "decrease", "over time", "emerging"],
     "comparative": ["compare", "vs", "versus", "difference", "better", "worse"],
     "root_cause": ["why", "reason", "cause", "root", "source"],
     "volume": ["many", "often", "frequent", "common", "typical"]
 }
 
+# Business intent keywords, first matching intent wins (else "insight_generation")
+BUSINESS_INTENTS = {
+    "monitor_performance": ["trend", "pattern", "increase", "decrease"],
+    "competitive_analysis": ["compare", "vs", "versus", "difference"],
+    "root_cause_analysis": ["why", "reason", "cause", "root"],
+    "process_improvement": ["improve", "better", "fix", "solve"]
+}
+
+# Example questions averaged into the intent centroids
+INTENT_EXAMPLES = {
+    "monitor_performance": [
+        "How have complaint volumes changed over the last few months?",
+        "Are late fee complaints going up or down?",
+        "What issues are emerging this quarter?",
+    ],
+    "competitive_analysis": [
+        "How do credit card complaints compare with personal loan complaints?",
+        "Which company gets more billing disputes?",
+        "What is different about savings account and checking account issues?",
+    ],
+    "root_cause_analysis": [
+        "Why are customers unhappy with money transfers?",
+        "What is causing the failed payments?",
+        "What is behind the rise in fraud reports?",
+    ],
+    "process_improvement": [
+        "How can we reduce complaints about customer service?",
+        "What should we change to resolve disputes faster?",
+        "Which processes need fixing to stop duplicate charges?",
+    ],
+    "insight_generation": [
+        "What do customers complain about most?",
+        "Summarize the main problems with mortgages",
+        "What are the common issues with card fees?",
+    ],
+}
+
 # Product categories mapping
 PRODUCT_CATEGORIES = {
     "credit card": ["Credit card", "credit card", "Credit Card", "Credit-card"],
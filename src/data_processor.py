@@ -3,9 +3,10 @@ Clean, focused data processor for Task 1 EDA
 """
 import pandas as pd
 import numpy as np
-import re
 from pathlib import Path
 
+from .text_processor import clean_texts, clean_query
+
 class ComplaintDataProcessor:
     """Simple but effective data processor"""
     
@@ -36,9 +37,9 @@ class ComplaintDataProcessor:
         print(f"📊 Filtered to {len(filtered):,} relevant complaints")
         
         # Clean text
-        filtered['Cleaned_Narrative'] = filtered['Consumer complaint narrative'].apply(
-            ComplaintDataProcessor.clean_text
-        )
+        filtered['Cleaned_Narrative'] = clean_texts(
+            filtered['Consumer complaint narrative']
+        ).to_pandas().set_axis(filtered.index)
         
         # Remove empty narratives
         filtered = filtered[filtered['Cleaned_Narrative'].str.len() > 10]
@@ -48,16 +49,10 @@ class ComplaintDataProcessor:
     
     @staticmethod
     def clean_text(text: str) -> str:
-        """Clean complaint text"""
+        """Clean complaint text (same rules as ingest and query cleaning)"""
         if pd.isna(text):
             return ""
-        
-        # Basic cleaning
-        text = text.lower()
-        text = re.sub(r'[^\w\s.,!?]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
+        return clean_query(text)
     
     @staticmethod
     def generate_report(df: pd.DataFrame, output_dir: str = "reports"):
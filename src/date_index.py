@@ -0,0 +1,76 @@
+"""
+Sorted date index over chunk rows, for date-range and time-bucketed retrieval
+
+Rows are kept ordered by 'date_received', so the rows in any date range are
+one searchsorted() slice instead of a scan of the metadata.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metadata_store import MetadataStore
+
+BUCKET_FREQ = {"week": "W", "month": "M", "quarter": "Q", "year": "Y"}
+
+
+def _iso(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def time_buckets(start: str, end: str, bucket: str = "month") -> List[Tuple[str, str, str]]:
+    """(label, first day, last day) for each bucket overlapping [start, end], in date order"""
+    if bucket not in BUCKET_FREQ:
+        raise ValueError(f"bucket must be one of {sorted(BUCKET_FREQ)}, got {bucket!r}")
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    return [
+        (str(period), _iso(max(period.start_time, start)), _iso(min(period.end_time, end)))
+        for period in pd.period_range(start, end, freq=BUCKET_FREQ[bucket])
+    ]
+
+
+def trailing_range(latest: str, bucket: str = "month", n_buckets: int = 6) -> Tuple[str, str]:
+    """Date range covering the n_buckets buckets that end at `latest`"""
+    period = pd.Period(pd.Timestamp(latest), freq=BUCKET_FREQ[bucket])
+    return _iso((period - (n_buckets - 1)).start_time), _iso(latest)
+
+
+def in_bucket(date: Optional[str], start: str, end: str) -> bool:
+    """ISO dates compare as strings; anything with a time part is cut to the day"""
+    return bool(date) and start <= str(date)[:10] <= end
+
+
+class DateIndex:
+    """Row IDs sorted by date received; rows without a parseable date are left out"""
+
+    def __init__(self, dates: Sequence[Optional[str]]):
+        # "mixed": otherwise the first date's format is applied to all, and any
+        # row with a time part (or without one, if the first has it) is dropped
+        days = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce",
+                              format="mixed").values.astype("datetime64[D]")
+        rows = np.flatnonzero(~np.isnat(days))
+        order = np.argsort(days[rows], kind="stable")
+        self.row_ids = rows[order]
+        self.dates = days[rows][order]
+        self.size = len(dates)
+
+    @classmethod
+    def from_store(cls, store: MetadataStore) -> "DateIndex":
+        return cls(store.table.column("date_received").to_numpy(zero_copy_only=False))
+
+    def bounds(self) -> Optional[Tuple[str, str]]:
+        """Earliest and latest date received, or None for an undated corpus"""
+        if not len(self.dates):
+            return None
+        return str(self.dates[0]), str(self.dates[-1])
+
+    def rows_between(self, start: str, end: str) -> np.ndarray:
+        """Rows received in [start, end], sorted by row ID"""
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        return np.sort(self.row_ids[lo:hi])
+
+    def mask_between(self, start: str, end: str) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.rows_between(start, end)] = True
+        return mask
@@ -0,0 +1,291 @@
+"""
+Persistent embedding cache keyed by (model name, normalized-text hash)
+
+Ingest writes it through CachedEmbedder. Serving processes can read it
+through EmbeddingCacheReader, which bisects a sorted, memory-mapped key
+index instead of loading every key at startup.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from filelock import FileLock
+
+from .config import EMBEDDING_MODEL, EMBEDDING_CACHE_DIR
+
+KEY_BYTES = 16
+# sorted_index.npy: every committed key in byte order with its row
+SORTED_INDEX_DTYPE = np.dtype([("key", f"S{KEY_BYTES}"), ("row", "<i8")])
+
+
+def normalize_text(text: str) -> str:
+    """The model is uncased, so case and whitespace never change a vector"""
+    return " ".join(str(text).split()).lower()
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"),
+                           digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk cache, one directory per model:
+
+    - vectors.f32  float32 rows, read through np.memmap
+    - keys.bin     16-byte text hashes, one per row
+    - index.json   model name, dimension and committed row count
+    - sorted_index.npy  keys in byte order with their rows, for readers
+      (rewritten by write_sorted_index, so it may trail the other files)
+
+    index.json is only advanced after the data files are written, so a
+    crash mid-append just leaves unreferenced bytes at the end.
+    """
+
+    def __init__(self, cache_dir: str = EMBEDDING_CACHE_DIR,
+                 model_name: str = EMBEDDING_MODEL):
+        self.model_name = model_name
+        self.dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        os.makedirs(self.dir, exist_ok=True)
+
+        self._index_path = os.path.join(self.dir, "index.json")
+        self._keys_path = os.path.join(self.dir, "keys.bin")
+        self._vectors_path = os.path.join(self.dir, "vectors.f32")
+        self._sorted_path = os.path.join(self.dir, "sorted_index.npy")
+        self._lock = FileLock(os.path.join(self.dir, ".lock"))
+
+        self.dim = None
+        self.count = 0
+        self._rows: Dict[bytes, int] = {}
+        self._vectors = None
+        self.stats = {"hits": 0, "misses": 0}
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _read_index(self) -> Dict:
+        if not os.path.exists(self._index_path):
+            return {"model": self.model_name, "dim": None, "count": 0}
+        with open(self._index_path, "r") as f:
+            index = json.load(f)
+        if index.get("model") != self.model_name:
+            raise ValueError(f"Cache at {self.dir} belongs to model {index.get('model')}")
+        return index
+
+    def _refresh(self):
+        """Pick up rows appended since we last looked (possibly by another process)"""
+        index = self._read_index()
+        new_count = index["count"]
+        if new_count == self.count and self._vectors is not None:
+            return
+
+        self.dim = index["dim"]
+        if new_count > self.count:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self.count * KEY_BYTES)
+                raw = f.read((new_count - self.count) * KEY_BYTES)
+            # Sliced from the raw bytes: NumPy's S scalars drop trailing NULs
+            for row, start in enumerate(range(0, len(raw), KEY_BYTES), start=self.count):
+                self._rows[raw[start:start + KEY_BYTES]] = row
+        self.count = new_count
+        self._vectors = (np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                   shape=(self.count, self.dim))
+                         if self.count else None)
+
+    def lookup(self, texts: List[str]) -> List[Optional[int]]:
+        """Cache row for each text, or None when it has not been embedded"""
+        self._refresh()
+        return [self._rows.get(text_key(t)) for t in texts]
+
+    def get(self, rows: List[int]) -> np.ndarray:
+        return np.asarray(self._vectors[rows])
+
+    def put(self, texts: List[str], vectors: np.ndarray):
+        """Append embeddings for texts that are not cached yet"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            keys, keep, seen = [], [], set()
+            for i, text in enumerate(texts):
+                key = text_key(text)
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                    keep.append(i)
+            if not keep:
+                return
+
+            with open(self._vectors_path, "ab") as f:
+                f.seek(self.count * self.dim * 4)
+                f.truncate()
+                f.write(vectors[keep].tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.seek(self.count * KEY_BYTES)
+                f.truncate()
+                f.write(b"".join(keys))
+
+            tmp_path = self._index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"model": self.model_name, "dim": self.dim,
+                           "count": self.count + len(keep)}, f)
+            os.replace(tmp_path, self._index_path)
+            self._refresh()
+
+
+    def write_sorted_index(self):
+        """Sort every committed key for EmbeddingCacheReader (no-op when already current)"""
+        with self._lock:
+            self._refresh()
+            if not self.count:
+                return
+            if os.path.exists(self._sorted_path):
+                if len(np.load(self._sorted_path, mmap_mode="r")) == self.count:
+                    return
+            keys = np.fromfile(self._keys_path, dtype=f"S{KEY_BYTES}", count=self.count)
+            order = np.argsort(keys, kind="stable")
+            table = np.empty(self.count, dtype=SORTED_INDEX_DTYPE)
+            table["key"] = keys[order]
+            table["row"] = order
+            tmp_path = self._sorted_path + ".tmp.npy"
+            np.save(tmp_path, table)
+            os.replace(tmp_path, self._sorted_path)
+
+
+class EmbeddingCacheReader:
+    """
+    Read-only view of an EmbeddingCache for query serving. Keys are found by
+    binary search in the memory-mapped sorted_index.npy, so opening reads
+    no keys; rows committed after that index was written are searched in a
+    small sorted tail read from keys.bin. A missing cache is just empty.
+    """
+
+    def __init__(self, cache_dir: str = EMBEDDING_CACHE_DIR,
+                 model_name: str = EMBEDDING_MODEL):
+        self.model_name = model_name
+        self.dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        self._index_path = os.path.join(self.dir, "index.json")
+        self._keys_path = os.path.join(self.dir, "keys.bin")
+        self._vectors_path = os.path.join(self.dir, "vectors.f32")
+        self._sorted_path = os.path.join(self.dir, "sorted_index.npy")
+
+        self.dim = None
+        self.count = 0
+        self._mtime = None
+        self._tables: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._vectors = None
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self.count
+
+    def _refresh(self):
+        """Reopen the files when ingest has committed more rows"""
+        try:
+            mtime = os.path.getmtime(self._index_path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with open(self._index_path, "r") as f:
+            index = json.load(f)
+        if index.get("model") != self.model_name:
+            raise ValueError(f"Cache at {self.dir} belongs to model {index.get('model')}")
+        count, dim = index["count"], index["dim"]
+
+        tables = []
+        covered = 0
+        if os.path.exists(self._sorted_path):
+            table = np.load(self._sorted_path, mmap_mode="r")
+            if len(table) <= count:
+                tables.append((table["key"], table["row"]))
+                covered = len(table)
+        if count > covered:
+            tail = np.fromfile(self._keys_path, dtype=f"S{KEY_BYTES}", count=count - covered,
+                               offset=covered * KEY_BYTES)
+            order = np.argsort(tail, kind="stable")
+            tables.append((tail[order], order + covered))
+
+        self._tables = tables
+        self._vectors = (np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                   shape=(count, dim)) if count else None)
+        self.count, self.dim, self._mtime = count, dim, mtime
+
+    def lookup(self, texts: List[str]) -> List[Optional[int]]:
+        """Cache row for each text, or None when ingest has not embedded it"""
+        self._refresh()
+        rows: List[Optional[int]] = [None] * len(texts)
+        if not texts or not self.count:
+            return rows
+        keys = np.array([text_key(t) for t in texts], dtype=f"S{KEY_BYTES}")
+        for table_keys, table_rows in self._tables:
+            if not len(table_keys):
+                continue
+            positions = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)
+            for i in np.flatnonzero(table_keys[positions] == keys):
+                rows[i] = int(table_rows[positions[i]])
+        return rows
+
+    def get(self, rows: List[int]) -> np.ndarray:
+        return np.asarray(self._vectors[rows])
+
+
+class CachedEmbedder:
+    """
+    Wraps a SentenceTransformer (or EmbeddingWorkerPool) so encode() only
+    runs the model on texts missing from the cache.
+    """
+
+    def __init__(self, embedder, cache: EmbeddingCache):
+        self.embedder = embedder
+        self.cache = cache
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return self.embedder.encode(texts, batch_size=batch_size,
+                                        show_progress_bar=show_progress_bar, **kwargs)
+
+        rows = self.cache.lookup(texts)
+        missing = [i for i, row in enumerate(rows) if row is None]
+        self.cache.stats["hits"] += len(texts) - len(missing)
+        self.cache.stats["misses"] += len(missing)
+
+        if missing:
+            # Encode each distinct missing text once
+            first = {}
+            for i in missing:
+                first.setdefault(normalize_text(texts[i]), i)
+            unique = list(first.values())
+            fresh = np.asarray(self.embedder.encode(
+                [texts[i] for i in unique], batch_size=batch_size,
+                show_progress_bar=show_progress_bar, **kwargs
+            ), dtype=np.float32)
+            self.cache.put([texts[i] for i in unique], fresh)
+            position = {i: n for n, i in enumerate(unique)}
+            out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+            out[missing] = fresh[[position[first[normalize_text(texts[i])]] for i in missing]]
+        else:
+            out = np.empty((len(texts), self.cache.dim), dtype=np.float32)
+
+        hits = [i for i, row in enumerate(rows) if row is not None]
+        if hits:
+            out[hits] = self.cache.get([rows[i] for i in hits])
+
+        return out[0] if single else out
+
+    def close(self):
+        self.cache.write_sorted_index()
+        if hasattr(self.embedder, "close"):
+            self.embedder.close()
+
+    def __getattr__(self, name):
+        if name in ("embedder", "cache"):
+            raise AttributeError(name)
+        return getattr(self.embedder, name)
@@ -0,0 +1,69 @@
+"""
+Multi-process embedding for ingest on CPU-only boxes
+"""
+import multiprocessing as mp
+import os
+from typing import List
+
+import numpy as np
+
+from .config import EMBEDDING_MODEL, INGEST_BATCH_SIZE, INGEST_WORKERS
+
+# Model held by each worker process
+_worker_model = None
+
+
+def _init_worker(model_name: str, num_threads: int):
+    """Load one model per worker and pin its torch thread count"""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(num_threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(texts, batch_size=len(texts),
+                                show_progress_bar=False,
+                                convert_to_numpy=True).astype(np.float32)
+
+
+class EmbeddingWorkerPool:
+    """
+    Fans encode calls out to N worker processes, each holding its own copy of
+    the model. Batches are returned in submission order, so the pool is a
+    drop-in replacement for SentenceTransformer.encode in the ingest path.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL,
+                 workers: int = INGEST_WORKERS,
+                 batch_size: int = INGEST_BATCH_SIZE):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+
+        # Split the cores between workers so they do not oversubscribe
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        context = mp.get_context("spawn")
+        self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(model_name, threads))
+
+    def encode(self, texts: List[str], batch_size: int = None,
+               show_progress_bar: bool = False) -> np.ndarray:
+        """Encode texts across the pool; rows come back in input order"""
+        batch_size = batch_size or self.batch_size
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(list(self._pool.imap(_encode_batch, batches)))
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
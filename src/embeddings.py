@@ -0,0 +1,158 @@
+"""
+Process-wide embedding model registry
+
+Every RAG entry point shares one SentenceTransformer per model name and
+hands embed_queries() output to Chroma as query_embeddings, so Chroma
+never loads an encoder of its own. Query vectors sit in an in-memory LRU
+in front of the model, optionally spilling to disk
+(QUERY_EMBEDDING_SPILL_DIR). Ingest writes the persistent embedding cache
+(see ingest._create_embedder); with QUERY_READS_EMBEDDING_CACHE set, LRU
+misses are also looked up there, read-only, before the model runs.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from .config import (
+    EMBEDDING_MODEL, EMBEDDING_CACHE_DIR, QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_SPILL_DIR,
+    QUERY_READS_EMBEDDING_CACHE
+)
+from .embedding_cache import EmbeddingCache, EmbeddingCacheReader, normalize_text
+from .text_processor import clean_texts
+
+_embedders: Dict[str, object] = {}
+_query_caches: Dict[str, "QueryEmbeddingLRU"] = {}
+_lock = threading.Lock()
+
+
+class QueryEmbeddingLRU:
+    """
+    Bounded map of normalized query text to its vector. Repeated questions
+    and the enhancer's fixed-prefix variants skip the forward pass. Misses
+    are looked up on disk first when caches are given: the spill (written
+    here, so evicted vectors stay reachable) and then, read-only, the ingest
+    embedding cache.
+    """
+
+    def __init__(self, max_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+                 corpus_cache: Optional[EmbeddingCacheReader] = None,
+                 spill: Optional[EmbeddingCache] = None):
+        self.max_entries = max_entries
+        self.corpus_cache = corpus_cache
+        self.spill = spill
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def encode(self, queries: List[str], embedder) -> np.ndarray:
+        """
+        Vectors for queries, running embedder only on the ones not cached.
+        Queries are cleaned with the corpus rules first, so the key is the
+        cleaned text and the model sees what the narratives went through.
+        """
+        queries = clean_texts(queries).to_pylist() if queries else []
+        keys = [normalize_text(q) for q in queries]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                    found[key] = vector
+            hits = sum(key in found for key in keys)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(keys) - hits
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if not missing:
+            return np.stack([found[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+
+        loaded = self._read_disk(missing)
+        to_encode = [key for key in missing if key not in loaded]
+        if to_encode:
+            # Encode the cleaned query behind each key (the first, if several clean the same)
+            cleaned = {}
+            for query, key in zip(queries, keys):
+                cleaned.setdefault(key, query)
+            fresh = np.asarray(embedder.encode([cleaned[key] for key in to_encode],
+                                               show_progress_bar=False), dtype=np.float32)
+            loaded.update(zip(to_encode, fresh))
+        evicted = []
+        with self._lock:
+            self.stats["disk_hits"] += len(missing) - len(to_encode)
+            for key in missing:
+                found[key] = self._vectors[key] = loaded[key]
+            while len(self._vectors) > self.max_entries:
+                evicted.append(self._vectors.popitem(last=False))
+        self._spill([(key, loaded[key]) for key in to_encode] + evicted)
+
+        return np.stack([found[key] for key in keys])
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Vectors for keys the spill or the ingest embedding cache already holds"""
+        loaded: Dict[str, np.ndarray] = {}
+        for cache in (self.spill, self.corpus_cache):
+            pending = [key for key in keys if key not in loaded]
+            if cache is None or not pending:
+                continue
+            hits = [(key, row) for key, row in zip(pending, cache.lookup(pending)) if row is not None]
+            if hits:
+                vectors = cache.get([row for _, row in hits])
+                loaded.update((key, vector) for (key, _), vector in zip(hits, vectors))
+        return loaded
+
+    def _spill(self, entries: List):
+        """Append encoded and evicted vectors to the spill (it skips keys it holds)"""
+        if self.spill is None or not entries:
+            return
+        self.spill.put([key for key, _ in entries], np.stack([vector for _, vector in entries]))
+
+
+def get_query_embedding_cache(model_name: str = EMBEDDING_MODEL) -> QueryEmbeddingLRU:
+    """Query-vector LRU for a model, shared across the process"""
+    with _lock:
+        if model_name not in _query_caches:
+            corpus_cache = (EmbeddingCacheReader(EMBEDDING_CACHE_DIR, model_name)
+                            if QUERY_READS_EMBEDDING_CACHE and EMBEDDING_CACHE_DIR else None)
+            spill = (EmbeddingCache(QUERY_EMBEDDING_SPILL_DIR, model_name)
+                     if QUERY_EMBEDDING_SPILL_DIR else None)
+            _query_caches[model_name] = QueryEmbeddingLRU(corpus_cache=corpus_cache, spill=spill)
+        return _query_caches[model_name]
+
+
+def get_embedder(model_name: str = EMBEDDING_MODEL):
+    """Load the model on first use and hand the same instance to every caller"""
+    embedder = _embedders.get(model_name)
+    if embedder is not None:
+        return embedder
+
+    with _lock:
+        if model_name not in _embedders:
+            from sentence_transformers import SentenceTransformer
+
+            _embedders[model_name] = SentenceTransformer(model_name)
+        return _embedders[model_name]
+
+
+def embed_queries(queries: Union[str, List[str]],
+                  model_name: str = EMBEDDING_MODEL) -> List[List[float]]:
+    """Encode queries into the list-of-lists form collection.query expects"""
+    if isinstance(queries, str):
+        queries = [queries]
+    cache = get_query_embedding_cache(model_name)
+    return cache.encode(list(queries), get_embedder(model_name)).tolist()
+
+
+def clear_embedders():
+    """Drop loaded models (tests and notebooks that switch models)"""
+    with _lock:
+        for embedder in _embedders.values():
+            if hasattr(embedder, "close"):
+                embedder.close()
+        _embedders.clear()
+        _query_caches.clear()
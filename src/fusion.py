@@ -0,0 +1,80 @@
+"""
+Reciprocal rank fusion over per-query Chroma result lists
+"""
+from typing import Dict, List, Optional
+
+from .config import RRF_K
+
+
+def result_key(meta: Optional[Dict], document: str) -> str:
+    """Complaint a hit belongs to, so chunks of one complaint count once"""
+    if meta:
+        for field in ("complaint_id", "Complaint ID", "complaint_ID"):
+            value = meta.get(field)
+            if value not in (None, ""):
+                return str(value)
+    return document[:150]
+
+
+def fuse_query_results(results: Dict, rows: List[int], limit: int,
+                       rrf_k: int = RRF_K) -> Dict[str, List]:
+    """
+    Merge result rows from one collection.query call with reciprocal rank
+    fusion (score = sum of 1 / (rrf_k + rank) over the lists a complaint
+    appears in). Each complaint keeps its closest chunk; 'row_ids' is
+    carried through when the backend reports them.
+    """
+    scores: Dict[str, float] = {}
+    best: Dict[str, tuple] = {}
+
+    for row in rows:
+        documents = results['documents'][row] if results.get('documents') else []
+        metadatas = results['metadatas'][row] if results.get('metadatas') else [None] * len(documents)
+        distances = results['distances'][row] if results.get('distances') else [None] * len(documents)
+        row_ids = results['row_ids'][row] if results.get('row_ids') else [None] * len(documents)
+
+        seen = set()
+        for rank, (doc, meta, dist, row_id) in enumerate(
+                zip(documents, metadatas, distances, row_ids), 1):
+            key = result_key(meta, doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            if key not in best or (dist is not None and
+                                   (best[key][2] is None or dist < best[key][2])):
+                best[key] = (doc, meta, dist, row_id)
+
+    # sorted() is stable, so ties keep first-seen order
+    ranked = sorted(scores, key=lambda key: -scores[key])[:limit]
+    fused = {
+        "chunks": [best[key][0] for key in ranked],
+        "metadata": [best[key][1] for key in ranked],
+        "distances": [best[key][2] for key in ranked],
+        "fusion_scores": [round(scores[key], 6) for key in ranked],
+    }
+    if results.get('row_ids'):
+        fused["row_ids"] = [best[key][3] for key in ranked]
+    return fused
+
+
+def fuse_bucket_results(buckets: List[tuple], bucket_results: Dict[str, Dict],
+                        rows: List[int], limit: int, rrf_k: int = RRF_K) -> Dict[str, List]:
+    """
+    Fuse each time bucket's results separately (top `limit` per bucket) and
+    concatenate them in date order; 'time_buckets' records each bucket's span
+    and hit count
+    """
+    combined = {"chunks": [], "metadata": [], "distances": [], "fusion_scores": []}
+    row_ids, time_buckets = [], []
+    for label, start, end in buckets:
+        fused = fuse_query_results(bucket_results[label], rows, limit, rrf_k)
+        for key in combined:
+            combined[key].extend(fused[key])
+        row_ids.extend(fused.get("row_ids", [None] * len(fused["chunks"])))
+        time_buckets.append({"bucket": label, "start": start, "end": end,
+                             "count": len(fused["chunks"])})
+    if row_ids and None not in row_ids:
+        combined["row_ids"] = row_ids
+    combined["time_buckets"] = time_buckets
+    return combined
@@ -0,0 +1,649 @@
+"""
+Streaming bulk ingest of complaint narratives into the vector store
+"""
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .config import (
+    EMBEDDING_MODEL, EMBEDDING_CACHE_DIR, VECTOR_STORE_DIR, COLLECTION_NAME, SOURCE_PARQUET,
+    CHUNK_SIZE, CHUNK_OVERLAP, INGEST_READ_ROWS, INGEST_BATCH_SIZE,
+    INGEST_CHECKPOINT, INGEST_MANIFEST, INGEST_WORKERS
+)
+from .aggregate_store import AggregateStore, RECORD_DIMENSIONS, aggregates_path, record_dimensions
+from .query_cache import bump_collection_version
+from .text_processor import clean_texts
+from .vector_store import get_chroma_collection
+
+# Raw CFPB headers -> metadata field names used by the retrieval code
+SOURCE_COLUMNS = {
+    'Complaint ID': 'complaint_id',
+    'Product': 'product',
+    'Product_Category': 'product_category',
+    'Issue': 'issue',
+    'Sub-issue': 'sub_issue',
+    'Company': 'company',
+    'State': 'state',
+    'Date received': 'date_received',
+}
+
+# Narrative columns in order of preference
+TEXT_COLUMNS = [
+    'Cleaned_Narrative', 'cleaned_narrative',
+    'Consumer complaint narrative', 'narrative',
+    'chunk_text', 'text_chunk',
+]
+
+# Uncleaned narrative columns; ingest runs them through clean_texts first
+RAW_TEXT_COLUMNS = {'Consumer complaint narrative', 'narrative'}
+
+METADATA_FIELDS = [
+    'complaint_id', 'product', 'product_category', 'issue',
+    'sub_issue', 'company', 'state', 'date_received'
+]
+
+
+def _create_text_splitter(chunk_size: int, chunk_overlap: int):
+    """Same splitter the chunking notebook used, with its fallback"""
+    try:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""],
+        )
+        return splitter.split_text
+    except ImportError:
+        step = max(1, chunk_size - chunk_overlap)
+
+        def split_text(text: str) -> List[str]:
+            return [text[i:i + chunk_size] for i in range(0, len(text), step)
+                    if text[i:i + chunk_size].strip()]
+        return split_text
+
+
+def _create_embedder(workers: int, batch_size: int):
+    """
+    Single in-process model, or a worker pool when workers > 1, behind the
+    persistent embedding cache so unchanged text is never re-encoded
+    """
+    if workers > 1:
+        from .embedding_pool import EmbeddingWorkerPool
+        embedder = EmbeddingWorkerPool(EMBEDDING_MODEL, workers, batch_size)
+    else:
+        from sentence_transformers import SentenceTransformer
+        embedder = SentenceTransformer(EMBEDDING_MODEL)
+
+    if EMBEDDING_CACHE_DIR:
+        from .embedding_cache import CachedEmbedder, EmbeddingCache
+        embedder = CachedEmbedder(embedder, EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL))
+    return embedder
+
+
+def _select_columns(schema_names: List[str]) -> Tuple[str, List[str]]:
+    """Pick the narrative column and the metadata columns present in the file"""
+    text_column = next((c for c in TEXT_COLUMNS if c in schema_names), None)
+    if text_column is None:
+        raise ValueError(
+            f"No narrative column found; expected one of {TEXT_COLUMNS}"
+        )
+
+    columns = [text_column]
+    for name in schema_names:
+        field = SOURCE_COLUMNS.get(name, name)
+        if field in METADATA_FIELDS and name not in columns:
+            columns.append(name)
+    columns += [c for c in ('chunk_index', 'total_chunks') if c in schema_names]
+    return text_column, columns
+
+
+def make_chunk_id(complaint_id, chunk_index: int) -> str:
+    """Stable Chroma ID for one chunk of one complaint"""
+    return f"{complaint_id}_{chunk_index}"
+
+
+def iter_parquet_batches(path: str, columns: Optional[List[str]] = None,
+                         read_rows: int = INGEST_READ_ROWS,
+                         skip_row_groups: Optional[set] = None
+                         ) -> Iterator[Tuple[int, int, pd.DataFrame]]:
+    """
+    Stream a parquet file row group by row group, yielding
+    (row_group_index, first_row_number, DataFrame) slices of at most
+    `read_rows` rows
+    """
+    parquet_file = pq.ParquetFile(path)
+    row_offset = 0
+    for row_group in range(parquet_file.num_row_groups):
+        group_rows = parquet_file.metadata.row_group(row_group).num_rows
+        if skip_row_groups and row_group in skip_row_groups:
+            row_offset += group_rows
+            continue
+        for batch in parquet_file.iter_batches(batch_size=read_rows,
+                                               row_groups=[row_group],
+                                               columns=columns):
+            yield row_group, row_offset, batch.to_pandas()
+            row_offset += batch.num_rows
+
+
+def iter_source_batches(path: str, read_rows: int = INGEST_READ_ROWS
+                        ) -> Tuple[str, Iterator[pd.DataFrame]]:
+    """
+    Open a CSV or parquet complaint drop for streaming.
+    Returns (text_column, iterator of DataFrames of at most `read_rows` rows).
+    """
+    if path.lower().endswith('.csv'):
+        header = list(pd.read_csv(path, nrows=0).columns)
+        text_column, columns = _select_columns(header)
+        batches = pd.read_csv(path, usecols=columns, chunksize=read_rows,
+                              dtype={'Complaint ID': str, 'complaint_id': str})
+        return text_column, iter(batches)
+
+    text_column, columns = _select_columns(pq.ParquetFile(path).schema_arrow.names)
+    batches = (df for _, _, df in iter_parquet_batches(path, columns, read_rows))
+    return text_column, batches
+
+
+def _write_chunks(collection, embedder, ids: List[str], docs: List[str],
+                  metas: List[Dict], batch_size: int, upsert: bool = False) -> int:
+    """
+    Encode chunks (the embedder splits them into `batch_size` batches, across
+    worker processes when it is a pool) and write them batch by batch;
+    returns chunks written
+    """
+    if not ids:
+        return 0
+    embeddings = embedder.encode(docs, batch_size=batch_size, show_progress_bar=False)
+    write = collection.upsert if upsert else collection.add
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        write(
+            ids=ids[start:end],
+            embeddings=embeddings[start:end].tolist(),
+            documents=docs[start:end],
+            metadatas=metas[start:end]
+        )
+    return len(ids)
+
+
+def _load_checkpoint(checkpoint_path: str, source: str, num_rows: int) -> Dict:
+    """Load the checkpoint if it was written for this source file"""
+    state = {"source": os.path.abspath(source), "num_rows": num_rows,
+             "completed_row_groups": [], "chunks": 0}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r') as f:
+            saved = json.load(f)
+        if saved.get("source") == state["source"] and saved.get("num_rows") == num_rows:
+            return saved
+    return state
+
+
+def _save_checkpoint(checkpoint_path: str, state: Dict):
+    """Write the checkpoint atomically so a kill never leaves it half-written"""
+    state["last_update"] = datetime.now().isoformat()
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+
+class IngestManifest:
+    """
+    complaint_id -> (date_received, n_chunks, product, issue, state,
+    company) for everything stored in a collection. Lets delta ingest diff
+    a new drop without scanning Chroma; with `aggregates` attached, every
+    merge also moves replaced complaints to their new aggregate cell.
+    """
+
+    def __init__(self, path: str, aggregates: Optional[AggregateStore] = None):
+        self.path = path
+        self.aggregates = aggregates
+        if os.path.exists(path):
+            self.df = pd.read_parquet(path).set_index('complaint_id')
+        else:
+            self.df = pd.DataFrame(
+                {'date_received': pd.Series(dtype=str), 'n_chunks': pd.Series(dtype='int64'),
+                 **{field: pd.Series(dtype=str) for field in RECORD_DIMENSIONS}},
+                index=pd.Index([], dtype=str, name='complaint_id')
+            )
+        self._pending = []
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self.df)
+
+    def _merge(self):
+        """Fold pending updates in; later updates win"""
+        if not self._pending:
+            return
+        new = pd.concat(self._pending)
+        new = new[~new.index.duplicated(keep='last')]
+        replaced = self.df.index.isin(new.index)
+        if self.aggregates is not None:
+            self.aggregates.apply(added=new, removed=self.df[replaced])
+        self.df = pd.concat([self.df[~replaced], new])
+        self._pending = []
+
+    def update(self, metadatas: List[Dict]):
+        """Record the complaints behind a batch of chunk metadatas"""
+        rows = {}
+        for meta in metadatas:
+            if 'complaint_id' in meta:
+                rows[meta['complaint_id']] = (meta.get('date_received', ''),
+                                              int(meta.get('total_chunks', 1)),
+                                              *record_dimensions(meta).values())
+        if not rows:
+            return
+        new = pd.DataFrame.from_dict(rows, orient='index',
+                                     columns=['date_received', 'n_chunks', *RECORD_DIMENSIONS])
+        new.index.name = 'complaint_id'
+        self._pending.append(new)
+
+    def diff(self, complaint_ids: pd.Series, dates: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Boolean masks (new, changed) for incoming complaints"""
+        self._merge()
+        known = complaint_ids.isin(self.df.index)
+        # Undated complaints come in as NaN but are stored as ''
+        stored_dates = complaint_ids.map(self.df['date_received']).fillna('')
+        changed = known & (stored_dates != dates.fillna(''))
+        return ~known, changed
+
+    def chunk_ids(self, complaint_ids) -> List[str]:
+        """Chunk IDs currently stored for the given complaints"""
+        self._merge()
+        counts = self.df['n_chunks'].reindex(complaint_ids).fillna(0).astype(int)
+        return [make_chunk_id(cid, i) for cid, n in counts.items() for i in range(n)]
+
+    def save(self):
+        self._merge()
+        tmp_path = self.path + ".tmp"
+        self.df.reset_index().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        if self.aggregates is not None:
+            self.aggregates.save()
+
+    @classmethod
+    def from_collection(cls, path: str, collection, page_size: int = 10000,
+                        aggregates: Optional[AggregateStore] = None) -> 'IngestManifest':
+        """Rebuild the manifest from collection metadata (one-off for old stores)"""
+        manifest = cls(path, aggregates)
+        manifest.df = manifest.df.iloc[:0]  # from scratch: old rows would be uncounted from a new cube
+        offset = 0
+        while True:
+            page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            manifest.update(page['metadatas'])
+            offset += len(page['ids'])
+        return manifest
+
+
+def _open_manifest(collection, vector_store_dir: str, collection_name: str,
+                   verbose: bool = True) -> IngestManifest:
+    """
+    The collection's manifest with its aggregate cube attached. A store
+    missing either one, or written before the manifest recorded aggregate
+    dimensions, is re-read from collection metadata once.
+    """
+    path = os.path.join(vector_store_dir, INGEST_MANIFEST.format(collection=collection_name))
+    cube_path = aggregates_path(vector_store_dir, collection_name)
+    manifest = IngestManifest(path)
+    current = (os.path.exists(cube_path)
+               and not manifest.df.reindex(columns=list(RECORD_DIMENSIONS)).isna().any().any())
+    if current or collection.count() == 0:
+        manifest.aggregates = AggregateStore(cube_path, load=current)
+        return manifest
+
+    if verbose:
+        print("📋 Manifest or aggregates missing, rebuilding them from collection metadata...")
+    manifest = IngestManifest.from_collection(path, collection,
+                                              aggregates=AggregateStore(cube_path, load=False))
+    manifest.save()
+    return manifest
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename raw CFPB headers and put IDs and dates in one canonical form"""
+    df = df.rename(columns=SOURCE_COLUMNS)
+    if 'complaint_id' in df.columns:
+        ids = df['complaint_id']
+        if pd.api.types.is_float_dtype(ids):
+            ids = ids.astype('Int64')
+        df['complaint_id'] = ids.astype(str).where(ids.notna(), None)
+    if 'date_received' in df.columns:
+        df['date_received'] = pd.to_datetime(
+            df['date_received'], errors='coerce'
+        ).dt.strftime('%Y-%m-%d')
+    return df
+
+
+def build_chunk_records(df: pd.DataFrame, text_column: str, split_text,
+                        row_offset: int = 0) -> Tuple[List[str], List[str], List[Dict]]:
+    """
+    Turn a slice of complaints into (ids, documents, metadatas) for Chroma.
+    Rows that already carry a chunk_index are treated as pre-chunked.
+
+    IDs come from Complaint ID + chunk index (or the row number in the
+    source file when there is no Complaint ID), so re-running over the same
+    data always produces the same IDs.
+    """
+    df = _normalize_frame(df)
+    fields = [f for f in METADATA_FIELDS if f in df.columns]
+    pre_chunked = 'chunk_index' in df.columns
+
+    if text_column in RAW_TEXT_COLUMNS:
+        texts = clean_texts(df[text_column]).to_pylist()
+    else:
+        texts = df[text_column].fillna('').astype(str).tolist()
+    values = {f: df[f].tolist() for f in fields}
+
+    ids, documents, metadatas = [], [], []
+    for row, text in enumerate(texts):
+        if not text.strip():
+            continue
+
+        base_meta = {}
+        for f in fields:
+            value = values[f][row]
+            if value is not None and not pd.isna(value):
+                base_meta[f] = str(value)
+
+        if pre_chunked:
+            chunks = [text]
+            indices = [int(df['chunk_index'].iat[row])]
+            total = int(df['total_chunks'].iat[row]) if 'total_chunks' in df.columns else 1
+        else:
+            chunks = split_text(text)
+            indices = range(len(chunks))
+            total = len(chunks)
+
+        for chunk_index, chunk in zip(indices, chunks):
+            meta = dict(base_meta)
+            meta['chunk_index'] = chunk_index
+            meta['total_chunks'] = total
+            ids.append(make_chunk_id(base_meta.get('complaint_id', f"row{row_offset + row}"),
+                                     chunk_index))
+            documents.append(chunk)
+            metadatas.append(meta)
+
+    return ids, documents, metadatas
+
+
+def ingest_parquet(path: str = SOURCE_PARQUET, collection=None,
+                   vector_store_dir: str = VECTOR_STORE_DIR,
+                   collection_name: str = COLLECTION_NAME,
+                   batch_size: int = INGEST_BATCH_SIZE,
+                   read_rows: int = INGEST_READ_ROWS,
+                   chunk_size: int = CHUNK_SIZE,
+                   chunk_overlap: int = CHUNK_OVERLAP,
+                   embedder=None,
+                   workers: int = INGEST_WORKERS,
+                   resume: bool = True,
+                   verbose: bool = True) -> Dict:
+    """
+    Index the full complaint corpus into Chroma.
+
+    The parquet file is streamed row group by row group; chunks are buffered
+    up to `batch_size`, encoded in one call and written with a single
+    collection.add, so memory stays bounded by read_rows + batch_size
+    regardless of corpus size.
+
+    Completed row groups are recorded in a checkpoint next to the vector
+    store and skipped on the next run, and chunks whose IDs are already in
+    the collection are never re-embedded, so a killed job can simply be
+    started again.
+
+    Returns a throughput report (documents, chunks, seconds, docs/sec).
+    """
+    if collection is None:
+        collection = get_chroma_collection(vector_store_dir, collection_name)
+    own_embedder = embedder is None
+    if own_embedder:
+        embedder = _create_embedder(workers, batch_size)
+
+    parquet_file = pq.ParquetFile(path)
+    total_rows = parquet_file.metadata.num_rows
+    num_row_groups = parquet_file.num_row_groups
+    text_column, columns = _select_columns(parquet_file.schema_arrow.names)
+    split_text = _create_text_splitter(chunk_size, chunk_overlap)
+
+    os.makedirs(vector_store_dir, exist_ok=True)
+    checkpoint_path = os.path.join(
+        vector_store_dir, INGEST_CHECKPOINT.format(collection=collection_name)
+    )
+    checkpoint = _load_checkpoint(checkpoint_path, path, total_rows)
+    if not resume:
+        checkpoint["completed_row_groups"] = []
+    completed = set(checkpoint["completed_row_groups"])
+    manifest = _open_manifest(collection, vector_store_dir, collection_name, verbose)
+
+    if verbose:
+        print(f"📥 Ingesting {total_rows:,} rows from {path}")
+        print(f"   • Row groups: {num_row_groups}")
+        print(f"   • Text column: '{text_column}'")
+        print(f"   • Batch size: {batch_size} chunks x {max(1, workers)} workers")
+        if completed:
+            print(f"   • Resuming: {len(completed)} row groups already done")
+
+    report = {"documents": 0, "chunks": 0, "skipped_chunks": 0, "batches": 0}
+    version_name = getattr(collection, "name", collection_name)
+    buffer_ids, buffer_docs, buffer_metas = [], [], []
+    # One batch per worker per round trip keeps every worker busy
+    flush_size = batch_size * max(1, workers)
+    start_time = time.time()
+
+    def flush(n: int):
+        """Encode and add the first n buffered chunks not already stored"""
+        ids = buffer_ids[:n]
+        existing = set(collection.get(ids=ids, include=[])['ids'])
+        keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+        report["skipped_chunks"] += len(ids) - len(keep)
+
+        if keep:
+            report["chunks"] += _write_chunks(
+                collection, embedder,
+                [ids[i] for i in keep],
+                [buffer_docs[i] for i in keep],
+                [buffer_metas[i] for i in keep],
+                batch_size
+            )
+            report["batches"] += 1
+            # Cached query results for this collection are now stale
+            bump_collection_version(vector_store_dir, version_name)
+        del buffer_ids[:n], buffer_docs[:n], buffer_metas[:n]
+
+    def finish_row_group(row_group: int):
+        """Flush what is left of a row group and record it as done"""
+        if buffer_ids:
+            flush(len(buffer_ids))
+        manifest.save()
+        completed.add(row_group)
+        checkpoint["completed_row_groups"] = sorted(completed)
+        checkpoint["chunks"] = chunks_before + report["chunks"]
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+        if verbose:
+            elapsed = time.time() - start_time
+            rate = report["documents"] / elapsed if elapsed > 0 else 0
+            print(f"   ✅ Row group {row_group + 1}/{num_row_groups}: "
+                  f"{report['documents']:,} docs, {report['chunks']:,} chunks "
+                  f"({rate:.1f} docs/sec)")
+
+    chunks_before = checkpoint.get("chunks", 0)
+    current_group = None
+    try:
+        for row_group, row_offset, df in iter_parquet_batches(path, columns, read_rows,
+                                                              skip_row_groups=completed):
+            if current_group is not None and row_group != current_group:
+                finish_row_group(current_group)
+            current_group = row_group
+
+            ids, docs, metas = build_chunk_records(df, text_column, split_text, row_offset)
+            report["documents"] += len(df)
+            manifest.update(metas)
+
+            buffer_ids.extend(ids)
+            buffer_docs.extend(docs)
+            buffer_metas.extend(metas)
+            while len(buffer_ids) >= flush_size:
+                flush(flush_size)
+
+        if current_group is not None:
+            finish_row_group(current_group)
+    finally:
+        if own_embedder and hasattr(embedder, "close"):
+            embedder.close()
+
+    elapsed = time.time() - start_time
+    report["seconds"] = round(elapsed, 1)
+    report["docs_per_sec"] = round(report["documents"] / elapsed, 1) if elapsed > 0 else 0.0
+    report["chunks_per_sec"] = round(report["chunks"] / elapsed, 1) if elapsed > 0 else 0.0
+
+    if verbose:
+        print("\n🎯 INGEST COMPLETE")
+        print(f"   • Documents: {report['documents']:,}")
+        print(f"   • Chunks: {report['chunks']:,} new, "
+              f"{report['skipped_chunks']:,} already stored")
+        print(f"   • Time: {report['seconds']}s")
+        print(f"   • Throughput: {report['docs_per_sec']} docs/sec, "
+              f"{report['chunks_per_sec']} chunks/sec")
+        print(f"   • Collection now has {collection.count():,} chunks")
+
+    return report
+
+
+def ingest_delta(path: str, collection=None,
+                 vector_store_dir: str = VECTOR_STORE_DIR,
+                 collection_name: str = COLLECTION_NAME,
+                 batch_size: int = INGEST_BATCH_SIZE,
+                 read_rows: int = INGEST_READ_ROWS,
+                 chunk_size: int = CHUNK_SIZE,
+                 chunk_overlap: int = CHUNK_OVERLAP,
+                 embedder=None,
+                 workers: int = INGEST_WORKERS,
+                 verbose: bool = True) -> Dict:
+    """
+    Incrementally update an existing collection from a new complaint drop
+    (CSV or parquet).
+
+    Incoming complaints are diffed against the ingest manifest by
+    Complaint ID and 'Date received': unseen complaints are added, complaints
+    whose date changed have their old chunks deleted and are re-embedded,
+    and everything else is skipped. Pre-chunked input (chunk_index) is
+    diffed per complaint, and every chunk of a changed complaint is
+    rewritten. Cost is proportional to the delta.
+    """
+    if collection is None:
+        collection = get_chroma_collection(vector_store_dir, collection_name)
+    own_embedder = embedder is None
+    if own_embedder:
+        embedder = _create_embedder(workers, batch_size)
+
+    os.makedirs(vector_store_dir, exist_ok=True)
+    manifest = _open_manifest(collection, vector_store_dir, collection_name, verbose)
+
+    text_column, batches = iter_source_batches(path, read_rows)
+    split_text = _create_text_splitter(chunk_size, chunk_overlap)
+
+    if verbose:
+        print(f"🔄 Delta ingest from {path}")
+        print(f"   • Known complaints: {len(manifest):,}")
+
+    report = {"documents": 0, "new": 0, "changed": 0, "unchanged": 0,
+              "chunks": 0, "deleted_chunks": 0}
+    # Pre-chunked complaints are diffed on their first batch; later batches
+    # holding more of their chunks follow that decision
+    seen, written = set(), set()
+    start_time = time.time()
+
+    try:
+        for df in batches:
+            df = _normalize_frame(df)
+            missing = {'complaint_id', 'date_received'} - set(df.columns)
+            if missing:
+                raise ValueError(f"Delta ingest needs columns {sorted(missing)}")
+
+            df = df[df['complaint_id'].notna() & df[text_column].notna()]
+            # Pre-chunked input has one row per chunk: diff and count complaints, keep every chunk
+            pre_chunked = 'chunk_index' in df.columns
+            df = df.drop_duplicates(['complaint_id', 'chunk_index'] if pre_chunked else 'complaint_id',
+                                    keep='last')
+            repeat = df['complaint_id'].isin(seen)
+            incoming = df.loc[~repeat, 'complaint_id']
+
+            new_mask, changed_mask = manifest.diff(df['complaint_id'], df['date_received'])
+            new_mask &= ~repeat
+            changed_mask &= ~repeat
+            report["documents"] += incoming.nunique()
+            report["new"] += df.loc[new_mask, 'complaint_id'].nunique()
+            report["changed"] += df.loc[changed_mask, 'complaint_id'].nunique()
+            report["unchanged"] += df.loc[~repeat & ~new_mask & ~changed_mask, 'complaint_id'].nunique()
+
+            stale_ids = manifest.chunk_ids(df.loc[changed_mask, 'complaint_id'].unique())
+            if stale_ids:
+                collection.delete(ids=stale_ids)
+                report["deleted_chunks"] += len(stale_ids)
+
+            write_mask = new_mask | changed_mask | df['complaint_id'].isin(written)
+            if pre_chunked:
+                seen.update(incoming)
+                written.update(df.loc[write_mask, 'complaint_id'])
+            ids, docs, metas = build_chunk_records(df[write_mask], text_column, split_text)
+            report["chunks"] += _write_chunks(collection, embedder, ids, docs, metas,
+                                              batch_size, upsert=True)
+            manifest.update(metas)
+            if ids or stale_ids:
+                bump_collection_version(vector_store_dir,
+                                        getattr(collection, "name", collection_name))
+    finally:
+        if own_embedder and hasattr(embedder, "close"):
+            embedder.close()
+
+    manifest.save()
+
+    elapsed = time.time() - start_time
+    report["seconds"] = round(elapsed, 1)
+    report["docs_per_sec"] = round(report["documents"] / elapsed, 1) if elapsed > 0 else 0.0
+
+    if verbose:
+        print("\n🎯 DELTA INGEST COMPLETE")
+        print(f"   • New complaints: {report['new']:,}")
+        print(f"   • Changed complaints: {report['changed']:,}")
+        print(f"   • Unchanged (skipped): {report['unchanged']:,}")
+        print(f"   • Chunks written: {report['chunks']:,} "
+              f"({report['deleted_chunks']:,} stale chunks removed)")
+        print(f"   • Time: {report['seconds']}s")
+        print(f"   • Collection now has {collection.count():,} chunks")
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk ingest complaints into Chroma")
+    parser.add_argument("path", nargs="?", default=SOURCE_PARQUET)
+    parser.add_argument("--delta", action="store_true",
+                        help="incrementally upsert a new CSV/parquet drop")
+    parser.add_argument("--vector-store", default=VECTOR_STORE_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="embedding worker processes (one model each)")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the checkpoint and rescan every row group")
+    args = parser.parse_args()
+
+    if args.delta:
+        ingest_delta(args.path, vector_store_dir=args.vector_store,
+                     collection_name=args.collection, batch_size=args.batch_size,
+                     workers=args.workers)
+    else:
+        ingest_parquet(args.path, vector_store_dir=args.vector_store,
+                       collection_name=args.collection, batch_size=args.batch_size,
+                       workers=args.workers, resume=not args.restart)
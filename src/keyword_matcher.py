@@ -0,0 +1,106 @@
+"""
+Aho-Corasick keyword automaton for query analysis
+
+Every keyword table (products, business contexts, intents) compiles into
+one trie with failure links, so a question is classified in a single
+left-to-right scan however large the tables grow. Keywords match whole
+words: a match must start at a word boundary and end at one, optionally
+after a short inflection ('cards', 'trending', 'caused').
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+SEPARATORS = re.compile(r"[\W_]+")
+INFLECTIONS = ("s", "es", "d", "ed", "ing")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words joined by single spaces, padded with a space on each side"""
+    return f" {SEPARATORS.sub(' ', str(text).lower()).strip()} "
+
+
+def _stem(pattern: str) -> str:
+    """Drop a plural 's' so 'money transfers' also matches 'money transfer'"""
+    last = pattern.rsplit(" ", 1)[-1]
+    if len(last) > 3 and last.endswith("s") and not last.endswith(("ss", "us", "is")):
+        return pattern[:-1]
+    return pattern
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern matcher over (table, {name: keywords}) pairs. classify()
+    reports, per table, the names whose keywords occur in a text, in the
+    table's own order (its priority).
+    """
+
+    def __init__(self, tables: Iterable[Tuple[str, Dict[str, Iterable[str]]]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Tuple[str, str]]]] = [[]]
+        self.priority: Dict[Tuple[str, str], int] = {}
+        self.tables: List[str] = []
+        for table, entries in tables:
+            self.tables.append(table)
+            for priority, (name, keywords) in enumerate(entries.items()):
+                self.priority.setdefault((table, name), priority)
+                for keyword in keywords:
+                    # Keep the leading space only: it anchors the match to a word start
+                    pattern = _stem(normalize(keyword)[:-1])
+                    if pattern.strip():
+                        self._add(pattern, (table, name))
+        self._link()
+
+    def _add(self, pattern: str, label: Tuple[str, str]):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append((len(pattern), label))
+
+    def _link(self):
+        """Breadth-first failure links; each state inherits its fallback's outputs"""
+        queue = deque(self._goto[0].values())  # depth 1 fails to the root
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    @staticmethod
+    def _word_end(text: str, end: int) -> bool:
+        if text[end] == " ":
+            return True
+        return any(text.startswith(suffix + " ", end) for suffix in INFLECTIONS)
+
+    def scan(self, text: str) -> Dict[Tuple[str, str], int]:
+        """(table, name) -> character offset of its first whole-word match"""
+        text = normalize(text)
+        found: Dict[Tuple[str, str], int] = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, label in self._out[state]:
+                if label not in found and self._word_end(text, i + 1):
+                    found[label] = i + 1 - length
+        return found
+
+    def classify(self, text: str) -> Dict[str, List[str]]:
+        """Matched names per table, in table order"""
+        matches: Dict[str, List[str]] = {table: [] for table in self.tables}
+        for table, name in sorted(self.scan(text), key=self.priority.get):
+            matches[table].append(name)
+        return matches
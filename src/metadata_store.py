@@ -0,0 +1,316 @@
+"""
+Columnar chunk metadata with a fixed, normalized schema
+
+Records are normalized once, when the store is written: alternative key
+spellings ('product_category', 'Product', ...) collapse into one column,
+and product names are standardized. Low-cardinality fields are held as
+int32 codes plus a category dictionary, so lookups by row ID are plain
+NumPy indexing instead of per-dict string probing.
+"""
+import os
+import pickle
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+# Canonical field -> spellings seen in Chroma metadata and notebook pickles, in priority order
+FIELD_ALIASES = {
+    "chunk_id": ["chunk_id", "id"],
+    "complaint_id": ["complaint_id", "Complaint ID", "complaint_ID"],
+    "product": ["product_category", "product", "Product", "Product category", "product-category"],
+    "issue": ["issue", "Issue", "sub_issue", "sub-issue", "Sub-issue", "problem"],
+    "sub_issue": ["sub_issue", "sub-issue", "Sub-issue"],
+    "company": ["company", "Company", "bank", "Bank"],
+    "state": ["state", "State", "location", "Location"],
+    "date_received": ["date_received", "date", "Date", "received_date", "Date received"],
+    "chunk_index": ["chunk_index"],
+    "total_chunks": ["total_chunks"],
+    "chunk_text": ["chunk_text", "document", "text"],
+}
+
+# Value reported when a field is missing
+FIELD_DEFAULTS = {
+    "product": "Unknown",
+    "issue": "General",
+    "company": "Unknown",
+    "state": "Unknown",
+    "date_received": "Unknown",
+}
+
+# Stored dictionary-encoded (int32 codes + one copy of each value)
+CATEGORY_FIELDS = ["product", "issue", "sub_issue", "company", "state"]
+
+SCHEMA = pa.schema(
+    [("chunk_id", pa.string()), ("complaint_id", pa.string())]
+    + [(field, pa.dictionary(pa.int32(), pa.string())) for field in CATEGORY_FIELDS]
+    + [("date_received", pa.string()),
+       ("chunk_index", pa.int32()),
+       ("total_chunks", pa.int32()),
+       ("chunk_text", pa.large_string())]
+)
+
+_MISSING = (None, "", "null", "None")
+
+
+def normalize_product(product: str) -> str:
+    """Collapse product spellings onto the standard category names"""
+    product_lower = product.lower()
+    if 'credit' in product_lower and 'card' in product_lower:
+        return 'Credit card'
+    elif 'personal' in product_lower and 'loan' in product_lower:
+        return 'Personal loan'
+    elif 'savings' in product_lower and 'account' in product_lower:
+        return 'Savings account'
+    elif 'money' in product_lower and 'transfer' in product_lower:
+        return 'Money transfers'
+    elif 'mortgage' in product_lower:
+        return 'Mortgage'
+    elif 'checking' in product_lower and 'account' in product_lower:
+        return 'Checking account'
+    return product
+
+
+def normalize_record(meta: Optional[Dict]) -> Dict:
+    """Resolve aliases into the canonical schema; missing fields are left out"""
+    record = {}
+    if not meta:
+        return record
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = meta.get(alias)
+            if value not in _MISSING:
+                record[field] = value if field in ("chunk_index", "total_chunks") else str(value).strip()
+                break
+    if "product" in record:
+        record["product"] = normalize_product(record["product"])
+    return record
+
+
+_CANONICAL_KEYS = {alias: field for field, aliases in reversed(list(FIELD_ALIASES.items()))
+                   for alias in aliases}
+_CANONICAL_KEYS.update({field: field for field in FIELD_ALIASES})
+
+
+def canonical_where(where: Optional[Dict]) -> Optional[Dict]:
+    """Rewrite a Chroma where filter onto the normalized field names and product values"""
+    if not where:
+        return where
+    out = {}
+    for key, condition in where.items():
+        if key in ("$or", "$and"):
+            out[key] = [canonical_where(clause) for clause in condition]
+            continue
+        field = _CANONICAL_KEYS.get(key, key)
+        if field == "product":
+            if isinstance(condition, dict):
+                condition = {op: ([normalize_product(v) for v in operand]
+                                  if isinstance(operand, list) else normalize_product(operand))
+                             for op, operand in condition.items()}
+            else:
+                condition = normalize_product(condition)
+        out[field] = condition
+    return out
+
+
+def resolve_fields(metadatas: List[Dict], row_ids: Optional[Sequence[int]] = None,
+                   store: Optional["MetadataStore"] = None,
+                   fields: Sequence[str] = tuple(FIELD_DEFAULTS)) -> Dict[str, List[str]]:
+    """
+    Column-wise display fields for a result list: straight from the store's
+    codes when the hits carry row IDs, otherwise one normalization per hit
+    """
+    if store is not None and row_ids is not None and len(row_ids) == len(metadatas):
+        return store.lookup(row_ids, fields)
+    records = [normalize_record(meta) for meta in metadatas]
+    return {field: [r.get(field, FIELD_DEFAULTS.get(field, "Unknown")) for r in records]
+            for field in fields}
+
+
+def resolve_codes(fields: Dict[str, List[str]], row_ids: Optional[Sequence[int]] = None,
+                  store: Optional["MetadataStore"] = None,
+                  names: Sequence[str] = ("product", "issue")) -> Dict[str, np.ndarray]:
+    """
+    int32 code per hit for categorical fields, -1 where the value is the
+    default ('Unknown', 'General'): the store's dictionary codes when the
+    hits carry row IDs, otherwise codes factorized from the resolved
+    values. Only comparable within one result list.
+    """
+    use_store = store is not None and row_ids is not None
+    out = {}
+    for name in names:
+        default = FIELD_DEFAULTS.get(name, "Unknown")
+        if use_store and name in CATEGORY_FIELDS and len(row_ids) == len(fields[name]):
+            codes = store.codes(name)[np.asarray(row_ids, dtype=np.int64)]
+            default_codes = np.flatnonzero(store.categories(name) == default)
+            codes = np.where(np.isin(codes, default_codes), -1, codes)
+        else:
+            values = np.asarray(fields[name], dtype=str)
+            codes = np.unique(values, return_inverse=True)[1].reshape(-1)
+            codes = np.where(values == default, -1, codes)
+        out[name] = codes.astype(np.int32)
+    return out
+
+
+def _as_int(value):
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_batch(records: Iterable[Dict], dictionaries: Dict[str, Dict[str, int]]) -> pa.RecordBatch:
+    """
+    Normalized records as one batch; category codes come from (and extend)
+    the running value -> code dictionaries, so batches share one encoding
+    """
+    columns: Dict[str, List] = {field.name: [] for field in SCHEMA}
+    for record in records:
+        record = normalize_record(record)
+        for name in columns:
+            value = record.get(name)
+            columns[name].append(_as_int(value) if name in ("chunk_index", "total_chunks")
+                                 else value)
+
+    arrays = []
+    for field in SCHEMA:
+        values = columns[field.name]
+        if pa.types.is_dictionary(field.type):
+            dictionary = dictionaries[field.name]
+            codes = [None if v is None else dictionary.setdefault(v, len(dictionary))
+                     for v in values]
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codes, pa.int32()), pa.array(list(dictionary), pa.string())))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+class MetadataStore:
+    """
+    Per-chunk metadata aligned with vector rows, in an uncompressed Arrow IPC
+    file opened through a memory map (zero-copy; worker processes share the
+    page cache). Dicts are only built for the rows a query returns.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table.unify_dictionaries()
+        self._codes: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @classmethod
+    def open(cls, path: str) -> "MetadataStore":
+        source = pa.memory_map(path, "r")
+        return cls(pa.ipc.open_file(source).read_all())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "MetadataStore":
+        batch = _record_batch(records, {field: {} for field in CATEGORY_FIELDS})
+        return cls(pa.Table.from_batches([batch], schema=SCHEMA))
+
+    @classmethod
+    def from_pickle(cls, path: str) -> "MetadataStore":
+        """Convert the notebook's faiss_metadata.pkl (a list of dicts)"""
+        with open(path, "rb") as f:
+            return cls.from_records(pickle.load(f))
+
+    def write(self, path: str):
+        """Uncompressed IPC file, so open() can map it without decoding"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, self.table.schema) as writer:
+                writer.write_table(self.table, max_chunksize=65536)
+        os.replace(tmp_path, path)
+
+    def codes(self, field: str) -> np.ndarray:
+        """int32 category code per row (-1 where the field is missing)"""
+        if field not in self._codes:
+            chunks = self.table.column(field).chunks
+            self._codes[field] = (
+                np.concatenate([c.indices.fill_null(-1).to_numpy() for c in chunks]).astype(np.int32)
+                if chunks else np.zeros(0, dtype=np.int32)
+            )
+        return self._codes[field]
+
+    def categories(self, field: str) -> np.ndarray:
+        """Category dictionary for a field; codes index into it"""
+        if field not in self._categories:
+            chunks = self.table.column(field).chunks
+            values = chunks[0].dictionary.to_pylist() if chunks else []
+            self._categories[field] = np.array(values, dtype=object)
+        return self._categories[field]
+
+    def complaint_codes(self) -> np.ndarray:
+        """Dense int32 complaint index per row (-1 where the complaint ID is missing)"""
+        column = self.table.column("complaint_id").combine_chunks()
+        return column.dictionary_encode().indices.fill_null(-1).to_numpy().astype(np.int32)
+
+    def lookup(self, row_ids: Sequence[int],
+               fields: Sequence[str] = tuple(FIELD_DEFAULTS)) -> Dict[str, List[str]]:
+        """Vectorized field values for a set of rows, with missing values defaulted"""
+        rows = np.asarray(row_ids, dtype=np.int64)
+        out = {}
+        for field in fields:
+            default = FIELD_DEFAULTS.get(field, "Unknown")
+            if field in CATEGORY_FIELDS:
+                codes = self.codes(field)[rows]
+                table = np.append(self.categories(field), default)
+                out[field] = table[np.where(codes < 0, len(table) - 1, codes)].tolist()
+            else:
+                values = self.table.column(field).take(pa.array(rows)).to_pylist()
+                out[field] = [default if v is None else v for v in values]
+        return out
+
+    def rows(self, row_ids: Sequence[int]) -> List[Dict]:
+        """Metadata dicts for the given rows, without null fields"""
+        if not len(row_ids):
+            return []
+        records = self.table.take(pa.array(row_ids, pa.int64())).to_pylist()
+        return [{k: v for k, v in record.items() if v is not None} for record in records]
+
+
+class MetadataWriter:
+    """
+    Writes the IPC file one page of records at a time, so an export holds a
+    single page of dicts rather than the whole corpus. Category values get
+    their codes on first sight; each batch only carries the new ones as a
+    dictionary delta.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.rows = 0
+        self._tmp_path = path + ".tmp"
+        # IPC files only take deltas onto a non-empty dictionary, so each starts
+        # with '' (code 0, which no row uses: normalize_record drops empty values)
+        # and a field first seen after page one still extends it
+        self._dictionaries: Dict[str, Dict[str, int]] = {field: {"": 0} for field in CATEGORY_FIELDS}
+        self._sink = pa.OSFile(self._tmp_path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, SCHEMA,
+                                       options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def write(self, records: Iterable[Dict]):
+        batch = _record_batch(records, self._dictionaries)
+        if batch.num_rows:
+            self._writer.write_batch(batch)
+            self.rows += batch.num_rows
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self) -> "MetadataWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        self._sink.close()
+        os.remove(self._tmp_path)
@@ -0,0 +1,277 @@
+"""
+Query-result cache shared by the app, the RAG classes and modules/
+
+Entries are keyed on (normalized query, product filter, k, collection
+version). The version combines the collection name, its count and a
+marker file that ingest bumps, so results cached before an ingest are
+never served after it, even from another process.
+
+SemanticAnswerCache sits in front of whole answers instead: a question
+whose embedding is close enough to one already answered, under the same
+filters and collection version, gets the earlier response.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    QUERY_CACHE_SIZE, QUERY_CACHE_TTL, VECTOR_STORE_DIR, COLLECTION_VERSION_FILE,
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_THRESHOLD
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(str(query).split()).lower()
+
+
+def _version_path(vector_store_dir: str, collection_name: str) -> str:
+    return os.path.join(vector_store_dir, COLLECTION_VERSION_FILE.format(collection=collection_name))
+
+
+def collection_version(collection, vector_store_dir: Optional[str] = VECTOR_STORE_DIR) -> str:
+    """Version string that changes whenever ingest touches the collection"""
+    name = getattr(collection, "name", "collection")
+    stamp = "0"
+    if vector_store_dir:
+        try:
+            with open(_version_path(vector_store_dir, name), "r") as f:
+                stamp = f.read().strip() or "0"
+        except OSError:
+            pass
+    return f"{name}:{collection.count()}:{stamp}"
+
+
+def bump_collection_version(vector_store_dir: str, collection_name: str):
+    """Record a collection change and drop this process's cached results for it"""
+    path = _version_path(vector_store_dir, collection_name)
+    try:
+        with open(path, "r") as f:
+            current = int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        current = 0
+
+    os.makedirs(vector_store_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(current + 1))
+    os.replace(tmp_path, path)
+
+    get_query_cache().invalidate(collection_name)
+    get_answer_cache().invalidate(collection_name)
+
+
+class QueryResultCache:
+    """Thread-safe LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE,
+                 ttl_seconds: float = QUERY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(query: str, product_filter: Optional[str], k: int, version: str,
+                 *extra) -> Tuple:
+        """extra: any further retrieval settings that change the result (e.g. date buckets)"""
+        return (normalize_query(query), product_filter or None, int(k), version) + extra
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: Tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_or_compute(self, query: str, product_filter: Optional[str], k: int,
+                       version: str, compute: Callable[[], Any]) -> Any:
+        """Cached value for the key, computing and storing it on a miss"""
+        key = self.make_key(query, product_filter, k, version)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        """Drop every entry, or only those cached against one collection"""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                return
+            prefix = f"{collection_name}:"
+            for key in [key for key in self._entries if key[3].startswith(prefix)]:
+                del self._entries[key]
+
+    def report(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe LRU of answers keyed by question embedding. Each scope
+    (product filter, collection version, retrieval settings) holds its
+    unit vectors as one matrix, so a lookup is a single matrix-vector
+    product over at most max_entries rows; the nearest entry is served if
+    its cosine similarity reaches the threshold and it has not expired.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE,
+                 ttl_seconds: float = ANSWER_CACHE_TTL,
+                 threshold: float = ANSWER_CACHE_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._scopes: Dict[Tuple, List[int]] = {}
+        self._matrices: Dict[Tuple, np.ndarray] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0,
+                      "hit_similarity": 0.0, "hit_age": 0.0, "max_hit_age": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_scope(product_filter: Optional[str], version: str, *extra) -> Tuple:
+        """Everything besides the question that changes the answer; version stays at [1]"""
+        return (product_filter or None, version) + extra
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        ids = self._scopes[entry["scope"]]
+        ids.remove(entry_id)
+        self._matrices.pop(entry["scope"], None)
+        if not ids:
+            del self._scopes[entry["scope"]]
+
+    def _matrix(self, scope: Tuple) -> np.ndarray:
+        if scope not in self._matrices:
+            self._matrices[scope] = np.stack([self._entries[i]["vector"] for i in self._scopes[scope]])
+        return self._matrices[scope]
+
+    def get(self, vector: Sequence[float], scope: Tuple) -> Optional[Tuple[Any, Dict]]:
+        """(cached value, match info) for the nearest live entry in scope, or None"""
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        now = time.monotonic()
+        with self._lock:
+            for entry_id in [i for i in self._scopes.get(scope, []) if self._entries[i]["expires_at"] < now]:
+                self._remove(entry_id)
+                self.stats["expired"] += 1
+            if scope not in self._scopes:
+                self.stats["misses"] += 1
+                return None
+
+            similarities = self._matrix(scope) @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            entry_id = self._scopes[scope][best]
+            entry = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            age = now - entry["created_at"]
+            self.stats["hits"] += 1
+            self.stats["hit_similarity"] += similarity
+            self.stats["hit_age"] += age
+            self.stats["max_hit_age"] = max(self.stats["max_hit_age"], age)
+            return entry["value"], {"similarity": round(similarity, 4),
+                                    "age_seconds": round(age, 1),
+                                    "cached_question": entry["question"]}
+
+    def put(self, vector: Sequence[float], scope: Tuple, value: Any, question: str = ""):
+        vector = np.asarray(vector, dtype=np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        now = time.monotonic()
+        with self._lock:
+            entry_id, self._next_id = self._next_id, self._next_id + 1
+            self._entries[entry_id] = {"scope": scope, "vector": vector, "value": value,
+                                       "question": question, "created_at": now,
+                                       "expires_at": now + self.ttl_seconds}
+            self._scopes.setdefault(scope, []).append(entry_id)
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        """Drop every entry, or only those answered against one collection"""
+        with self._lock:
+            prefix = f"{collection_name}:"
+            for entry_id in [i for i, entry in self._entries.items()
+                             if collection_name is None or entry["scope"][1].startswith(prefix)]:
+                self._remove(entry_id)
+
+    def report(self) -> Dict:
+        hits = self.stats["hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "hits": hits,
+            "misses": self.stats["misses"],
+            "evictions": self.stats["evictions"],
+            "expired": self.stats["expired"],
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups * 100, 1) if lookups else 0.0,
+            "avg_hit_similarity": round(self.stats["hit_similarity"] / hits, 4) if hits else 0.0,
+            "avg_hit_age_seconds": round(self.stats["hit_age"] / hits, 1) if hits else 0.0,
+            "max_hit_age_seconds": round(self.stats["max_hit_age"], 1),
+        }
+
+
+_shared_cache: Optional[QueryResultCache] = None
+_shared_answer_cache: Optional[SemanticAnswerCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Process-wide cache instance"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = QueryResultCache()
+    return _shared_cache
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """Process-wide semantic answer cache"""
+    global _shared_answer_cache
+    if _shared_answer_cache is None:
+        with _shared_lock:
+            if _shared_answer_cache is None:
+                _shared_answer_cache = SemanticAnswerCache()
+    return _shared_answer_cache
@@ -1,28 +1,32 @@
 """
 Query enhancement and understanding module
 """
-from typing import Dict, List
-from .config import BUSINESS_CONTEXTS, PRODUCT_CATEGORIES
+from typing import Dict, List, Optional
+from .config import BUSINESS_CONTEXTS, BUSINESS_INTENTS, PRODUCT_CATEGORIES
+from .keyword_matcher import KeywordAutomaton
+
+# Every keyword table in one automaton, compiled once at import
+QUERY_KEYWORDS = KeywordAutomaton([
+    ("product", PRODUCT_CATEGORIES),
+    ("context", BUSINESS_CONTEXTS),
+    ("intent", BUSINESS_INTENTS),
+])
 
 class QueryEnhancer:
     """Enhanced query understanding for business intelligence"""
     
     def analyze_query(self, question: str) -> Dict:
         """Deep analysis of business queries"""
-        question_lower = question.lower()
+        # One scan for products, contexts and intents
+        matches = QUERY_KEYWORDS.classify(question)
         
         # Detect products
-        detected_products = []
-        for product_name, variations in PRODUCT_CATEGORIES.items():
-            if any(variation.lower() in question_lower for variation in variations):
-                detected_products.append(product_name.title())
+        detected_products = [product_name.title() for product_name in matches["product"]]
         
         # Detect business context
-        business_context = {}
-        for context_type, keywords in BUSINESS_CONTEXTS.items():
-            business_context[context_type] = any(
-                keyword in question_lower for keyword in keywords
-            )
+        contexts = set(matches["context"])
+        business_context = {context_type: context_type in contexts
+                            for context_type in BUSINESS_CONTEXTS}
         
         # Determine query type
         if business_context.get('comparative'):
@@ -41,7 +45,7 @@ class QueryEnhancer:
             "products": detected_products,
             "query_type": query_type,
             "business_context": business_context,
-            "business_intent": self._determine_intent(question)
+            "business_intent": self._determine_intent(question, matches)
         }
     
     def enhance_query(self, question: str, analysis: Dict) -> List[str]:
@@ -66,17 +70,8 @@ class QueryEnhancer:
         
         return enhanced[:5]  # Return top 5 enhanced queries
     
-    def _determine_intent(self, question: str) -> str:
-        """Determine the business intent of the query"""
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["trend", "pattern", "increase", "decrease"]):
-            return "monitor_performance"
-        elif any(word in question_lower for word in ["compare", "vs", "versus", "difference"]):
-            return "competitive_analysis"
-        elif any(word in question_lower for word in ["why", "reason", "cause", "root"]):
-            return "root_cause_analysis"
-        elif any(word in question_lower for word in ["improve", "better", "fix", "solve"]):
-            return "process_improvement"
-        else:
-            return "insight_generation"
\ No newline at end of file
+    def _determine_intent(self, question: str,
+                          matches: Optional[Dict[str, List[str]]] = None) -> str:
+        """Determine the business intent of the query (first match in BUSINESS_INTENTS)"""
+        intents = (matches or QUERY_KEYWORDS.classify(question))["intent"]
+        return intents[0] if intents else "insight_generation"
\ No newline at end of file
@@ -3,17 +3,42 @@
 Professional implementation with business intelligence features
 """
 
+import os
 import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from .config import (
+    RETRIEVAL_QUERY_VARIANTS, VECTOR_BACKEND, TREND_BUCKET, RERANK_ENABLED, INGEST_MANIFEST,
+    PRODUCT_CATEGORIES, CENTROID_AUTO_FILTER, ANSWER_CACHE_ENABLED, TREND_BUCKETS
+)
+from .aggregate_store import AggregateStore, aggregates_path, get_aggregates
+from .centroid_classifier import get_classifier
+from .embeddings import get_embedder, get_query_embedding_cache
+from .fusion import fuse_bucket_results, fuse_query_results
+from .metadata_store import normalize_record, resolve_codes, resolve_fields
+from .query_cache import collection_version, get_answer_cache, get_query_cache
+from .query_enhancer import QUERY_KEYWORDS
+from .reranker import get_reranker, relevance
+from .text_processor import clean_texts
+from .vector_index import FaissIndex, product_where_filter, query_buckets, query_complaints
+
 # DEFINE MISSING CONSTANTS HERE (since imports may fail)
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 RETRIEVAL_K = 5
 VECTOR_STORE_DIR = "vector_store"
 
+# Issue keywords behind each root cause category, first match wins
+ROOT_CAUSE_CATEGORIES = {
+    "Process Issues": ["delay", "slow", "wait", "pending", "processing", "time", "timely"],
+    "Communication Issues": ["notification", "inform", "tell", "communication", "update", "respond", "reply"],
+    "Technical Issues": ["error", "bug", "technical", "system", "website", "app", "online", "digital"],
+    "Policy Issues": ["fee", "charge", "policy", "term", "condition", "agreement", "contract"],
+    "Security Issues": ["fraud", "unauthorized", "theft", "scam", "security", "privacy", "identity"]
+}
+
 class AdvancedFinancialRAG:
     """
     🏆 Professional RAG System for CrediTrust Financial
@@ -55,22 +80,43 @@ class AdvancedFinancialRAG:
         """Initialize all system components"""
         try:
             # 1. Embedding model for semantic search
-            self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+            self.embedder = get_embedder(EMBEDDING_MODEL)
+            self.query_vectors = get_query_embedding_cache(EMBEDDING_MODEL)
         except Exception as e:
             print(f"⚠️ Could not load embedding model: {e}")
             # Create a dummy embedder
             class DummyEmbedder:
-                def encode(self, texts):
-                    return [0.0] * 384
+                def encode(self, texts, **kwargs):
+                    return [[0.0] * 384 for _ in texts]
             self.embedder = DummyEmbedder()
+            self.query_vectors = None
+        
+        # 1b. Optional cross-encoder reranker over a wider first stage
+        self.reranker = None
+        if RERANK_ENABLED:
+            try:
+                self.reranker = get_reranker()
+            except Exception as e:
+                print(f"⚠️ Could not load reranker, using first-stage order: {e}")
         
-        # 2. Query understanding module
+        # 2. Query understanding module, plus centroid routing when it has been built
         self.query_analyzer = self._create_query_enhancer()
+        self.classifier = None
+        if self.query_vectors is not None:
+            try:
+                self.classifier = get_classifier()
+            except Exception as e:
+                print(f"⚠️ Could not load centroid classifier, using keyword analysis only: {e}")
         
         # 3. Business prompt templates
         self.prompter = self._create_prompt_templates()
         
-        # 4. ChromaDB vector store
+        # 4. ChromaDB vector store, with the process-wide result cache in front
+        self.result_cache = get_query_cache()
+        # Paraphrases of answered questions skip the pipeline (needs real query vectors)
+        self.answer_cache = (get_answer_cache()
+                             if ANSWER_CACHE_ENABLED and self.query_vectors is not None else None)
+        self.vector_store_path = None
         self._initialize_vector_store()
         
         # 5. Initialize analytics
@@ -88,28 +134,20 @@ class AdvancedFinancialRAG:
         """Create a query enhancer if import fails"""
         class SimpleQueryEnhancer:
             def analyze_query(self, question: str):
-                question_lower = question.lower()
+                # Same compiled keyword tables as QueryEnhancer, one scan
+                matches = QUERY_KEYWORDS.classify(question)
                 
-                # Detect products
-                products = []
-                if "credit" in question_lower and "card" in question_lower:
-                    products.append("Credit card")
-                if "loan" in question_lower:
-                    products.append("Personal loan")
-                if "savings" in question_lower:
-                    products.append("Savings account")
-                if "money" in question_lower and "transfer" in question_lower:
-                    products.append("Money transfers")
-                if "mortgage" in question_lower:
-                    products.append("Mortgage")
+                # Detect products (stored category spelling)
+                products = [PRODUCT_CATEGORIES[name][0] for name in matches["product"]]
                 
                 # Business context
+                contexts = set(matches["context"])
                 business_context = {
-                    "urgency": any(word in question_lower for word in ["urgent", "critical", "emergency"]),
-                    "needs_trend_analysis": any(word in question_lower for word in ["trend", "pattern", "over time"]),
-                    "is_comparative": any(word in question_lower for word in ["compare", "vs", "versus", "difference"]),
-                    "needs_root_cause": any(word in question_lower for word in ["why", "reason", "cause"]),
-                    "volume_analysis": any(word in question_lower for word in ["many", "often", "frequent"])
+                    "urgency": "urgent" in contexts,
+                    "needs_trend_analysis": "trending" in contexts,
+                    "is_comparative": "comparative" in contexts,
+                    "needs_root_cause": "root_cause" in contexts,
+                    "volume_analysis": "volume" in contexts
                 }
                 
                 return {
@@ -145,7 +183,17 @@ class AdvancedFinancialRAG:
         return SimpleFinancialPrompts()
     
     def _initialize_vector_store(self):
-        """Initialize ChromaDB vector store"""
+        """Initialize the vector store (ChromaDB, or FAISS when configured)"""
+        if VECTOR_BACKEND == "faiss":
+            try:
+                self.collection = FaissIndex.load()
+                self.vector_store_path = VECTOR_STORE_DIR
+                if self.verbose:
+                    print(f"✅ Loaded FAISS index: {self.collection.count():,} vectors")
+                return
+            except Exception as e:
+                print(f"⚠️ FAISS index unavailable, falling back to ChromaDB: {e}")
+        
         try:
             # Try multiple possible paths
             possible_paths = [
@@ -162,6 +210,7 @@ class AdvancedFinancialRAG:
                     # Try to get existing collection
                     try:
                         self.collection = self.client.get_collection("complaint_embeddings")
+                        self.vector_store_path = path
                         collection_found = True
                         if self.verbose:
                             print(f"✅ Loaded vector store from: {path}")
@@ -169,6 +218,7 @@ class AdvancedFinancialRAG:
                     except:
                         try:
                             self.collection = self.client.get_collection("financial_complaints")
+                            self.vector_store_path = path
                             collection_found = True
                             if self.verbose:
                                 print(f"✅ Loaded vector store from: {path}")
@@ -186,6 +236,7 @@ class AdvancedFinancialRAG:
                     print("📝 Creating new vector store...")
                 self.client = chromadb.PersistentClient(path="vector_store")
                 self.collection = self.client.create_collection("complaint_embeddings")
+                self.vector_store_path = "vector_store"
                 
         except Exception as e:
             print(f"❌ Error initializing vector store: {e}")
@@ -199,121 +250,189 @@ class AdvancedFinancialRAG:
                     return {'metadatas': []}
             self.collection = DummyCollection()
     
+    def _collection_version(self) -> str:
+        """Cache version for the loaded collection (changes after ingest)"""
+        return collection_version(self.collection, self.vector_store_path)
+    
+    def _embed(self, queries: List[str]) -> List[List[float]]:
+        """Query embeddings from the shared model, in the form Chroma expects"""
+        if self.query_vectors is not None:
+            return self.query_vectors.encode(queries, self.embedder).tolist()
+        return np.asarray(self.embedder.encode(clean_texts(queries).to_pylist()),
+                          dtype=np.float32).tolist()
+
     def analyze_query(self, question: str) -> Dict:
         """
         🎯 Advanced query analysis with business context
         """
-        return self.query_analyzer.analyze_query(question)
-    
-    def _extract_metadata_field(self, meta: Dict, field_names: List[str], default: str = "Unknown") -> str:
-        """Extract metadata field using multiple possible field names."""
-        if not meta:
-            return default
-            
-        for field in field_names:
-            if field in meta and meta[field] not in [None, "", "null", "None"]:
-                value = str(meta[field])
-                return value.strip()
-        
-        return default
+        analysis = self.query_analyzer.analyze_query(question)
+        if self.classifier is not None:
+            # Retrieval embeds the question too; the query-vector LRU makes this free
+            self.classifier.refine(analysis, self._embed([question])[0])
+        return analysis
     
     def _get_product_from_metadata(self, meta: Dict) -> str:
         """Extract product category from metadata."""
-        product = self._extract_metadata_field(meta, 
-            ['product_category', 'product', 'Product', 'Product category', 'product-category'], 
-            'Unknown')
-        
-        # Standardize product names
-        product_lower = product.lower()
-        if 'credit' in product_lower and 'card' in product_lower:
-            return 'Credit card'
-        elif 'personal' in product_lower and 'loan' in product_lower:
-            return 'Personal loan'
-        elif 'savings' in product_lower and 'account' in product_lower:
-            return 'Savings account'
-        elif 'money' in product_lower and 'transfer' in product_lower:
-            return 'Money transfers'
-        elif 'mortgage' in product_lower:
-            return 'Mortgage'
-        elif 'checking' in product_lower and 'account' in product_lower:
-            return 'Checking account'
-        
-        return product
+        return normalize_record(meta).get("product", "Unknown")
     
     def _get_issue_from_metadata(self, meta: Dict) -> str:
         """Extract issue from metadata."""
-        return self._extract_metadata_field(meta,
-            ['issue', 'Issue', 'sub_issue', 'sub-issue', 'Sub-issue', 'problem'],
-            'General')
+        return normalize_record(meta).get("issue", "General")
+    
+    def _fields(self, retrieved_data: Dict) -> Dict[str, List[str]]:
+        """Normalized product/issue/company/state/date columns for the retrieved chunks"""
+        if "fields" not in retrieved_data:
+            retrieved_data["fields"] = resolve_fields(retrieved_data["metadata"])
+        return retrieved_data["fields"]
+    
+    def _codes(self, retrieved_data: Dict) -> Dict[str, np.ndarray]:
+        """int32 product/issue codes for the retrieved chunks (-1 = Unknown / General)"""
+        if "codes" not in retrieved_data:
+            retrieved_data["codes"] = resolve_codes(self._fields(retrieved_data))
+        return retrieved_data["codes"]
+    
+    @staticmethod
+    def _distances(retrieved_data: Dict) -> np.ndarray:
+        """Distances as float64, NaN where a hit has none"""
+        return np.array([np.nan if d is None else d for d in retrieved_data.get("distances") or []],
+                        dtype=np.float64)
+    
+    def _adjust_k(self, analysis: Dict, k: int) -> int:
+        """Adjust K based on query complexity"""
+        if analysis["business_context"]["is_comparative"]:
+            return min(8, k * 2)
+        if analysis["business_context"]["needs_trend_analysis"]:
+            return min(10, k * 2)
+        return k
+    
+    def _time_key(self, analysis: Dict, date_range: Optional[Tuple[str, str]],
+                  bucket: Optional[str]) -> Tuple:
+        """(bucket, date_range) of a bucketed retrieval, default bucket resolved; () if not bucketed"""
+        if (date_range is None and bucket is None
+                and not analysis["business_context"].get("needs_trend_analysis", False)):
+            return ()
+        return (bucket or TREND_BUCKET, tuple(date_range or ()))
+    
+    def _build_where_filter(self, product_filter: Optional[str]) -> Optional[Dict]:
+        """Chroma where clause for a standard product name"""
+        return product_where_filter(product_filter)
+    
+    def _fetch_k(self, k: int) -> int:
+        """First-stage hits per question: wider when a reranker narrows them back to k"""
+        return self.reranker.first_stage_k(k) if self.reranker is not None else k
+    
+    def _rerank_key(self) -> Tuple:
+        """Cache key part: reranked and first-stage results differ"""
+        return ("rerank", self.reranker.model_name) if self.reranker is not None else ()
+    
+    def _collect_retrieved(self, results: Dict, rows: List[int], k: int,
+                           analysis: Dict, question: Optional[str] = None) -> Dict:
+        """Fuse the result rows belonging to one question into retrieved_data"""
+        fused = fuse_query_results(results, rows, limit=self._fetch_k(k))
+        if self.reranker is not None and question:
+            fused = self.reranker.rerank(question, fused, k)
+            if self.verbose and not fused["rerank"]["applied"]:
+                print(f"   ⏱️ Rerank skipped ({fused['rerank']['reason']}); first-stage order kept")
+        else:
+            fused = {key: value[:k] for key, value in fused.items()}
+        return self._finish_retrieved(fused, analysis)
+    
+    @staticmethod
+    def _cacheable(retrieved_data: Dict) -> bool:
+        """Results that fell back after a rerank timeout are not worth keeping"""
+        return retrieved_data.get("rerank", {}).get("applied", True)
+    
+    def _finish_retrieved(self, fused: Dict, analysis: Dict) -> Dict:
+        """Attach normalized fields and bookkeeping to fused results"""
+        row_ids = fused.pop("row_ids", None)
+        store = getattr(self.collection, "metadata_store", None)
+        fused["fields"] = resolve_fields(fused["metadata"], row_ids, store)
+        fused["codes"] = resolve_codes(fused["fields"], row_ids, store)
+        fused.update({
+            "count": len(fused["chunks"]),
+            "query_analysis": analysis,
+            "retrieval_time": datetime.now().isoformat()
+        })
+        return fused
     
     def retrieve_complaints(self, question: str, analysis: Dict, 
                           k: int = RETRIEVAL_K, 
-                          product_filter: Optional[str] = None) -> Dict:
+                          product_filter: Optional[str] = None,
+                          date_range: Optional[Tuple[str, str]] = None,
+                          bucket: Optional[str] = None) -> Dict:
         """
         🔍 Intelligent retrieval with business-aware filtering
+
+        Trend questions, or any call with a date_range / bucket, return the
+        top k complaints per time bucket ('time_buckets' lists the buckets).
         """
         if self.verbose:
             print(f"\n🔍 Processing: '{question}'")
             if product_filter:
                 print(f"   Filter: {product_filter}")
         
-        # Adjust K based on query complexity
-        if analysis["business_context"]["is_comparative"]:
-            k = min(8, k * 2)
-        elif analysis["business_context"]["needs_trend_analysis"]:
-            k = min(10, k * 2)
-        
-        # Prepare filter
-        where_filter = None
-        if product_filter:
-            # Map standard product names to possible field values
-            product_mappings = {
-                'Credit card': ['Credit card', 'credit card', 'Credit Card', 'Credit-card'],
-                'Personal loan': ['Personal loan', 'personal loan', 'Personal Loan', 'Personal-loan'],
-                'Savings account': ['Savings account', 'savings account', 'Savings Account', 'Savings-account'],
-                'Money transfers': ['Money transfers', 'money transfers', 'Money Transfers', 'Money-transfers'],
-                'Mortgage': ['Mortgage', 'mortgage', 'Home loan'],
-                'Checking account': ['Checking account', 'checking account', 'Checking Account', 'Checking-account']
-            }
-            
-            if product_filter in product_mappings:
-                where_filter = {
-                    "$or": [
-                        {"product_category": {"$in": product_mappings[product_filter]}},
-                        {"product": {"$in": product_mappings[product_filter]}}
-                    ]
-                }
+        k = self._adjust_k(analysis, k)
+        where_filter = self._build_where_filter(product_filter)
+        time_key = self._time_key(analysis, date_range, bucket)
+        bucketed = bool(time_key)
+        
+        # Serve repeated questions from the shared result cache
+        cache_key = self.result_cache.make_key(question, product_filter, k,
+                                               self._collection_version(), *time_key,
+                                               *self._rerank_key())
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            if self.verbose:
+                print(f"   ⚡ Cached: {cached['count']} complaints")
+            return cached
         
         # Generate enhanced queries
-        enhanced_queries = self.query_analyzer.enhance_query(question, analysis)
+        enhanced_queries = self.query_analyzer.enhance_query(question, analysis)[:RETRIEVAL_QUERY_VARIANTS]
+        
+        if bucketed:
+            try:
+                # One bounded search per time bucket
+                buckets, bucket_results = query_buckets(
+                    self.collection, self._embed(enhanced_queries), k,
+                    date_range=date_range, bucket=bucket or TREND_BUCKET, where=where_filter
+                )
+                retrieved_data = self._finish_retrieved(fuse_bucket_results(
+                    buckets, bucket_results, list(range(len(enhanced_queries))), k
+                ), analysis)
+                if buckets:
+                    self.result_cache.put(cache_key, retrieved_data)
+                    if self.verbose:
+                        print(f"   📅 Retrieved: {retrieved_data['count']} complaints "
+                              f"across {len(buckets)} {bucket or TREND_BUCKET} buckets")
+                    return retrieved_data
+            except Exception as e:
+                if self.verbose:
+                    print(f"   ⚠️ Bucketed query error: {str(e)[:100]}")
+            # Undated corpus: answer as an ordinary question
         
         # Execute search
         try:
-            results = self.collection.query(
-                query_texts=enhanced_queries[:2],
-                n_results=k,
-                where=where_filter,
-                include=["documents", "metadatas", "distances"]
+            # k distinct complaints per query, not k chunks
+            results = query_complaints(
+                self.collection, self._embed(enhanced_queries),
+                n_results=self._fetch_k(k), where=where_filter
             )
+            rows = list(range(len(enhanced_queries)))
+            cacheable = True
         except Exception as e:
             if self.verbose:
                 print(f"   ⚠️ Query error: {str(e)[:100]}")
             # Fallback
-            results = self.collection.query(
-                query_texts=[question],
-                n_results=k,
-                include=["documents", "metadatas", "distances"]
+            results = query_complaints(
+                self.collection, self._embed([question]), n_results=self._fetch_k(k)
             )
+            rows = [0]
+            cacheable = False
         
         # Process results
-        retrieved_data = {
-            "chunks": results['documents'][0] if results['documents'] else [],
-            "metadata": results['metadatas'][0] if results['metadatas'] else [],
-            "distances": results['distances'][0] if results['distances'] else [],
-            "count": len(results['documents'][0]) if results['documents'] else 0,
-            "query_analysis": analysis,
-            "retrieval_time": datetime.now().isoformat()
-        }
+        retrieved_data = self._collect_retrieved(results, rows, k, analysis, question)
+        if cacheable and self._cacheable(retrieved_data):
+            self.result_cache.put(cache_key, retrieved_data)
         
         if self.verbose:
             if retrieved_data["count"] > 0:
@@ -340,10 +459,16 @@ class AdvancedFinancialRAG:
                 "retrieved_count": 0
             }
         
-        # 1. Semantic Similarity Score (0-40)
-        if retrieved_data["distances"]:
-            avg_distance = sum(retrieved_data["distances"]) / len(retrieved_data["distances"])
-            similarity = 1 - avg_distance
+        # Everything below works on arrays resolved once at retrieval time
+        distances = self._distances(retrieved_data)
+        codes = self._codes(retrieved_data)
+        products, issues = codes["product"], codes["issue"]
+        
+        # 1. Semantic Similarity Score (0-40): cross-encoder relevance when reranked
+        if retrieved_data.get("rerank_scores"):
+            semantic_score = min(40, relevance(retrieved_data["rerank_scores"]) * 40)
+        elif len(distances) and not np.isnan(distances).all():
+            similarity = 1 - float(np.nanmean(distances))
             semantic_score = min(40, similarity * 40)
         else:
             semantic_score = 20
@@ -355,26 +480,16 @@ class AdvancedFinancialRAG:
         retrieval_score = min(30, retrieval_ratio * 30)
         
         # 3. Source Diversity Score (0-20)
-        if retrieved_data["metadata"]:
-            products = set()
-            for meta in retrieved_data["metadata"]:
-                product = self._get_product_from_metadata(meta)
-                if product != 'Unknown':
-                    products.add(product)
-            diversity_ratio = len(products) / len(retrieved_data["metadata"])
+        if len(products):
+            diversity_ratio = np.unique(products[products >= 0]).size / len(products)
             diversity_score = min(20, diversity_ratio * 20)
         else:
             diversity_score = 0
         
         # 4. Metadata Completeness Score (0-10)
-        if retrieved_data["metadata"]:
-            complete_metadata = 0
-            for meta in retrieved_data["metadata"]:
-                product = self._get_product_from_metadata(meta)
-                issue = self._get_issue_from_metadata(meta)
-                if product != 'Unknown' and issue != 'General':
-                    complete_metadata += 1
-            metadata_score = (complete_metadata / len(retrieved_data["metadata"])) * 10
+        if len(products):
+            complete_metadata = np.count_nonzero((products >= 0) & (issues >= 0))
+            metadata_score = (complete_metadata / len(products)) * 10
         else:
             metadata_score = 0
         
@@ -403,11 +518,45 @@ class AdvancedFinancialRAG:
             "retrieved_count": retrieved_data["count"]
         }
     
+    def _aggregates(self) -> Optional[AggregateStore]:
+        """Corpus-wide counts for the loaded collection, once ingest or the builder has saved them"""
+        if not self.vector_store_path:
+            return None
+        return get_aggregates(aggregates_path(self.vector_store_path,
+                                              getattr(self.collection, "name", "collection")))
+    
+    @staticmethod
+    def _corpus_scope(analysis: Dict, product_filter: Optional[str] = None) -> Dict:
+        """Aggregate filters matching the question: its product, when exactly one applies"""
+        products = [product_filter] if product_filter else analysis.get("products") or []
+        return {"product": products[0]} if len(products) == 1 else {}
+    
+    @staticmethod
+    def _scope_label(scope: Dict) -> str:
+        return f" for {scope['product']}" if scope.get("product") else ""
+    
+    def _corpus_counts(self, corpus: AggregateStore, scope: Dict,
+                       products: Dict, issues: Dict) -> Dict:
+        """Exact corpus counts for the products and issues seen in the retrieved sample"""
+        sample_issues = sorted((i for i in issues if i != 'General'), key=issues.get, reverse=True)[:3]
+        return {
+            "scope": scope,
+            "complaints": corpus.count(**scope),
+            "corpus_total": corpus.total,
+            "sample_products": {p: corpus.count(product=p) for p in products if p != 'Unknown'},
+            "sample_issues": {i: corpus.count(issue=i, **scope) for i in sample_issues},
+            "top_issues": corpus.breakdown("issue", top=3, **scope)
+        }
+    
     def generate_business_insights(self, question: str, 
                                  retrieved_data: Dict,
-                                 confidence: Dict) -> Dict:
+                                 confidence: Dict,
+                                 product_filter: Optional[str] = None) -> Dict:
         """
         💼 Generate business intelligence insights
+
+        Patterns come from the retrieved sample; when the aggregate cube
+        exists, volumes are restated with exact corpus-wide counts.
         """
         if retrieved_data["count"] == 0:
             return {
@@ -423,11 +572,10 @@ class AdvancedFinancialRAG:
         issues = {}
         severities = {"high": 0, "medium": 0, "low": 0}
         
-        for meta in retrieved_data["metadata"]:
-            product = self._get_product_from_metadata(meta)
+        fields = self._fields(retrieved_data)
+        for product, issue in zip(fields["product"], fields["issue"]):
             products[product] = products.get(product, 0) + 1
             
-            issue = self._get_issue_from_metadata(meta)
             issues[issue] = issues.get(issue, 0) + 1
             
             issue_lower = str(issue).lower()
@@ -440,15 +588,23 @@ class AdvancedFinancialRAG:
         
         # Generate insights based on query type
         analysis = retrieved_data["query_analysis"]
+        corpus = self._aggregates()
+        if corpus is not None and not corpus.total:
+            corpus = None
+        scope = self._corpus_scope(analysis, product_filter)
         
         if analysis["business_context"]["is_comparative"]:
-            insights = self._generate_comparative_insights(products, issues, question)
+            insights = self._generate_comparative_insights(products, issues, question, corpus)
         elif analysis["business_context"]["needs_trend_analysis"]:
-            insights = self._generate_trend_insights(products, issues, question)
+            periods = self._summarize_periods(retrieved_data) if retrieved_data.get("time_buckets") else None
+            insights = self._generate_trend_insights(products, issues, question, periods, corpus, scope)
         elif analysis["business_context"]["needs_root_cause"]:
-            insights = self._generate_root_cause_insights(products, issues, question)
+            insights = self._generate_root_cause_insights(products, issues, question, corpus, scope)
         else:
-            insights = self._generate_general_insights(products, issues, severities, question)
+            insights = self._generate_general_insights(products, issues, severities, question, corpus, scope)
+        
+        if corpus is not None:
+            insights["corpus_counts"] = self._corpus_counts(corpus, scope, products, issues)
         
         # Add confidence context
         insights["confidence_context"] = {
@@ -460,7 +616,9 @@ class AdvancedFinancialRAG:
         return insights
     
     def _generate_general_insights(self, products: Dict, issues: Dict, 
-                                 severities: Dict, question: str) -> Dict:
+                                 severities: Dict, question: str,
+                                 corpus: Optional[AggregateStore] = None,
+                                 scope: Optional[Dict] = None) -> Dict:
         """Generate general business insights"""
         # Remove 'Unknown' from products
         filtered_products = {k: v for k, v in products.items() if k != 'Unknown'}
@@ -472,7 +630,7 @@ class AdvancedFinancialRAG:
         
         total_complaints = sum(filtered_products.values()) if filtered_products else sum(products.values())
         
-        return {
+        insights = {
             "executive_summary": f"Analysis of {total_complaints} relevant complaints reveals key customer pain points.",
             "key_findings": [
                 f"Top product category: {top_products[0][0]} ({top_products[0][1]} complaints)" if top_products else "No product data available",
@@ -490,9 +648,30 @@ class AdvancedFinancialRAG:
             ],
             "evidence_count": total_complaints
         }
+        
+        if corpus is not None:
+            scope = scope or {}
+            in_scope = corpus.count(**scope)
+            insights["executive_summary"] += (f" The corpus holds {in_scope:,} complaints"
+                                              f"{self._scope_label(scope)}.")
+            if top_products:
+                exact = corpus.count(product=top_products[0][0])
+                insights["key_findings"].append(
+                    f"Corpus-wide: {top_products[0][0]} has {exact:,} complaints "
+                    f"({exact / corpus.total * 100:.1f}% of {corpus.total:,})"
+                )
+            if top_issues and in_scope:
+                exact = corpus.count(issue=top_issues[0][0], **scope)
+                insights["key_findings"].append(
+                    f"Corpus-wide: '{top_issues[0][0]}' appears in {exact:,} complaints"
+                    f"{self._scope_label(scope)} ({exact / in_scope * 100:.1f}%)"
+                )
+        
+        return insights
     
     def _generate_comparative_insights(self, products: Dict, issues: Dict, 
-                                     question: str) -> Dict:
+                                     question: str,
+                                     corpus: Optional[AggregateStore] = None) -> Dict:
         """Generate comparative insights between products"""
         filtered_products = {k: v for k, v in products.items() if k != 'Unknown'}
         
@@ -507,7 +686,7 @@ class AdvancedFinancialRAG:
         
         sorted_products = sorted(filtered_products.items(), key=lambda x: x[1], reverse=True)
         
-        return {
+        insights = {
             "executive_summary": f"Comparative analysis across {len(filtered_products)} product categories.",
             "key_findings": [
                 f"Highest complaint volume: {sorted_products[0][0]} ({sorted_products[0][1]} complaints)",
@@ -525,16 +704,61 @@ class AdvancedFinancialRAG:
             ],
             "evidence_count": sum(filtered_products.values())
         }
+        
+        if corpus is not None:
+            # The sample ranks products by relevance; the cube ranks them by real volume
+            exact = sorted(((p, corpus.count(product=p)) for p in filtered_products),
+                           key=lambda x: x[1], reverse=True)
+            (high, high_n), (low, low_n) = exact[0], exact[-1]
+            insights["key_findings"].append(
+                f"Corpus-wide volume: {high} {high_n:,} vs {low} {low_n:,} complaints"
+                + (f" ({high_n / low_n:.1f}x)" if low_n else "")
+            )
+            insights["patterns_detected"].append(
+                f"Corpus distribution: {', '.join(f'{p}: {n:,}' for p, n in exact[:3])}"
+            )
+        
+        return insights
+    
+    def _summarize_periods(self, retrieved_data: Dict) -> List[Dict]:
+        """Per-bucket hit count, top issue and mean similarity, in date order"""
+        fields = self._fields(retrieved_data)
+        periods, offset = [], 0
+        for time_bucket in retrieved_data["time_buckets"]:
+            end = offset + time_bucket["count"]
+            issues = [issue for issue in fields["issue"][offset:end] if issue != 'General']
+            distances = [d for d in retrieved_data["distances"][offset:end] if d is not None]
+            periods.append({
+                "bucket": time_bucket["bucket"],
+                "count": time_bucket["count"],
+                "top_issue": max(set(issues), key=issues.count) if issues else None,
+                "avg_similarity": round((1 - sum(distances) / len(distances)) * 100, 1) if distances else None
+            })
+            offset = end
+        return periods
+    
+    @staticmethod
+    def _period_months(label: str) -> Optional[Tuple[str, str]]:
+        """First and last 'YYYY-MM' of a month, quarter or year bucket label (None for weeks)"""
+        try:
+            period = pd.Period(label)
+        except (ValueError, TypeError):
+            return None
+        if period.freqstr[0] not in "MQYA":
+            return None
+        return period.start_time.strftime("%Y-%m"), period.end_time.strftime("%Y-%m")
     
     def _generate_trend_insights(self, products: Dict, issues: Dict, 
-                               question: str) -> Dict:
+                               question: str, periods: Optional[List[Dict]] = None,
+                               corpus: Optional[AggregateStore] = None,
+                               scope: Optional[Dict] = None) -> Dict:
         """Generate trend analysis insights"""
         filtered_issues = {k: v for k, v in issues.items() if k != 'General'}
         top_issues = sorted(filtered_issues.items(), key=lambda x: x[1], reverse=True)[:5]
         
         total_issues = sum(filtered_issues.values()) if filtered_issues else sum(issues.values())
         
-        return {
+        insights = {
             "executive_summary": f"Trend analysis based on {sum(products.values())} relevant complaints.",
             "key_findings": [
                 f"Top trending issue: {top_issues[0][0]} ({top_issues[0][1]} occurrences)" if top_issues else "No trend data available",
@@ -551,31 +775,81 @@ class AdvancedFinancialRAG:
             ],
             "evidence_count": sum(products.values())
         }
-    
-    def _generate_root_cause_insights(self, products: Dict, issues: Dict, 
-                                    question: str) -> Dict:
-        """Generate root cause analysis insights"""
-        root_cause_categories = {
-            "Process Issues": ["delay", "slow", "wait", "pending", "processing", "time", "timely"],
-            "Communication Issues": ["notification", "inform", "tell", "communication", "update", "respond", "reply"],
-            "Technical Issues": ["error", "bug", "technical", "system", "website", "app", "online", "digital"],
-            "Policy Issues": ["fee", "charge", "policy", "term", "condition", "agreement", "contract"],
-            "Security Issues": ["fraud", "unauthorized", "theft", "scam", "security", "privacy", "identity"]
-        }
         
-        categorized_issues = {category: 0 for category in root_cause_categories.keys()}
+        if periods:
+            active = [p for p in periods if p["count"]]
+            insights["executive_summary"] = (f"Trend analysis based on {sum(products.values())} relevant "
+                                             f"complaints across {len(periods)} periods "
+                                             f"({periods[0]['bucket']} to {periods[-1]['bucket']}).")
+            scored = [p for p in active if p["avg_similarity"] is not None]
+            if scored:
+                peak = max(scored, key=lambda p: p["avg_similarity"])
+                insights["key_findings"].append(
+                    f"Closest match to the question: {peak['bucket']} ({peak['avg_similarity']}% similarity)"
+                )
+            if len(scored) >= 2:
+                change = scored[-1]["avg_similarity"] - scored[0]["avg_similarity"]
+                direction = "rising" if change > 0 else "falling" if change < 0 else "flat"
+                insights["patterns_detected"].append(
+                    f"Relevance {direction} over the period ({change:+.1f} points, "
+                    f"{scored[0]['bucket']} to {scored[-1]['bucket']})"
+                )
+            insights["patterns_detected"].extend(
+                f"{p['bucket']}: {p['count']} complaints, top issue {p['top_issue']}"
+                for p in active if p["top_issue"]
+            )
+            insights["periods"] = periods
+        
+        if corpus is not None:
+            scope = scope or {}
+            monthly = corpus.breakdown("month", **scope)
+            # Exact volume behind each retrieved period
+            for period in periods or []:
+                months = self._period_months(period["bucket"])
+                if months:
+                    period["corpus_count"] = sum(n for m, n in monthly
+                                                 if months[0] <= m <= months[1])
+            recent = monthly[-TREND_BUCKETS:]
+            if len(recent) >= 2 and recent[0][1]:
+                (first, first_n), (last, last_n) = recent[0], recent[-1]
+                insights["key_findings"].append(
+                    f"Corpus-wide monthly volume{self._scope_label(scope)}: {first_n:,} in {first} "
+                    f"to {last_n:,} in {last} ({(last_n - first_n) / first_n * 100:+.1f}%)"
+                )
+            if top_issues:
+                issue_months = corpus.breakdown("month", top=TREND_BUCKETS, issue=top_issues[0][0], **scope)
+                if issue_months:
+                    insights["patterns_detected"].append(
+                        f"'{top_issues[0][0]}' by month: "
+                        + ", ".join(f"{m}: {n:,}" for m, n in issue_months)
+                    )
         
-        for issue, count in issues.items():
+        return insights
+    
+    @staticmethod
+    def _categorize_root_causes(issue_counts) -> Dict[str, int]:
+        """Sum (issue, count) pairs into ROOT_CAUSE_CATEGORIES"""
+        categorized_issues = {category: 0 for category in ROOT_CAUSE_CATEGORIES.keys()}
+        
+        for issue, count in issue_counts:
             issue_lower = str(issue).lower()
-            for category, keywords in root_cause_categories.items():
+            for category, keywords in ROOT_CAUSE_CATEGORIES.items():
                 if any(keyword in issue_lower for keyword in keywords):
                     categorized_issues[category] += count
                     break
+        return categorized_issues
+    
+    def _generate_root_cause_insights(self, products: Dict, issues: Dict, 
+                                    question: str,
+                                    corpus: Optional[AggregateStore] = None,
+                                    scope: Optional[Dict] = None) -> Dict:
+        """Generate root cause analysis insights"""
+        categorized_issues = self._categorize_root_causes(issues.items())
         
         top_categories = sorted(categorized_issues.items(), key=lambda x: x[1], reverse=True)
         total_categorized = sum(categorized_issues.values())
         
-        return {
+        insights = {
             "executive_summary": f"Root cause analysis of {total_categorized} issue occurrences.",
             "key_findings": [
                 f"Primary root cause category: {top_categories[0][0]} ({top_categories[0][1]} issues)" if top_categories[0][1] > 0 else "No clear root cause pattern",
@@ -593,10 +867,28 @@ class AdvancedFinancialRAG:
             ],
             "evidence_count": total_categorized
         }
+        
+        if corpus is not None:
+            scope = scope or {}
+            exact = self._categorize_root_causes(corpus.breakdown("issue", **scope))
+            in_scope = corpus.count(**scope)
+            ranked = [(c, n) for c, n in sorted(exact.items(), key=lambda x: x[1], reverse=True) if n]
+            if ranked and in_scope:
+                insights["key_findings"].append(
+                    f"Corpus-wide root causes{self._scope_label(scope)}: "
+                    + ", ".join(f"{c} {n:,} ({n / in_scope * 100:.1f}%)" for c, n in ranked[:3])
+                )
+        
+        return insights
     
-    def ask(self, question: str, product_filter: Optional[str] = None) -> Dict:
+    def ask(self, question: str, product_filter: Optional[str] = None,
+            date_range: Optional[Tuple[str, str]] = None,
+            bucket: Optional[str] = None) -> Dict:
         """
         🎯 Main method: Ask a business question about complaints
+
+        date_range ("YYYY-MM-DD", "YYYY-MM-DD") and bucket ("week", "month",
+        "quarter", "year") restrict retrieval to top-k complaints per period.
         """
         # Update analytics
         self.analytics["query_log"].append({
@@ -608,57 +900,174 @@ class AdvancedFinancialRAG:
         
         # Step 1: Query Analysis
         query_analysis = self.analyze_query(question)
+        if product_filter is None and CENTROID_AUTO_FILTER:
+            product_filter = query_analysis.get("suggested_filter")
+        
+        # Step 1b: Paraphrase of a question already answered with the same settings?
+        answer_scope = None
+        if self.answer_cache is not None:
+            question_vector = self._embed([question])[0]
+            context = query_analysis["business_context"]
+            # The trend / comparative flags pick k and the insight generator
+            answer_scope = self.answer_cache.make_scope(
+                product_filter, self._collection_version(),
+                self._time_key(query_analysis, date_range, bucket),
+                context.get("needs_trend_analysis", False), context.get("is_comparative", False),
+                *self._rerank_key()
+            )
+            cached = self.answer_cache.get(question_vector, answer_scope)
+            if cached is not None:
+                return self._cached_answer(question, *cached)
         
         # Step 2: Intelligent Retrieval
         retrieved_data = self.retrieve_complaints(question, query_analysis, 
-                                                product_filter=product_filter)
+                                                product_filter=product_filter,
+                                                date_range=date_range, bucket=bucket)
+        
+        response = self._build_response(question, query_analysis, retrieved_data,
+                                        product_filter=product_filter)
+        if answer_scope is not None and retrieved_data["count"] > 0 and self._cacheable(retrieved_data):
+            self.answer_cache.put(question_vector, answer_scope, response, question)
+        return response
+    
+    def _cached_answer(self, question: str, response: Dict, match: Dict) -> Dict:
+        """An earlier answer re-issued for this question, with how close the match was"""
+        if self.verbose:
+            print(f"\n⚡ Answer cache hit ({match['similarity']:.2f} similar to "
+                  f"'{match['cached_question']}')")
+        self._record_result(response["retrieval_stats"]["total_complaints"])
+        return {**response, "question": question, "answer_cache": match}
+    
+    def ask_batch(self, questions: List[str],
+                  product_filters: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        📦 Answer many questions at once
+
+        Questions already in the result cache are answered from it. The
+        rest have all their enhanced queries encoded in one model call, and
+        questions sharing a product filter go to Chroma as one
+        multi-embedding query. Each response has the same shape as ask().
+        """
+        if product_filters is None:
+            product_filters = [None] * len(questions)
+        if len(product_filters) != len(questions):
+            raise ValueError("product_filters must line up with questions")
+        product_filters = list(product_filters)
+        
+        # Warm the query-vector LRU in one call so classification is free per question
+        if self.classifier is not None and questions:
+            self._embed(list(questions))
+        
+        version = self._collection_version()
+        retrieved: List[Optional[Dict]] = [None] * len(questions)
+        analyses, ks, keys, query_ids, query_rows, all_queries = [], [], [], [], [], []
+        for i, (question, product_filter) in enumerate(zip(questions, product_filters)):
+            self.analytics["query_log"].append({
+                "timestamp": datetime.now().isoformat(),
+                "question": question,
+                "filter": product_filter
+            })
+            self.analytics["performance_stats"]["total_queries"] += 1
+            query_ids.append(len(self.analytics["query_log"]))
+            
+            analysis = self.analyze_query(question)
+            if product_filter is None and CENTROID_AUTO_FILTER:
+                product_filter = product_filters[i] = analysis.get("suggested_filter")
+            k = self._adjust_k(analysis, RETRIEVAL_K)
+            analyses.append(analysis)
+            ks.append(k)
+            keys.append(self.result_cache.make_key(question, product_filter, k, version,
+                                                   *self._rerank_key()))
+            
+            # Trend questions run one search per time bucket
+            if analysis["business_context"].get("needs_trend_analysis", False):
+                retrieved[i] = self.retrieve_complaints(question, analysis, product_filter=product_filter)
+                query_rows.append([])
+                continue
+            
+            # Cached questions need no encoding or search
+            retrieved[i] = self.result_cache.get(keys[i])
+            if retrieved[i] is not None:
+                query_rows.append([])
+                continue
+            enhanced_queries = self.query_analyzer.enhance_query(question, analysis)[:RETRIEVAL_QUERY_VARIANTS]
+            query_rows.append(list(range(len(all_queries), len(all_queries) + len(enhanced_queries))))
+            all_queries.extend(enhanced_queries)
+        
+        if self.verbose:
+            cached_count = sum(r is not None for r in retrieved)
+            print(f"\n📦 Batch: {len(questions)} questions, {len(all_queries)} queries "
+                  f"({cached_count} cached)")
+        
+        # One encode call for the whole batch
+        embeddings = self._embed(all_queries) if all_queries else []
+        
+        # One Chroma round-trip per distinct filter
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, product_filter in enumerate(product_filters):
+            if retrieved[i] is None:
+                groups.setdefault(product_filter, []).append(i)
         
+        for product_filter, members in groups.items():
+            rows = [row for i in members for row in query_rows[i]]
+            try:
+                results = query_complaints(
+                    self.collection, [embeddings[row] for row in rows],
+                    n_results=max(self._fetch_k(ks[i]) for i in members),
+                    where=self._build_where_filter(product_filter)
+                )
+            except Exception as e:
+                if self.verbose:
+                    print(f"   ⚠️ Batch query error: {str(e)[:100]}")
+                # Fall back to one retrieval per question
+                for i in members:
+                    retrieved[i] = self.retrieve_complaints(questions[i], analyses[i],
+                                                            product_filter=product_filter)
+                continue
+            
+            # Result rows follow the order of the embeddings we sent
+            position = {row: n for n, row in enumerate(rows)}
+            for i in members:
+                retrieved[i] = self._collect_retrieved(
+                    results, [position[row] for row in query_rows[i]], ks[i], analyses[i],
+                    questions[i]
+                )
+                if self._cacheable(retrieved[i]):
+                    self.result_cache.put(keys[i], retrieved[i])
+        
+        return [self._build_response(question, analysis, retrieved_data, query_id, product_filter)
+                for question, analysis, retrieved_data, query_id, product_filter
+                in zip(questions, analyses, retrieved, query_ids, product_filters)]
+    
+    def _build_response(self, question: str, query_analysis: Dict,
+                        retrieved_data: Dict, query_id: Optional[int] = None,
+                        product_filter: Optional[str] = None) -> Dict:
+        """Score, explain and package one question's retrieval"""
         # Step 3: Confidence Scoring
         confidence = self.calculate_confidence_score(retrieved_data)
         
         # Step 4: Business Insights Generation
-        insights = self.generate_business_insights(question, retrieved_data, confidence)
+        insights = self.generate_business_insights(question, retrieved_data, confidence, product_filter)
         
         # Step 5: Prepare Sources with Details
         sources = []
-        for i, (meta, distance) in enumerate(zip(retrieved_data["metadata"], 
-                                                retrieved_data.get("distances", [])), 1):
-            similarity = (1 - distance) * 100 if distance is not None else 0
-            
-            product = self._get_product_from_metadata(meta)
-            issue = self._get_issue_from_metadata(meta)
-            company = self._extract_metadata_field(meta, ['company', 'Company', 'bank', 'Bank'], 'Unknown')
-            state = self._extract_metadata_field(meta, ['state', 'State', 'location', 'Location'], 'Unknown')
-            date_received = self._extract_metadata_field(meta, ['date_received', 'date', 'Date', 'received_date'], 'Unknown')
-            
+        fields = self._fields(retrieved_data)
+        similarities = np.nan_to_num((1 - self._distances(retrieved_data)) * 100).round(1).tolist()
+        for i, (similarity, product, issue, company, state, date_received) in enumerate(zip(
+                similarities, fields["product"], fields["issue"],
+                fields["company"], fields["state"], fields["date_received"]), 1):
             sources.append({
                 "source_id": i,
                 "product": product,
                 "issue": issue,
                 "company": company,
                 "state": state,
-                "similarity_score": round(similarity, 1),
+                "similarity_score": similarity,
                 "date_received": date_received
             })
+        codes = {name: values[:len(sources)] for name, values in self._codes(retrieved_data).items()}
         
-        # Update success rate
-        if retrieved_data["count"] > 0:
-            self.analytics["performance_stats"]["successful_queries"] += 1
-        
-        # Update average metrics
-        total_queries = self.analytics["performance_stats"]["total_queries"]
-        successful_queries = self.analytics["performance_stats"]["successful_queries"]
-        
-        self.analytics["performance_stats"]["success_rate"] = (
-            successful_queries / total_queries * 100 if total_queries > 0 else 0
-        )
-        
-        # Update average retrieval count
-        total_retrieved = self.analytics["performance_stats"].get("total_retrieved", 0) + retrieved_data["count"]
-        self.analytics["performance_stats"]["total_retrieved"] = total_retrieved
-        self.analytics["performance_stats"]["avg_retrieval_count"] = (
-            total_retrieved / total_queries if total_queries > 0 else 0
-        )
+        self._record_result(retrieved_data["count"])
         
         # Compile final response
         response = {
@@ -669,12 +1078,12 @@ class AdvancedFinancialRAG:
             "sources": sources,
             "retrieval_stats": {
                 "total_complaints": retrieved_data["count"],
-                "products_covered": len(set(s["product"] for s in sources if s["product"] != 'Unknown')),
-                "issues_identified": len(set(s["issue"] for s in sources if s["issue"] != 'General')),
+                "products_covered": int(np.unique(codes["product"][codes["product"] >= 0]).size),
+                "issues_identified": int(np.unique(codes["issue"][codes["issue"] >= 0]).size),
                 "retrieval_time": retrieved_data["retrieval_time"]
             },
             "system_analytics": {
-                "query_id": len(self.analytics["query_log"]),
+                "query_id": query_id or len(self.analytics["query_log"]),
                 "success": retrieved_data["count"] > 0,
                 "timestamp": datetime.now().isoformat()
             }
@@ -682,6 +1091,27 @@ class AdvancedFinancialRAG:
         
         return response
     
+    def _record_result(self, retrieved_count: int):
+        """Fold one answered question into the success rate and average retrieval count"""
+        # Update success rate
+        if retrieved_count > 0:
+            self.analytics["performance_stats"]["successful_queries"] += 1
+        
+        # Update average metrics
+        total_queries = self.analytics["performance_stats"]["total_queries"]
+        successful_queries = self.analytics["performance_stats"]["successful_queries"]
+        
+        self.analytics["performance_stats"]["success_rate"] = (
+            successful_queries / total_queries * 100 if total_queries > 0 else 0
+        )
+        
+        # Update average retrieval count
+        total_retrieved = self.analytics["performance_stats"].get("total_retrieved", 0) + retrieved_count
+        self.analytics["performance_stats"]["total_retrieved"] = total_retrieved
+        self.analytics["performance_stats"]["avg_retrieval_count"] = (
+            total_retrieved / total_queries if total_queries > 0 else 0
+        )
+    
     def get_performance_report(self) -> Dict:
         """📈 Get system performance analytics report"""
         stats = self.analytics["performance_stats"]
@@ -694,6 +1124,9 @@ class AdvancedFinancialRAG:
                 "system_uptime": "Active"
             },
             "recent_queries": self.analytics["query_log"][-5:] if self.analytics["query_log"] else [],
+            "result_cache": self.result_cache.report(),
+            "answer_cache": self.answer_cache.report() if self.answer_cache is not None else None,
+            "reranker": self.reranker.report() if self.reranker is not None else None,
             "recommendations": [
                 "System performing well for business queries" if stats["success_rate"] > 70 else "Consider improving query understanding",
                 "Good complaint retrieval coverage" if stats.get("avg_retrieval_count", 0) >= 3 else "May need more diverse complaint data",
@@ -701,45 +1134,64 @@ class AdvancedFinancialRAG:
             ]
         }
     
+    def _unique_complaints(self) -> Optional[int]:
+        """Exact complaint count: the FAISS chunk->complaint map, or the ingest manifest"""
+        if isinstance(self.collection, FaissIndex):
+            return self.collection.complaint_count()
+        if self.vector_store_path:
+            import pyarrow.parquet as pq
+
+            manifest_path = os.path.join(self.vector_store_path, INGEST_MANIFEST.format(
+                collection=getattr(self.collection, "name", "collection")))
+            if os.path.exists(manifest_path):
+                return pq.ParquetFile(manifest_path).metadata.num_rows
+        return None
+
     def get_dataset_statistics(self) -> Dict:
         """Get dataset statistics for reporting."""
         count = self.collection.count()
         
-        # Sample metadata to get statistics
+        # Sample metadata to get statistics (peek returns one flat list)
         results = self.collection.peek(limit=100)
-        metadatas = results['metadatas']
+        metadatas = results['metadatas'] or []
         
+        unique_complaints = self._unique_complaints()
         stats = {
             "total_complaint_chunks": count,
-            "estimated_unique_complaints": count // 3,
+            "estimated_unique_complaints": unique_complaints if unique_complaints is not None else count // 3,
+            "unique_complaints_exact": unique_complaints is not None,
             "product_categories": set(),
             "issues": set(),
             "sample_products": [],
             "sample_issues": []
         }
         
-        if metadatas:
-            for meta_list in metadatas[:10]:
-                for meta in meta_list:
-                    product = self._get_product_from_metadata(meta)
-                    issue = self._get_issue_from_metadata(meta)
-                    
-                    if product != 'Unknown':
-                        stats["product_categories"].add(product)
-                    if issue != 'General':
-                        stats["issues"].add(issue)
-                    
-                    if len(stats["sample_products"]) < 5 and product != 'Unknown':
-                        stats["sample_products"].append(product)
-                    if len(stats["sample_issues"]) < 5 and issue != 'General':
-                        stats["sample_issues"].append(issue)
+        for meta in metadatas:
+            product = self._get_product_from_metadata(meta)
+            issue = self._get_issue_from_metadata(meta)
+            
+            if product != 'Unknown':
+                stats["product_categories"].add(product)
+            if issue != 'General':
+                stats["issues"].add(issue)
+            
+            if len(stats["sample_products"]) < 5 and product != 'Unknown':
+                stats["sample_products"].append(product)
+            if len(stats["sample_issues"]) < 5 and issue != 'General':
+                stats["sample_issues"].append(issue)
         
         stats["unique_product_categories"] = len(stats["product_categories"])
         stats["unique_issues"] = len(stats["issues"])
         
+        corpus = self._aggregates()
+        if corpus is not None:
+            # Exact corpus-wide counts instead of the 100-chunk sample
+            stats["corpus_aggregates"] = corpus.report()
+            stats["unique_product_categories"] = stats["corpus_aggregates"]["products"]
+            stats["unique_issues"] = stats["corpus_aggregates"]["issues"]
+        
         return stats
 
-
 def print_detailed_response(response: Dict):
     """
     📊 Professional response formatting for business users
@@ -0,0 +1,123 @@
+"""
+Cross-encoder reranking of first-stage retrieval results
+
+Retrieval fetches RERANK_CANDIDATES hits cheaply; the cross-encoder then
+scores every (question, chunk) pair in one batch and keeps the best k. The
+model call runs under a time budget: when it overruns, the first-stage
+order is returned and the late scores are discarded.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import RERANK_MODEL, RERANK_CANDIDATES, RERANK_TIMEOUT, RERANK_BATCH_SIZE
+
+_rerankers: Dict[str, "CrossEncoderReranker"] = {}
+_lock = threading.Lock()
+
+# Per-hit lists in retrieved / fused results, reordered together
+HIT_KEYS = ("chunks", "metadata", "distances", "fusion_scores", "row_ids")
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder with a bounded candidate count and time budget"""
+
+    def __init__(self, model_name: str = RERANK_MODEL,
+                 candidates: int = RERANK_CANDIDATES,
+                 timeout: float = RERANK_TIMEOUT,
+                 batch_size: int = RERANK_BATCH_SIZE):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name)
+        self.candidates = candidates
+        self.timeout = timeout
+        self.batch_size = batch_size
+        # One worker: a scoring call that overran still finishes in the background
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._pending = None
+        self._pending_deadline = 0.0
+        self._submit_lock = threading.Lock()
+        self.stats = {"reranked": 0, "timeouts": 0, "busy": 0, "errors": 0, "total_ms": 0.0}
+
+    def first_stage_k(self, k: int) -> int:
+        """How many hits first-stage retrieval should return for a final k"""
+        return max(k, self.candidates)
+
+    def score(self, question: str, chunks: List[str]) -> np.ndarray:
+        pairs = [(question, chunk) for chunk in chunks]
+        return np.asarray(self.model.predict(pairs, batch_size=self.batch_size,
+                                             show_progress_bar=False), dtype=np.float32)
+
+    def rerank(self, question: str, retrieved: Dict, k: int,
+               timeout: Optional[float] = None) -> Dict:
+        """
+        Reorder the top candidates of retrieved by cross-encoder score and
+        cut to k; 'rerank' records whether scores were applied and how long
+        they took
+        """
+        timeout = self.timeout if timeout is None else timeout
+        n = min(len(retrieved["chunks"]), self.candidates)
+        started = time.perf_counter()
+        reason = None
+        try:
+            with self._submit_lock:
+                # Don't queue behind a call that already overran its budget
+                busy = (self._pending is not None and not self._pending.done()
+                        and started > self._pending_deadline)
+                if not busy:
+                    future = self._executor.submit(self.score, question, retrieved["chunks"][:n])
+                    self._pending, self._pending_deadline = future, started + timeout
+            if busy:
+                scores, reason = None, "busy"
+                self.stats["busy"] += 1
+            else:
+                scores = future.result(timeout=max(0.0, timeout - (time.perf_counter() - started)))
+        except FutureTimeout:
+            scores, reason = None, "timeout"
+            self.stats["timeouts"] += 1
+        except Exception as e:
+            scores, reason = None, f"error: {str(e)[:100]}"
+            self.stats["errors"] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        out = dict(retrieved)
+        if scores is None:
+            # Over budget or failed: keep the first-stage order
+            for key in HIT_KEYS:
+                if key in out:
+                    out[key] = list(out[key][:k])
+        else:
+            order = np.argsort(-scores, kind="stable")[:k]
+            for key in HIT_KEYS:
+                if key in out:
+                    out[key] = [out[key][i] for i in order]
+            out["rerank_scores"] = [round(float(scores[i]), 4) for i in order]
+            self.stats["reranked"] += 1
+            self.stats["total_ms"] += elapsed_ms
+        out["rerank"] = {"applied": scores is not None, "candidates": n,
+                         "elapsed_ms": round(elapsed_ms, 1), "reason": reason}
+        return out
+
+    def report(self) -> Dict:
+        reranked = self.stats["reranked"]
+        return {**self.stats,
+                "avg_ms": round(self.stats["total_ms"] / reranked, 1) if reranked else 0.0}
+
+
+def get_reranker(model_name: str = RERANK_MODEL) -> CrossEncoderReranker:
+    """Load the cross-encoder on first use and share it across the process"""
+    with _lock:
+        if model_name not in _rerankers:
+            _rerankers[model_name] = CrossEncoderReranker(model_name)
+        return _rerankers[model_name]
+
+
+def relevance(scores: List[float]) -> float:
+    """Mean sigmoid of cross-encoder logits, a 0-1 relevance for confidence scoring"""
+    if not scores:
+        return 0.0
+    return float(np.mean(1.0 / (1.0 + np.exp(-np.asarray(scores, dtype=np.float64)))))
@@ -2,22 +2,33 @@
 Advanced retriever with hybrid search
 """
 import chromadb
-from sentence_transformers import SentenceTransformer
 from typing import Dict, List, Optional
 from src.config import *
+from src.bm25_index import BM25Index
+from src.embeddings import get_embedder, embed_queries
+from src.fusion import fuse_query_results, result_key
 from src.query_enhancer import QueryEnhancer
-from src.vector_store import get_chroma_collection  # NEW IMPORT
+from src.vector_index import get_vector_index, query_complaints
 
 class HybridRetriever:
     """Combines semantic and keyword retrieval"""
     
     def __init__(self):
-        self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+        self.embedder = get_embedder()
         self.query_enhancer = QueryEnhancer()
         
-        # Get or create ChromaDB collection
-        print("📚 Loading ChromaDB collection...")
-        self.collection = get_chroma_collection()
+        # Chroma collection or FAISS index, per VECTOR_BACKEND
+        print(f"📚 Loading {VECTOR_BACKEND} vector index...")
+        self.collection = get_vector_index()
+        
+        # Keyword side (python -m src.bm25_index builds it)
+        try:
+            self.keyword_index = BM25Index.load(BM25_INDEX_DIR)
+            print(f"🔤 BM25 index: {len(self.keyword_index):,} chunks, "
+                  f"{len(self.keyword_index.term_ids):,} terms")
+        except FileNotFoundError:
+            self.keyword_index = None
+            print(f"⚠️ No BM25 index at {BM25_INDEX_DIR}; keyword retrieval disabled")
         
         print(f"✅ HybridRetriever ready with {self.collection.count()} chunks")
     
@@ -28,12 +39,8 @@ class HybridRetriever:
         if filter_product:
             where_filter = {"product_category": {"$eq": filter_product}}
         
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"]
-        )
+        # k distinct complaints rather than k chunks of the same few
+        results = query_complaints(self.collection, embed_queries([query]), k, where=where_filter)
         
         return {
             "method": "semantic",
@@ -42,6 +49,20 @@ class HybridRetriever:
             "distances": results['distances'][0] if results['distances'] else []
         }
     
+    def keyword_retrieve(self, query: str, k: int = 3,
+                         filter_product: Optional[str] = None) -> Dict:
+        """BM25 keyword search"""
+        if self.keyword_index is None:
+            return {"method": "keyword", "chunks": [], "metadata": [], "scores": []}
+        where_filter = {"product_category": {"$eq": filter_product}} if filter_product else None
+        results = self.keyword_index.query([query], n_results=k, where=where_filter)
+        return {
+            "method": "keyword",
+            "chunks": results['documents'][0],
+            "metadata": results['metadatas'][0],
+            "scores": results['scores'][0]
+        }
+    
     def hybrid_retrieve(self, question: str, k: int = RETRIEVAL_K,
                        filter_product: Optional[str] = None) -> Dict:
         """Combine semantic and keyword retrieval"""
@@ -50,7 +71,7 @@ class HybridRetriever:
         
         # Analyze query
         query_analysis = self.query_enhancer.analyze_query(question)
-        print(f"   Query Type: {query_analysis['type'].upper()}")
+        print(f"   Query Type: {query_analysis['query_type'].upper()}")
         if query_analysis['products']:
             print(f"   Products: {', '.join(query_analysis['products'])}")
         
@@ -58,39 +79,44 @@ class HybridRetriever:
         enhanced_queries = self.query_enhancer.enhance_query(question, query_analysis)
         print(f"   Enhanced queries: {len(enhanced_queries)} variations")
         
-        # Run semantic retrieval on top queries
-        semantic_results = []
-        for enhanced_query in enhanced_queries[:2]:  # Use top 2 enhanced queries
-            result = self.semantic_retrieve(enhanced_query, k=k//2, 
-                                          filter_product=filter_product)
-            
-            # Add method tag
-            for chunk, meta, dist in zip(result['chunks'], result['metadata'], result['distances']):
-                semantic_results.append((chunk, meta, dist, f"semantic_{enhanced_query[:20]}..."))
+        # Encode both variants in one pass; semantic_retrieve then hits the query-vector LRU
+        embed_queries(enhanced_queries[:2])
         
-        # Sort by distance and deduplicate
-        all_results = semantic_results
-        all_results.sort(key=lambda x: x[2])  # Sort by distance
+        # One ranked list per method: semantic on the top 2 enhanced queries,
+        # BM25 on the question as asked (exact terms, names, numbers)
+        ranked_lists = [self.semantic_retrieve(enhanced_query, k=k, filter_product=filter_product)
+                        for enhanced_query in enhanced_queries[:2]]
+        labels = [f"semantic_{enhanced_query[:20]}..." for enhanced_query in enhanced_queries[:2]]
+        keyword = self.keyword_retrieve(question, k=k, filter_product=filter_product)
+        if keyword["chunks"]:
+            ranked_lists.append(keyword)
+            labels.append("keyword_bm25")
         
-        # Deduplicate
-        seen = set()
-        final_results = []
-        for chunk, meta, dist, method in all_results:
-            chunk_hash = hash(chunk[:150])  # Check first 150 chars
-            if chunk_hash not in seen:
-                seen.add(chunk_hash)
-                final_results.append((chunk, meta, dist, method))
+        # Reciprocal rank fusion across the lists
+        results = {
+            "documents": [r["chunks"] for r in ranked_lists],
+            "metadatas": [r["metadata"] for r in ranked_lists],
+            "distances": [r.get("distances") or [None] * len(r["chunks"]) for r in ranked_lists]
+        }
+        fused = fuse_query_results(results, list(range(len(ranked_lists))), limit=k)
         
-        # Take top k
-        final_results = final_results[:k]
+        # Which methods found each hit
+        found_by = {}
+        for label, r in zip(labels, ranked_lists):
+            for chunk, meta in zip(r["chunks"], r["metadata"]):
+                found_by.setdefault(result_key(meta, chunk), []).append(label)
+        methods = [" + ".join(dict.fromkeys(found_by[result_key(meta, chunk)]))
+                   for chunk, meta in zip(fused["chunks"], fused["metadata"])]
         
-        print(f"   Retrieved: {len(final_results)} unique chunks")
+        print(f"   Retrieved: {len(fused['chunks'])} unique chunks "
+              f"({sum('keyword_bm25' in m for m in methods)} with keyword matches)")
         
         return {
-            "chunks": [r[0] for r in final_results],
-            "metadata": [r[1] for r in final_results],
-            "distances": [r[2] for r in final_results],
-            "retrieval_methods": [r[3] for r in final_results],
+            "chunks": fused["chunks"],
+            "metadata": fused["metadata"],
+            "distances": fused["distances"],
+            "fusion_scores": fused["fusion_scores"],
+            "retrieval_methods": methods,
             "query_analysis": query_analysis,
-            "total_retrieved": len(final_results)
-        }
\ No newline at end of file
+            "total_retrieved": len(fused["chunks"])
+        }
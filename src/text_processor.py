@@ -1,33 +1,103 @@
 """Text processing utilities"""
 import re
 import pandas as pd
-from typing import List, Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 import logging
 
+from .config import TEXT_CLEAN_WORKERS, TEXT_CLEAN_CHUNK_ROWS
+
 logger = logging.getLogger(__name__)
 
+# Python's re classes spelled for RE2, whose \s, \S, \d, \w and \b are ASCII-only
+PY_SPACE = r'\t-\r\x{1c}-\x{1f}\x{85}\p{Z}'   # \s (what str.isspace accepts)
+PY_WORD = r'\p{L}\p{N}_'                      # \w
+PY_DIGIT = r'\p{Nd}'                          # \d
+
+# The original sequential re rules (emails, URLs, SSNs, long numbers,
+# XXXX, special chars, whitespace) as RE2 passes, each match replaced by
+# a space. Rules share a pass only where no removal can change what another
+# matches; long numbers get their own pass because removing an email, URL
+# or SSN can give a digit run a new word boundary.
+CLEANING_PASSES = [
+    # Emails, URLs, SSN: each match covers or stays clear of the others
+    (rf'[^{PY_SPACE}]+@[^{PY_SPACE}]+|http[^{PY_SPACE}]+|www\.[^{PY_SPACE}]+'
+     rf'|{PY_DIGIT}{{3}}-{PY_DIGIT}{{2}}-{PY_DIGIT}{{4}}', ' '),
+    # Long numbers; without lookaround the boundary characters are matched
+    # and put back, so a number sharing one with the previous match is
+    # left for the second run of this pass
+    (rf'(^|[^{PY_WORD}]){PY_DIGIT}{{10,}}($|[^{PY_WORD}])', r'\1 \2'),
+    (rf'(^|[^{PY_WORD}]){PY_DIGIT}{{10,}}($|[^{PY_WORD}])', r'\1 \2'),
+    # XXXX placeholders and special chars (word vs non-word characters, disjoint)
+    (rf'xxxx|[^{PY_WORD}{PY_SPACE}]', ' '),
+    (rf'[{PY_SPACE}]+', ' '),
+]
+
+TextInput = Union[pa.Array, pa.ChunkedArray, pd.Series, List[Optional[str]]]
+
+
+def _clean_chunk(texts: pa.Array) -> pa.Array:
+    """Lowercase, strip PII and punctuation, collapse whitespace (Arrow kernels, GIL released)"""
+    texts = pc.fill_null(texts, '')
+    lowered = pc.utf8_lower(texts)
+    # Arrow lowercases char by char; str.lower() also turns 'İ' into 'i' plus a
+    # combining dot and a word-final 'Σ' into 'ς', so those (rare) rows use it
+    special = pc.match_substring_regex(texts, '[İΣ]')
+    if pc.any(special).as_py():
+        python_lowered = [t.lower() for t in pc.filter(texts, special).to_pylist()]
+        lowered = pc.replace_with_mask(lowered, special, pa.array(python_lowered, lowered.type))
+    texts = lowered
+    for pattern, replacement in CLEANING_PASSES:
+        texts = pc.replace_substring_regex(texts, pattern, replacement)
+    return pc.utf8_trim(texts, ' ')
+
+
+def _as_arrow(texts: TextInput) -> pa.Array:
+    if isinstance(texts, pa.ChunkedArray):
+        texts = texts.combine_chunks()
+    elif isinstance(texts, pd.Series):
+        try:
+            texts = pa.array(texts, from_pandas=True)  # NaN -> null; zero-copy for Arrow-backed str
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            texts = texts.tolist()
+    if not isinstance(texts, pa.Array):
+        texts = pa.array([None if pd.isna(t) else str(t) for t in texts], pa.large_string())
+    if not pa.types.is_large_string(texts.type):
+        texts = texts.cast(pa.large_string())
+    return texts
+
+
+def clean_texts(texts: TextInput, workers: int = TEXT_CLEAN_WORKERS,
+                chunk_rows: int = TEXT_CLEAN_CHUNK_ROWS) -> pa.Array:
+    """
+    The one cleaning engine for narratives and queries: the rules run as
+    ordered RE2 passes (CLEANING_PASSES) over an Arrow string array, in
+    chunk_rows slices spread across worker threads. Nulls become ''.
+    """
+    texts = _as_arrow(texts)
+    if len(texts) <= chunk_rows or workers <= 1:
+        return _clean_chunk(texts)
+    slices = [texts.slice(start, chunk_rows) for start in range(0, len(texts), chunk_rows)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clean") as executor:
+        cleaned = list(executor.map(_clean_chunk, slices))
+    return pa.chunked_array(cleaned).combine_chunks()
+
+
+def clean_query(text: str) -> str:
+    """Single-string form of clean_texts, so queries match the cleaned corpus"""
+    return clean_texts([text])[0].as_py()
+
+
 def clean_text_batch(texts: pd.Series) -> pd.Series:
     """
     Fast batch text cleaning without NLTK
     """
-    # Convert to string and lowercase
-    cleaned = texts.fillna('').astype(str).str.lower()
-    
-    # Remove PII and patterns
-    patterns = [
-        (r'\S+@\S+', ' '),  # Emails
-        (r'http\S+|www\.\S+', ' '),  # URLs
-        (r'\d{3}-\d{2}-\d{4}', ' '),  # SSN
-        (r'\b\d{10,}\b', ' '),  # Long numbers
-        (r'xxxx', ' '),  # Common placeholder
-        (r'[^\w\s]', ' '),  # Remove special chars
-        (r'\s+', ' '),  # Remove extra spaces
-    ]
-    
-    for pattern, replacement in patterns:
-        cleaned = cleaned.str.replace(pattern, replacement, regex=True)
-    
-    return cleaned.str.strip()
+    cleaned = clean_texts(texts).to_pandas()
+    cleaned.index, cleaned.name = texts.index, texts.name
+    return cleaned
+
 
 def analyze_vocabulary(texts: pd.Series, top_n: int = 20) -> dict:
     """Analyze vocabulary from text series"""
@@ -67,4 +137,4 @@ def calculate_sentiment_simple(texts: pd.Series) -> pd.Series:
         word_count = len(text_lower.split())
         return -negative_count / max(word_count, 1)
     
-    return texts.apply(text_sentiment)
\ No newline at end of file
+    return texts.apply(text_sentiment)
@@ -0,0 +1,753 @@
+"""
+Pluggable vector index: one query surface over Chroma and FAISS
+
+Both backends answer query() with Chroma-shaped results (lists of lists of
+ids, documents, metadatas and cosine distances), so the RAG classes, the
+fusion stage and the result cache work unchanged on either one.
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import (
+    VECTOR_BACKEND, VECTOR_STORE_DIR, COLLECTION_NAME,
+    FAISS_INDEX_PATH, FAISS_METADATA_PATH, FAISS_LEGACY_METADATA_PATH, FAISS_FILTER_OVERFETCH,
+    FAISS_VECTORS_PATH, FAISS_INDEX_MODE, FAISS_NLIST, FAISS_PQ_M,
+    FAISS_TRAIN_SAMPLE, FAISS_NPROBE, FAISS_RERANK_CANDIDATES, FAISS_PREFILTER_EXACT_ROWS,
+    PRODUCT_CATEGORIES, TREND_BUCKET, TREND_BUCKETS, TREND_OVERFETCH, FAISS_COMPLAINTS_PATH,
+    COMPLAINT_SCORING, COMPLAINT_OVERFETCH, COMPLAINT_FETCH_LIMIT
+)
+from .bitmap_index import BitmapIndex
+from .date_index import DateIndex, in_bucket, time_buckets, trailing_range
+from .fusion import result_key
+from .metadata_store import MetadataStore, MetadataWriter, canonical_where, normalize_record
+from .vector_store import get_chroma_collection
+
+
+def product_where_filter(product_filter: Optional[str]) -> Optional[Dict]:
+    """Where clause matching every stored spelling of a product name"""
+    if not product_filter:
+        return None
+    values = PRODUCT_CATEGORIES.get(product_filter.lower())
+    if values is None:
+        return None
+    return {
+        "$or": [
+            {"product_category": {"$in": values}},
+            {"product": {"$in": values}}
+        ]
+    }
+
+
+def matches_where(meta: Optional[Dict], where: Optional[Dict]) -> bool:
+    """Evaluate the subset of Chroma's where syntax the RAG classes use"""
+    if not where:
+        return True
+    meta = meta or {}
+    for field, condition in where.items():
+        if field == "$or":
+            if not any(matches_where(meta, clause) for clause in condition):
+                return False
+        elif field == "$and":
+            if not all(matches_where(meta, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = meta.get(field)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif meta.get(field) != condition:
+            return False
+    return True
+
+
+class VectorIndex(ABC):
+    """Interface shared by the Chroma and FAISS backends"""
+
+    name = "vector_index"
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of chunks in the index"""
+
+    @abstractmethod
+    def query(self, query_embeddings: Optional[List[List[float]]] = None,
+              n_results: int = 10, where: Optional[Dict] = None,
+              include: Optional[List[str]] = None,
+              query_texts: Optional[List[str]] = None) -> Dict:
+        """Nearest chunks per query embedding, in Chroma's result shape"""
+
+    @abstractmethod
+    def peek(self, limit: int = 10) -> Dict:
+        """First limit chunks, in Chroma's get() shape"""
+
+
+class ChromaIndex(VectorIndex):
+    """Thin wrapper; anything beyond the interface goes straight to the collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = getattr(collection, "name", COLLECTION_NAME)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def query(self, query_embeddings=None, n_results=10, where=None,
+              include=None, query_texts=None) -> Dict:
+        if query_embeddings is None and query_texts is not None:
+            from .embeddings import embed_queries
+            query_embeddings = embed_queries(query_texts)
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=include or ["documents", "metadatas", "distances"]
+        )
+
+    def peek(self, limit: int = 10) -> Dict:
+        return self.collection.peek(limit=limit)
+
+    def __getattr__(self, attr):
+        if attr == "collection":
+            raise AttributeError(attr)
+        return getattr(self.collection, attr)
+
+
+class FaissIndex(VectorIndex):
+    """
+    Serves a FAISS index plus per-row metadata (a memory-mapped
+    MetadataStore from build_faiss_index; the chunking notebook's list of
+    dicts is converted on load); the chunk text lives under 'chunk_text'.
+    Results also carry 'row_ids', so callers can read fields straight from
+    `metadata_store` columns.
+
+    For compressed (IVF-PQ) indexes, `nprobe` partitions are scanned and the
+    top `rerank_candidates` PQ hits are re-scored exactly against the
+    memory-mapped float matrix, when one is available. A flat build has no
+    FAISS index at all (index=None): every search is an exact scan of that
+    matrix, so it stays on disk instead of being copied into RAM.
+    """
+
+    def __init__(self, index, metadata: Union[MetadataStore, List[Dict]],
+                 name: str = "faiss_complaints",
+                 vectors: Optional[np.ndarray] = None,
+                 complaint_codes: Optional[np.ndarray] = None,
+                 nprobe: int = FAISS_NPROBE,
+                 rerank_candidates: int = FAISS_RERANK_CANDIDATES):
+        import faiss
+
+        if index is None and vectors is None:
+            raise ValueError("A flat FaissIndex (index=None) needs the vector matrix")
+        self.index = index
+        if not isinstance(metadata, MetadataStore):
+            metadata = MetadataStore.from_records(metadata)
+        self.metadata = metadata
+        self.name = name
+        self.vectors = vectors
+        self.rerank_candidates = rerank_candidates
+        try:
+            self._ivf = faiss.extract_index_ivf(index) if index is not None else None
+        except RuntimeError:
+            self._ivf = None
+        self.nprobe = nprobe
+        self._bitmaps: Optional[BitmapIndex] = None
+        self._date_index: Optional[DateIndex] = None
+        if complaint_codes is not None and len(complaint_codes) != len(metadata):
+            complaint_codes = None
+        self._complaint_codes = complaint_codes
+        if self.count() != len(metadata):
+            print(f"⚠️ FAISS index has {self.count():,} vectors but "
+                  f"{len(metadata):,} metadata entries")
+
+    @property
+    def metadata_store(self) -> MetadataStore:
+        return self.metadata
+
+    @property
+    def bitmaps(self) -> BitmapIndex:
+        if self._bitmaps is None:
+            self._bitmaps = BitmapIndex(self.metadata)
+        return self._bitmaps
+
+    @property
+    def date_index(self) -> DateIndex:
+        if self._date_index is None:
+            self._date_index = DateIndex.from_store(self.metadata)
+        return self._date_index
+
+    @property
+    def complaint_codes(self) -> np.ndarray:
+        """Chunk row -> dense complaint index (-1 without a complaint ID)"""
+        if self._complaint_codes is None:
+            self._complaint_codes = self.metadata.complaint_codes()
+        return self._complaint_codes
+
+    def complaint_count(self) -> int:
+        """Distinct complaints behind the indexed chunks"""
+        codes = self.complaint_codes
+        return int(codes.max()) + 1 if len(codes) else 0
+
+    @property
+    def nprobe(self) -> Optional[int]:
+        return self._ivf.nprobe if self._ivf is not None else None
+
+    @nprobe.setter
+    def nprobe(self, value: int):
+        if self._ivf is not None:
+            self._ivf.nprobe = int(value)
+
+    @property
+    def compressed(self) -> bool:
+        return self._ivf is not None
+
+    @property
+    def dim(self) -> int:
+        return int(self.index.d) if self.index is not None else int(self.vectors.shape[1])
+
+    @classmethod
+    def load(cls, index_path: str = FAISS_INDEX_PATH,
+             metadata_path: str = FAISS_METADATA_PATH,
+             vectors_path: Optional[str] = FAISS_VECTORS_PATH,
+             complaints_path: Optional[str] = FAISS_COMPLAINTS_PATH, **kwargs) -> "FaissIndex":
+        """
+        Map the metadata and float matrix instead of reading them, so a cold
+        process starts quickly and workers share the page cache. Only a
+        compressed index is read; flat search runs on the mapped matrix.
+        """
+        import faiss
+
+        vectors = None
+        if vectors_path and os.path.exists(vectors_path):
+            vectors = np.load(vectors_path, mmap_mode="r")
+        index = None
+        if vectors is None or not _is_flat_index_file(index_path):
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Older FAISS builds cannot map every index type
+                index = faiss.read_index(index_path)
+
+        if os.path.exists(metadata_path) and not metadata_path.endswith(".pkl"):
+            metadata = MetadataStore.open(metadata_path)
+        else:
+            legacy_path = metadata_path if metadata_path.endswith(".pkl") else FAISS_LEGACY_METADATA_PATH
+            print(f"⚠️ Unpickling {legacy_path}; convert it once with "
+                  f"MetadataStore.from_pickle(...).write('{FAISS_METADATA_PATH}')")
+            metadata = MetadataStore.from_pickle(legacy_path)
+        complaint_codes = None
+        if complaints_path and os.path.exists(complaints_path):
+            complaint_codes = np.load(complaints_path, mmap_mode="r")
+        name = os.path.splitext(os.path.basename(index_path))[0]
+        return cls(index, metadata, name=name, vectors=vectors,
+                   complaint_codes=complaint_codes, **kwargs)
+
+    def count(self) -> int:
+        return int(self.index.ntotal) if self.index is not None else len(self.vectors)
+
+    def _to_distances(self, scores: np.ndarray) -> np.ndarray:
+        """FAISS scores to the cosine distances Chroma reports"""
+        import faiss
+
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return 1.0 - scores
+        # Squared L2 between unit vectors is 2 * cosine distance
+        return scores / 2.0
+
+    def _rows(self, rows: Sequence[int]) -> List[Dict]:
+        """Metadata for result rows; only these rows are materialized"""
+        return self.metadata.rows(rows)
+
+    def _search(self, vectors: np.ndarray, fetch: int, selector=None):
+        import faiss
+
+        fetch = min(fetch, self.count())
+        if self.index is None:
+            return self._exact_search(vectors, fetch)
+        params = None
+        if selector is not None:
+            params = (faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+                      if self._ivf is not None else faiss.SearchParameters(sel=selector))
+        if not self.compressed or self.vectors is None:
+            scores, rows = self.index.search(vectors, fetch, params=params)
+            return self._to_distances(scores), rows
+
+        # PQ shortlist, then exact cosine re-scoring of those rows
+        depth = min(max(fetch, self.rerank_candidates), self.count())
+        _, candidates = self.index.search(vectors, depth, params=params)
+        distances = np.full((len(vectors), fetch), np.inf, dtype=np.float32)
+        rows = np.full((len(vectors), fetch), -1, dtype=np.int64)
+        for i, shortlist in enumerate(candidates):
+            # Sorted row order keeps memmap reads sequential
+            shortlist = np.unique(shortlist[shortlist >= 0])
+            exact = 1.0 - np.asarray(self.vectors[shortlist]) @ vectors[i]
+            order = np.argsort(exact)[:fetch]
+            distances[i, :len(order)] = exact[order]
+            rows[i, :len(order)] = shortlist[order]
+        return distances, rows
+
+    def _exact_search(self, vectors: np.ndarray, k: int,
+                      rows: Optional[np.ndarray] = None, block_rows: int = 200000):
+        """Exact top-k over the float matrix (or a sorted subset of its rows), block by block"""
+        total = len(self.vectors) if rows is None else len(rows)
+        best_scores = np.full((len(vectors), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(vectors), k), -1, dtype=np.int64)
+        for start in range(0, total, block_rows):
+            ids = (np.arange(start, min(start + block_rows, total)) if rows is None
+                   else rows[start:start + block_rows])
+            block = np.asarray(self.vectors[start:start + block_rows] if rows is None
+                               else self.vectors[ids])
+            scores = vectors @ block.T
+            merged_scores = np.hstack([best_scores, scores])
+            merged_rows = np.hstack([best_rows, np.broadcast_to(ids, scores.shape)])
+            top = np.argsort(-merged_scores, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+        return 1.0 - best_scores, best_rows
+
+    def _prefiltered_search(self, vectors: np.ndarray, k: int, mask: np.ndarray):
+        """
+        Rank only rows in the bitmap mask: small selections are scored
+        exactly, larger ones go through FAISS with an ID selector
+        """
+        import faiss
+
+        selected = np.flatnonzero(mask)
+        k = min(k, len(selected))
+        if not k:
+            return (np.zeros((len(vectors), 0), dtype=np.float32),
+                    np.zeros((len(vectors), 0), dtype=np.int64))
+        if self.vectors is not None and (self.index is None
+                                         or len(selected) <= FAISS_PREFILTER_EXACT_ROWS):
+            return self._exact_search(vectors, k, selected)
+
+        bits = np.packbits(mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+        distances, rows = self._search(vectors, k, selector)
+        # IVF only scans nprobe lists, which can hold fewer than k passing rows
+        if self.vectors is not None and (rows < 0).any():
+            return self._exact_search(vectors, k, selected)
+        return distances, rows
+
+    def _postfiltered_search(self, vectors: np.ndarray, n_results: int,
+                             where: Optional[Dict]) -> List[List[tuple]]:
+        """Filters without bitmaps over-fetch, widening until enough rows pass"""
+        fetch = n_results * (FAISS_FILTER_OVERFETCH if where else 1)
+        while True:
+            distances, rows = self._search(vectors, fetch)
+            hits = []
+            for dist_row, id_row in zip(distances, rows):
+                candidates = [(int(r), float(d)) for r, d in zip(id_row, dist_row) if r >= 0]
+                if where:
+                    metas = self._rows([r for r, _ in candidates])
+                    candidates = [c for c, m in zip(candidates, metas) if matches_where(m, where)]
+                hits.append(candidates[:n_results])
+            if (not where or fetch >= self.count()
+                    or all(len(kept) >= n_results for kept in hits)):
+                return hits
+            fetch *= 4
+
+    def measure_recall(self, query_embeddings: List[List[float]], k: int = 10,
+                       block_rows: int = 200000) -> float:
+        """
+        Recall@k of the configured search against exact search over the
+        float matrix (needs vectors); use it to pick nprobe / rerank depth
+        """
+        if self.vectors is None:
+            raise ValueError("Recall needs the float vector matrix")
+        import faiss
+
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        faiss.normalize_L2(queries)
+        _, approx = self._search(queries, k)
+        _, best_rows = self._exact_search(queries, k, block_rows=block_rows)
+
+        found = sum(len(set(a[a >= 0]) & set(e)) for a, e in zip(approx, best_rows))
+        return found / float(best_rows.size)
+
+    def _prepare(self, query_embeddings, query_texts=None) -> np.ndarray:
+        """Query vectors as a unit-normalized float32 matrix"""
+        import faiss
+
+        if query_embeddings is None:
+            from .embeddings import embed_queries
+            query_embeddings = embed_queries(query_texts or [])
+
+        vectors = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.shape[0] and vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"FAISS index has dimension {self.dim} but queries are "
+                f"{vectors.shape[1]}-d; rebuild it from the collection with build_faiss_index"
+            )
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _package(self, hits: List[List[tuple]]) -> Dict:
+        """Chroma-shaped results for per-query lists of (row, distance)"""
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "row_ids": []}
+        for kept in hits:
+            metas = self._rows([r for r, _ in kept])
+            results["ids"].append([str(m.get("chunk_id", r)) for (r, _), m in zip(kept, metas)])
+            results["documents"].append([m.get("chunk_text", "") for m in metas])
+            results["metadatas"].append(metas)
+            results["distances"].append([d for _, d in kept])
+            results["row_ids"].append([r for r, _ in kept])
+        return results
+
+    def _masked_hits(self, vectors: np.ndarray, n_results: int, mask: np.ndarray) -> List[List[tuple]]:
+        distances, rows = self._prefiltered_search(vectors, n_results, mask)
+        return [[(int(r), float(d)) for r, d in zip(id_row, dist_row) if r >= 0]
+                for dist_row, id_row in zip(distances, rows)]
+
+    def query(self, query_embeddings=None, n_results=10, where=None,
+              include=None, query_texts=None) -> Dict:
+        vectors = self._prepare(query_embeddings, query_texts)
+        if not self.count():
+            return self._package([[] for _ in range(len(vectors))])
+
+        # Stored fields are normalized, so the filter is too
+        where = canonical_where(where)
+        mask = self.bitmaps.mask(where) if where else None
+
+        if mask is not None:
+            # Bitmap pre-filter: exactly n_results hits whenever that many rows pass
+            hits = self._masked_hits(vectors, n_results, mask)
+        else:
+            hits = self._postfiltered_search(vectors, n_results, where)
+        return self._package(hits)
+
+    def query_buckets(self, query_embeddings, n_results: int,
+                      buckets: List[Tuple[str, str, str]],
+                      where: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        Top n_results per time bucket: each bucket's rows come from the date
+        index and are searched on their own, combined with any bitmap filter
+        """
+        vectors = self._prepare(query_embeddings)
+        mask = self.bitmaps.mask(canonical_where(where)) if where else None
+        if where and mask is None:
+            results = self.query(query_embeddings, n_results * len(buckets) * TREND_OVERFETCH, where)
+            return _split_buckets(results, n_results, buckets)
+
+        results = {}
+        for label, start, end in buckets:
+            in_range = self.date_index.mask_between(start, end)
+            if mask is not None:
+                in_range &= mask
+            results[label] = self._package(self._masked_hits(vectors, n_results, in_range))
+        return results
+
+    def _group_hits(self, hits: List[tuple], n_results: int, scoring: str) -> List[tuple]:
+        """
+        Collapse (row, distance) hits to (best row, its distance, complaint
+        score, chunk hits) per complaint, best complaints first
+        """
+        if not hits:
+            return []
+        rows = np.fromiter((r for r, _ in hits), dtype=np.int64, count=len(hits))
+        distances = np.fromiter((d for _, d in hits), dtype=np.float64, count=len(hits))
+        codes = np.asarray(self.complaint_codes[rows], dtype=np.int64)
+        codes = np.where(codes >= 0, codes, -1 - rows)  # chunks without a complaint stand alone
+        _, first, inverse, counts = np.unique(codes, return_index=True, return_inverse=True,
+                                              return_counts=True)
+        similarity = 1.0 - distances
+        scores = (np.bincount(inverse, weights=similarity) if scoring == "sum"
+                  else similarity[first])
+        order = np.lexsort((first, -scores))[:n_results]
+        return [(int(rows[first[i]]), float(distances[first[i]]), float(scores[i]), int(counts[i]))
+                for i in order]
+
+    def query_complaints(self, query_embeddings, n_results: int = 10,
+                         where: Optional[Dict] = None,
+                         scoring: str = COMPLAINT_SCORING) -> Dict:
+        """
+        Top n_results distinct complaints per query, each represented by its
+        closest chunk; chunk hits are grouped through complaint_codes and the
+        fetch widens until every query has n_results complaints
+        """
+        vectors = self._prepare(query_embeddings)
+        if not self.count():
+            empty = [[] for _ in range(len(vectors))]
+            return _with_complaint_scores(self._package(empty), empty)
+        where = canonical_where(where)
+        mask = self.bitmaps.mask(where) if where else None
+
+        fetch = n_results * COMPLAINT_OVERFETCH
+        while True:
+            hits = (self._masked_hits(vectors, fetch, mask) if mask is not None
+                    else self._postfiltered_search(vectors, fetch, where))
+            grouped = [self._group_hits(h, n_results, scoring) for h in hits]
+            if (all(len(g) >= n_results for g in grouped)
+                    or fetch >= min(self.count(), COMPLAINT_FETCH_LIMIT)):
+                break
+            fetch *= 4
+        results = self._package([[(r, d) for r, d, _, _ in g] for g in grouped])
+        return _with_complaint_scores(results, grouped)
+
+    def peek(self, limit: int = 10) -> Dict:
+        metas = self._rows(range(min(limit, len(self.metadata))))
+        return {
+            "ids": [str(m.get("chunk_id", i)) for i, m in enumerate(metas)],
+            "documents": [m.get("chunk_text", "") for m in metas],
+            "metadatas": metas,
+        }
+
+
+def _with_complaint_scores(results: Dict, grouped: List[List[tuple]]) -> Dict:
+    results["complaint_scores"] = [[round(score, 6) for _, _, score, _ in g] for g in grouped]
+    results["chunk_hits"] = [[hits for _, _, _, hits in g] for g in grouped]
+    return results
+
+
+def _group_results(results: Dict, n_results: int, scoring: str) -> Tuple[Dict, bool]:
+    """
+    Collapse Chroma-shaped chunk results to one hit per complaint (its
+    closest chunk); also reports whether every query reached n_results
+    """
+    keys = [key for key in ("ids", "documents", "metadatas", "distances") if results.get(key)]
+    out = {key: [] for key in keys}
+    grouped_all, filled = [], True
+    for row in range(len(results["ids"])):
+        documents = results["documents"][row] if results.get("documents") else [""] * len(results["ids"][row])
+        metadatas = results["metadatas"][row] if results.get("metadatas") else [None] * len(documents)
+        distances = results["distances"][row] if results.get("distances") else [None] * len(documents)
+        groups: Dict[str, list] = {}
+        for i, (doc, meta, dist) in enumerate(zip(documents, metadatas, distances)):
+            similarity = 1.0 - dist if dist is not None else 0.0
+            group = groups.get(result_key(meta, doc))
+            if group is None:
+                groups[result_key(meta, doc)] = [i, similarity, 1]
+            else:
+                group[1] = group[1] + similarity if scoring == "sum" else group[1]
+                group[2] += 1
+        ranked = sorted(groups.values(), key=lambda g: (-g[1], g[0]))[:n_results]
+        filled = filled and len(ranked) >= n_results
+        for key in keys:
+            out[key].append([results[key][row][i] for i, _, _ in ranked])
+        grouped_all.append([(i, None, score, hits) for i, score, hits in ranked])
+    return _with_complaint_scores(out, grouped_all), filled
+
+
+def query_complaints(collection, query_embeddings, n_results: int,
+                     where: Optional[Dict] = None,
+                     scoring: str = COMPLAINT_SCORING) -> Dict:
+    """
+    collection.query, but n_results counts distinct complaints: chunk hits
+    are grouped by complaint ID (score = best chunk similarity, or the sum
+    over matching chunks with scoring="sum") and the fetch widens until
+    every query has n_results complaints. Results keep the Chroma shape,
+    plus 'complaint_scores' and 'chunk_hits'.
+    """
+    if isinstance(collection, FaissIndex):
+        return collection.query_complaints(query_embeddings, n_results, where, scoring)
+
+    total = collection.count()
+    fetch = n_results * COMPLAINT_OVERFETCH
+    while True:
+        results = collection.query(query_embeddings=query_embeddings,
+                                   n_results=max(1, min(fetch, total)), where=where,
+                                   include=["documents", "metadatas", "distances"])
+        grouped, filled = _group_results(results, n_results, scoring)
+        if filled or fetch >= min(total, COMPLAINT_FETCH_LIMIT):
+            return grouped
+        fetch *= 4
+
+
+def _split_buckets(results: Dict, n_results: int,
+                   buckets: List[Tuple[str, str, str]]) -> Dict[str, Dict]:
+    """Split Chroma-shaped results by date received, keeping n_results per bucket"""
+    keys = [key for key in ("ids", "documents", "metadatas", "distances", "row_ids")
+            if results.get(key)]
+    out = {label: {key: [] for key in keys} for label, _, _ in buckets}
+    for row in range(len(results["ids"])):
+        dates = [normalize_record(meta).get("date_received") for meta in results["metadatas"][row]]
+        for label, start, end in buckets:
+            keep = [i for i, date in enumerate(dates) if in_bucket(date, start, end)][:n_results]
+            for key in keys:
+                out[label][key].append([results[key][row][i] for i in keep])
+    return out
+
+
+def query_buckets(collection, query_embeddings, n_results: int,
+                  date_range: Optional[Tuple[str, str]] = None,
+                  bucket: str = TREND_BUCKET, n_buckets: int = TREND_BUCKETS,
+                  where: Optional[Dict] = None) -> Tuple[List[Tuple[str, str, str]], Dict[str, Dict]]:
+    """
+    Top n_results per time bucket over date_range (default: the last
+    n_buckets buckets of the corpus). Returns the buckets and Chroma-shaped
+    results keyed by bucket label. FAISS runs one pre-filtered search per
+    bucket; other backends split one over-fetched query by date.
+    """
+    if isinstance(collection, FaissIndex):
+        if date_range is None:
+            bounds = collection.date_index.bounds()
+            if bounds is None:
+                return [], {}
+            date_range = trailing_range(bounds[1], bucket, n_buckets)
+        buckets = time_buckets(date_range[0], date_range[1], bucket)
+        return buckets, collection.query_buckets(query_embeddings, n_results, buckets, where)
+
+    n_slots = len(time_buckets(*date_range, bucket)) if date_range else n_buckets
+    results = collection.query(query_embeddings=query_embeddings,
+                               n_results=n_results * n_slots * TREND_OVERFETCH,
+                               where=where, include=["documents", "metadatas", "distances"])
+    if date_range is None:
+        # No date index: anchor on the newest date among the hits
+        dates = [str(date)[:10] for metas in results.get("metadatas") or []
+                 for date in (normalize_record(meta).get("date_received") for meta in metas)
+                 if date]
+        if not dates:
+            return [], {}
+        date_range = trailing_range(max(dates), bucket, n_buckets)
+    buckets = time_buckets(date_range[0], date_range[1], bucket)
+    return buckets, _split_buckets(results, n_results, buckets)
+
+
+def _is_flat_index_file(path: str) -> bool:
+    """
+    True when path holds no index or a flat one ('IxF' header): its
+    vectors duplicate the .npy matrix, so it is never read
+    """
+    if not os.path.exists(path):
+        return True
+    with open(path, "rb") as f:
+        return f.read(3) == b"IxF"
+
+
+def _train_ivfpq(vectors: np.ndarray, nlist: int, pq_m: int,
+                 train_sample: int, verbose: bool):
+    """IVF-PQ index trained on a random sample of the (memory-mapped) rows"""
+    import faiss
+
+    total, dim = vectors.shape
+    rng = np.random.default_rng(0)
+    sample_rows = np.sort(rng.choice(total, size=min(train_sample, total), replace=False))
+    sample = np.ascontiguousarray(vectors[sample_rows], dtype=np.float32)
+
+    # FAISS wants ~39 points per centroid; shrink nlist for small corpora
+    nlist = max(1, min(nlist, len(sample) // 39))
+    if dim % pq_m:
+        raise ValueError(f"FAISS_PQ_M={pq_m} must divide the embedding dimension {dim}")
+    nbits = int(min(8, max(1, np.log2(max(2, len(sample) // 39)))))
+
+    if verbose:
+        print(f"   • Training IVF{nlist},PQ{pq_m}x{nbits} on {len(sample):,} vectors")
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, nbits, faiss.METRIC_INNER_PRODUCT)
+    index.train(sample)
+    return index
+
+
+def build_faiss_index(collection, index_path: str = FAISS_INDEX_PATH,
+                      metadata_path: str = FAISS_METADATA_PATH,
+                      vectors_path: str = FAISS_VECTORS_PATH,
+                      complaints_path: str = FAISS_COMPLAINTS_PATH,
+                      mode: str = FAISS_INDEX_MODE,
+                      nlist: int = FAISS_NLIST, pq_m: int = FAISS_PQ_M,
+                      train_sample: int = FAISS_TRAIN_SAMPLE,
+                      page_size: int = 10000, verbose: bool = True) -> FaissIndex:
+    """
+    Export a Chroma collection for the FAISS backend, so it serves the same
+    embeddings the collection was built with.
+
+    The normalized vectors are streamed into a float32 .npy, memory-mapped
+    at query time. Flat mode searches that matrix directly and writes no
+    FAISS index; mode="ivfpq" also trains an IVF-PQ index on a sample of
+    the rows and re-scores its shortlist from the matrix. Metadata is
+    streamed page by page to a dictionary-encoded Arrow IPC file (see
+    MetadataWriter), and the chunk-to-complaint mapping goes to an int32
+    .npy alongside it.
+    """
+    import faiss
+
+    if mode not in ("flat", "ivfpq"):
+        raise ValueError(f"Unknown FAISS index mode: {mode}")
+    total = collection.count()
+    if not total:
+        raise ValueError("Collection is empty; nothing to export")
+
+    for path in (index_path, metadata_path, vectors_path, complaints_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    matrix = None
+    offset = 0
+    with MetadataWriter(metadata_path) as writer:
+        while offset < total:
+            page = collection.get(include=["embeddings", "documents", "metadatas"],
+                                  limit=min(page_size, total - offset), offset=offset)
+            if not page["ids"]:
+                break
+            vectors = np.ascontiguousarray(page["embeddings"], dtype=np.float32)
+            faiss.normalize_L2(vectors)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32,
+                                                   shape=(total, vectors.shape[1]))
+            matrix[offset:offset + len(vectors)] = vectors
+            writer.write({**(meta or {}), "chunk_id": chunk_id, "chunk_text": doc}
+                         for chunk_id, doc, meta in zip(page["ids"], page["documents"],
+                                                        page["metadatas"]))
+            offset += len(page["ids"])
+            if verbose:
+                print(f"   ✅ Exported {offset:,}/{total:,} chunks")
+    matrix.flush()
+    del matrix
+
+    # Reopen at the exported length in case the collection shrank meanwhile
+    vectors = np.load(vectors_path, mmap_mode="r")[:offset]
+    index = None
+    if mode == "ivfpq":
+        index = _train_ivfpq(vectors, nlist, pq_m, train_sample, verbose)
+        for start in range(0, offset, page_size * 10):
+            index.add(np.ascontiguousarray(vectors[start:start + page_size * 10]))
+        faiss.write_index(index, index_path)
+    elif os.path.exists(index_path):
+        # A compressed index left from an earlier build would shadow the matrix
+        os.remove(index_path)
+    store = MetadataStore.open(metadata_path)
+    complaint_codes = store.complaint_codes()
+    np.save(complaints_path, complaint_codes)
+    if verbose:
+        saved_path = index_path if index is not None else vectors_path
+        size_mb = os.path.getsize(saved_path) / 1e6
+        print(f"💾 Saved FAISS {mode} index: {saved_path} "
+              f"({offset:,} vectors, {size_mb:,.1f} MB)")
+    return FaissIndex(index, store,
+                      name=os.path.splitext(os.path.basename(index_path))[0],
+                      vectors=vectors, complaint_codes=complaint_codes)
+
+
+def get_vector_index(backend: str = VECTOR_BACKEND,
+                     path: str = VECTOR_STORE_DIR,
+                     name: str = COLLECTION_NAME) -> VectorIndex:
+    """Open the configured backend ("chroma" or "faiss")"""
+    if backend == "faiss":
+        return FaissIndex.load()
+    if backend == "chroma":
+        return ChromaIndex(get_chroma_collection(path, name))
+    raise ValueError(f"Unknown vector backend: {backend}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a Chroma collection to FAISS")
+    parser.add_argument("--vector-store", default=VECTOR_STORE_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--index", default=FAISS_INDEX_PATH)
+    parser.add_argument("--metadata", default=FAISS_METADATA_PATH)
+    parser.add_argument("--vectors", default=FAISS_VECTORS_PATH)
+    parser.add_argument("--complaints", default=FAISS_COMPLAINTS_PATH)
+    parser.add_argument("--mode", choices=["flat", "ivfpq"], default=FAISS_INDEX_MODE)
+    args = parser.parse_args()
+
+    build_faiss_index(get_chroma_collection(args.vector_store, args.collection),
+                      args.index, args.metadata, args.vectors, args.complaints, mode=args.mode)
@@ -5,16 +5,17 @@ import chromadb
 from typing import Optional
 from .config import VECTOR_STORE_DIR, COLLECTION_NAME
 
-def get_chroma_collection() -> chromadb.Collection:
+def get_chroma_collection(path: str = VECTOR_STORE_DIR,
+                          name: str = COLLECTION_NAME) -> chromadb.Collection:
     """
     Get or create ChromaDB collection with proper error handling
     """
     try:
-        client = chromadb.PersistentClient(path=VECTOR_STORE_DIR)
+        client = chromadb.PersistentClient(path=path)
         
         # Try to get existing collection
         try:
-            collection = client.get_collection(COLLECTION_NAME)
+            collection = client.get_collection(name)
             return collection
         except:
             # Try alternative collection names
@@ -22,8 +23,10 @@ def get_chroma_collection() -> chromadb.Collection:
                 collection = client.get_collection("financial_complaints")
                 return collection
             except:
-                # Create new collection
-                collection = client.create_collection(COLLECTION_NAME)
+                # Create new collection (cosine space so 1 - distance is similarity)
+                collection = client.create_collection(
+                    name, metadata={"hnsw:space": "cosine"}
+                )
                 return collection
                 
     except Exception as e:
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.bitmap_index import BitmapIndex
+from src.metadata_store import MetadataStore, canonical_where
+
+RECORDS = [
+    {"chunk_id": "0", "product": "Credit card", "state": "CA", "date_received": "2023-01-05"},
+    {"chunk_id": "1", "product": "Mortgage", "state": "NY", "date_received": "2023-01-20"},
+    {"chunk_id": "2", "Product": "credit card or prepaid card", "State": "NY", "date": "2023-02-01"},
+    {"chunk_id": "3", "product": "Savings account", "state": "TX"},
+]
+
+
+def rows(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+def test_where_clauses_become_row_masks():
+    index = BitmapIndex(MetadataStore.from_records(RECORDS))
+
+    assert rows(index.mask(canonical_where({"product_category": "Credit card"}))) == [0, 2]
+    assert rows(index.mask({"state": {"$in": ["NY", "TX"]}, "product": {"$ne": "Mortgage"}})) == [2, 3]
+    assert rows(index.mask({"$or": [{"state": "CA"}, {"product": {"$nin": ["Credit card", "Mortgage"]}}]})) == [0, 3]
+    assert rows(index.mask({"date_month": "2023-01"})) == [0, 1]
+    assert rows(index.mask(None)) == [0, 1, 2, 3]
+
+
+def test_unknown_values_match_nothing():
+    index = BitmapIndex(MetadataStore.from_records(RECORDS))
+
+    assert rows(index.mask({"state": "WA"})) == []
+    assert rows(index.mask({"state": {"$ne": "WA"}})) == [0, 1, 2, 3]
+
+
+def test_fields_without_bitmaps_leave_the_filter_to_the_caller():
+    index = BitmapIndex(MetadataStore.from_records(RECORDS))
+
+    assert index.mask({"sub_issue": "Fees"}) is None
+    assert index.mask({"$and": [{"state": "CA"}, {"chunk_text": "x"}]}) is None
+    assert index.mask({"state": {"$gt": "A"}}) is None
@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.bm25_index import BM25Index, build_bm25_index, tokenize
+
+RECORDS = [
+    {"chunk_id": "c0", "chunk_text": "late fee charged on my credit card", "product": "Credit card"},
+    {"chunk_id": "c1", "chunk_text": "the mortgage servicer lost my payment", "product": "Mortgage"},
+    {"chunk_id": "c2", "chunk_text": "late payment fee fee fee", "product": "Credit card"},
+    {"chunk_id": "c3", "chunk_text": "XXXX account closed", "company": "Acme Bank"},
+    {"chunk_id": "c4", "chunk_text": "", "product": "Mortgage"},
+]
+
+
+class PagedCollection:
+    """Chroma's count()/get(limit, offset) over RECORDS"""
+
+    def count(self):
+        return len(RECORDS)
+
+    def get(self, include=None, limit=None, offset=0):
+        page = RECORDS[offset:offset + limit]
+        return {"ids": [r["chunk_id"] for r in page],
+                "documents": [r["chunk_text"] for r in page],
+                "metadatas": [{k: v for k, v in r.items() if k not in ("chunk_id", "chunk_text")}
+                              for r in page]}
+
+
+def brute_force_scores(index, query):
+    docs = [tokenize(f"{r['chunk_text']} {r.get('company', '')}") for r in RECORDS]
+    avg_len = np.mean([len(d) for d in docs])
+    scores = np.zeros(len(docs))
+    for term in set(tokenize(query)):
+        df = sum(term in d for d in docs)
+        idf = np.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for row, d in enumerate(docs):
+            tf = d.count(term)
+            scores[row] += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(d) / avg_len))
+    return scores
+
+
+def test_tokenize_drops_stopwords_and_redactions():
+    assert tokenize("The XXXX fee was $35, not xx!") == ["fee", "35"]
+
+
+def test_scores_match_okapi_bm25_for_touched_docs_only():
+    index = BM25Index.build(RECORDS)
+
+    rows, scores = index.scores("late fee mortgage")
+
+    assert rows.tolist() == [0, 1, 2]
+    np.testing.assert_allclose(scores, brute_force_scores(index, "late fee mortgage")[rows], rtol=1e-5)
+    assert index.scores("unseen words")[0].size == 0
+
+
+def test_query_ranks_filters_and_indexes_company_names():
+    index = BM25Index.build(RECORDS)
+
+    results = index.query(["fee", "acme"], n_results=5)
+    filtered = index.query(["fee payment"], where={"product_category": "Mortgage"})
+
+    assert results["ids"] == [["c2", "c0"], ["c3"]]
+    assert results["distances"][0] == [None, None]
+    assert filtered["ids"] == [["c1"]]
+
+
+def test_saved_index_loads_memory_mapped_with_the_same_results(tmp_path):
+    built = BM25Index.build(RECORDS)
+    built.save(str(tmp_path))
+
+    loaded = BM25Index.load(str(tmp_path))
+
+    assert isinstance(loaded.docs, np.memmap)
+    assert loaded.query(["late fee"]) == built.query(["late fee"])
+
+
+def test_paged_build_from_a_collection_matches_an_in_memory_build(tmp_path):
+    paged = build_bm25_index(PagedCollection(), str(tmp_path), page_size=2, verbose=False)
+    built = BM25Index.build(RECORDS)
+
+    for name in ("indptr", "docs", "tfs", "doc_len"):
+        np.testing.assert_array_equal(getattr(paged, name), getattr(built, name))
+    assert BM25Index.load(str(tmp_path)).query(["payment"]) == built.query(["payment"])
@@ -0,0 +1,40 @@
+import pytest
+
+from src.date_index import DateIndex, in_bucket, time_buckets, trailing_range
+from src.metadata_store import MetadataStore
+
+
+def test_rows_between_is_inclusive_and_skips_undated_rows():
+    index = DateIndex(["2023-03-01", None, "2023-01-15", "Unknown", "2023-02-28T10:00:00", "2023-01-15"])
+
+    assert index.rows_between("2023-01-15", "2023-02-28").tolist() == [2, 4, 5]
+    assert index.mask_between("2023-03-01", "2023-12-31").tolist() == [True] + [False] * 5
+    assert index.bounds() == ("2023-01-15", "2023-03-01")
+
+
+def test_undated_corpus_has_no_bounds():
+    assert DateIndex([None, "n/a"]).bounds() is None
+
+
+def test_from_store_reads_date_received():
+    store = MetadataStore.from_records([{"chunk_id": "0", "date_received": "2024-05-01"},
+                                        {"chunk_id": "1", "Date received": "2024-04-01"}])
+
+    assert DateIndex.from_store(store).rows_between("2024-01-01", "2024-04-30").tolist() == [1]
+
+
+def test_time_buckets_are_clipped_to_the_range():
+    assert time_buckets("2023-01-15", "2023-03-10") == [
+        ("2023-01", "2023-01-15", "2023-01-31"),
+        ("2023-02", "2023-02-01", "2023-02-28"),
+        ("2023-03", "2023-03-01", "2023-03-10"),
+    ]
+    assert [label for label, _, _ in time_buckets("2023-11-01", "2024-02-01", "quarter")] == ["2023Q4", "2024Q1"]
+    with pytest.raises(ValueError):
+        time_buckets("2023-01-01", "2023-02-01", "fortnight")
+
+
+def test_trailing_range_and_in_bucket():
+    assert trailing_range("2023-06-10", "month", 3) == ("2023-04-01", "2023-06-10")
+    assert in_bucket("2023-04-30T23:59:00", "2023-04-01", "2023-04-30")
+    assert not in_bucket(None, "2023-04-01", "2023-04-30")
@@ -0,0 +1,62 @@
+import numpy as np
+
+from src.embedding_cache import CachedEmbedder, EmbeddingCache, EmbeddingCacheReader
+
+
+class LengthEmbedder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+
+
+def fill(cache_dir, texts):
+    embedder = CachedEmbedder(LengthEmbedder(), EmbeddingCache(str(cache_dir), "model"))
+    embedder.encode(texts)
+    embedder.close()
+    return embedder
+
+
+def test_cached_texts_are_not_re_encoded(tmp_path):
+    # ~1 in 256 keys ends in a NUL byte; 2,000 texts cover several of them
+    texts = [f"complaint {i}" for i in range(2000)]
+    fill(tmp_path, texts)
+
+    again = CachedEmbedder(LengthEmbedder(), EmbeddingCache(str(tmp_path), "model"))
+    again.encode(texts + ["COMPLAINT   7"])
+
+    assert again.embedder.encoded == []
+    assert len(again.cache) == 2000
+
+
+def test_reader_matches_writer_lookups(tmp_path):
+    texts = [f"complaint {i}" for i in range(2000)]
+    fill(tmp_path, texts)
+    reader = EmbeddingCacheReader(str(tmp_path), "model")
+    probe = texts[::13] + ["never embedded"]
+
+    assert reader.lookup(probe) == EmbeddingCache(str(tmp_path), "model").lookup(probe)
+    assert reader.lookup(["never embedded"]) == [None]
+    np.testing.assert_array_equal(reader.get(reader.lookup(["complaint 5"])),
+                                  LengthEmbedder().encode(["complaint 5"]))
+
+
+def test_reader_sees_rows_added_after_the_sorted_index(tmp_path):
+    fill(tmp_path, ["first", "second"])
+    reader = EmbeddingCacheReader(str(tmp_path), "model")
+    assert reader.lookup(["third"]) == [None]
+
+    unsorted = CachedEmbedder(LengthEmbedder(), EmbeddingCache(str(tmp_path), "model"))
+    unsorted.encode(["third"])  # not closed, so sorted_index.npy still has two rows
+
+    assert reader.lookup(["third", "first"]) == [2, 0]
+
+
+def test_reader_of_a_missing_cache_is_empty(tmp_path):
+    reader = EmbeddingCacheReader(str(tmp_path / "absent"), "model")
+
+    assert len(reader) == 0
+    assert reader.lookup(["anything"]) == [None]
+    assert not (tmp_path / "absent").exists()
@@ -0,0 +1,65 @@
+import numpy as np
+
+from src.embedding_cache import CachedEmbedder, EmbeddingCache, EmbeddingCacheReader
+from src.embeddings import QueryEmbeddingLRU
+
+
+class LengthEmbedder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_repeated_and_reworded_queries_are_encoded_once():
+    lru, embedder = QueryEmbeddingLRU(max_entries=8), LengthEmbedder()
+
+    first = lru.encode(["Late fees?", "late   FEES"], embedder)
+    second = lru.encode(["late fees"], embedder)
+
+    assert embedder.encoded == ["late fees"]
+    np.testing.assert_array_equal(first[0], second[0])
+    assert lru.stats["hits"] == 1 and lru.stats["misses"] == 2
+
+
+def test_least_recently_used_query_is_evicted():
+    lru, embedder = QueryEmbeddingLRU(max_entries=2), LengthEmbedder()
+    lru.encode(["one", "two"], embedder)
+    lru.encode(["one"], embedder)
+    lru.encode(["three"], embedder)
+
+    embedder.encoded.clear()
+    lru.encode(["one", "two"], embedder)
+
+    assert embedder.encoded == ["two"]
+
+
+def test_spill_keeps_evicted_vectors_reachable(tmp_path):
+    spill = EmbeddingCache(str(tmp_path), "model")
+    lru, embedder = QueryEmbeddingLRU(max_entries=1, spill=spill), LengthEmbedder()
+    lru.encode(["one"], embedder)
+    lru.encode(["two"], embedder)  # evicts "one" from memory
+
+    embedder.encoded.clear()
+    vectors = lru.encode(["one"], embedder)
+    restarted = QueryEmbeddingLRU(spill=EmbeddingCache(str(tmp_path), "model"))
+    restarted.encode(["two"], embedder)
+
+    assert embedder.encoded == []
+    np.testing.assert_array_equal(vectors[0], LengthEmbedder().encode(["one"])[0])
+    assert lru.stats["disk_hits"] == 1 and restarted.stats["disk_hits"] == 1
+
+
+def test_misses_read_the_ingest_cache_before_encoding(tmp_path):
+    ingest = CachedEmbedder(LengthEmbedder(), EmbeddingCache(str(tmp_path), "model"))
+    ingest.encode(["overdraft fee charged twice"])
+    ingest.close()
+
+    lru = QueryEmbeddingLRU(corpus_cache=EmbeddingCacheReader(str(tmp_path), "model"))
+    embedder = LengthEmbedder()
+    lru.encode(["Overdraft fee charged twice", "new question"], embedder)
+
+    assert embedder.encoded == ["new question"]
+    assert lru.stats["disk_hits"] == 1
@@ -0,0 +1,57 @@
+from src.fusion import fuse_bucket_results, fuse_query_results, result_key
+
+
+def query_results(*rows):
+    """Chroma-shaped results, one row per query, from (complaint_id, distance) hits"""
+    return {
+        "documents": [[f"chunk of {cid} at {dist}" for cid, dist in row] for row in rows],
+        "metadatas": [[{"complaint_id": cid} for cid, _ in row] for row in rows],
+        "distances": [[dist for _, dist in row] for row in rows],
+    }
+
+
+def test_complaints_in_several_lists_rank_first():
+    results = query_results([("a", 0.1), ("b", 0.2)], [("b", 0.3), ("c", 0.4)])
+
+    fused = fuse_query_results(results, rows=[0, 1], limit=3, rrf_k=60)
+
+    assert [m["complaint_id"] for m in fused["metadata"]] == ["b", "a", "c"]
+    assert fused["fusion_scores"][0] == round(1 / 62 + 1 / 61, 6)
+
+
+def test_each_complaint_keeps_its_closest_chunk_and_counts_once_per_list():
+    results = query_results([("a", 0.5), ("a", 0.2)], [("a", 0.1)])
+
+    fused = fuse_query_results(results, rows=[0, 1], limit=5, rrf_k=60)
+
+    assert fused["distances"] == [0.1]
+    assert fused["fusion_scores"] == [round(2 / 61, 6)]
+
+
+def test_only_the_given_rows_are_fused_and_limit_applies():
+    results = query_results([("a", 0.1), ("b", 0.2), ("c", 0.3)], [("z", 0.0)])
+
+    fused = fuse_query_results(results, rows=[0], limit=2)
+
+    assert [m["complaint_id"] for m in fused["metadata"]] == ["a", "b"]
+    assert "row_ids" not in fused
+
+
+def test_result_key_falls_back_to_the_document_text():
+    assert result_key({"Complaint ID": 42}, "text") == "42"
+    assert result_key({"complaint_id": ""}, "x" * 200) == "x" * 150
+    assert result_key(None, "text") == "text"
+
+
+def test_buckets_are_fused_separately_in_date_order():
+    buckets = [("2023", "2023-01-01", "2023-12-31"), ("2024", "2024-01-01", "2024-12-31")]
+    bucket_results = {"2023": query_results([("a", 0.1), ("b", 0.2)]),
+                      "2024": query_results([("c", 0.3)])}
+    for results in bucket_results.values():
+        results["row_ids"] = [[7] * len(results["documents"][0])]
+
+    fused = fuse_bucket_results(buckets, bucket_results, rows=[0], limit=1)
+
+    assert [m["complaint_id"] for m in fused["metadata"]] == ["a", "c"]
+    assert fused["row_ids"] == [7, 7]
+    assert [b["count"] for b in fused["time_buckets"]] == [1, 1]
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.ingest import IngestManifest, ingest_delta, make_chunk_id
+
+
+class MemoryCollection:
+    """Just the Chroma calls delta ingest makes"""
+
+    name = "test"
+
+    def __init__(self):
+        self.chunks = {}
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        for chunk_id, doc, meta in zip(ids, documents, metadatas):
+            self.chunks[chunk_id] = (doc, meta)
+
+    def delete(self, ids=None):
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+    def count(self):
+        return len(self.chunks)
+
+    def get(self, include=None, limit=None, offset=0):
+        ids = list(self.chunks)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.chunks[i][1] for i in ids]}
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def chunk_meta(complaint_id, total=1, **fields):
+    return {"complaint_id": complaint_id, "total_chunks": total, **fields}
+
+
+def test_diff_flags_new_and_changed(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.parquet"))
+    manifest.update([chunk_meta("1", date_received="2023-01-01"),
+                     chunk_meta("2", date_received="2023-01-02")])
+
+    new, changed = manifest.diff(pd.Series(["1", "2", "3"]),
+                                 pd.Series(["2023-01-01", "2023-02-02", "2023-01-03"]))
+
+    assert new.tolist() == [False, False, True]
+    assert changed.tolist() == [False, True, False]
+
+
+def test_diff_keeps_undated_complaints_unchanged(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.parquet"))
+    manifest.update([chunk_meta("1")])  # no date_received: stored as ''
+    manifest.save()
+
+    reopened = IngestManifest(manifest.path)
+    new, changed = reopened.diff(pd.Series(["1"]), pd.Series([np.nan], dtype=object))
+
+    assert not new.any()
+    assert not changed.any()
+
+
+def test_chunk_ids_follow_latest_update(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.parquet"))
+    manifest.update([chunk_meta("1", total=3)])
+    manifest.update([chunk_meta("1", total=2)])
+
+    assert manifest.chunk_ids(["1", "unknown"]) == [make_chunk_id("1", 0), make_chunk_id("1", 1)]
+
+
+def test_delta_rewrites_every_chunk_of_a_changed_prechunked_complaint(tmp_path):
+    def write_drop(name, date):
+        path = tmp_path / name
+        pd.DataFrame({
+            "complaint_id": ["1", "1", "1", "2"],
+            "chunk_text": ["a", "b", "c", "d"],
+            "chunk_index": [0, 1, 2, 0],
+            "total_chunks": [3, 3, 3, 1],
+            "date_received": [date, date, date, "2023-01-05"],
+        }).to_parquet(path)
+        return str(path)
+
+    collection, embedder = MemoryCollection(), CountingEmbedder()
+    run = dict(collection=collection, vector_store_dir=str(tmp_path), embedder=embedder,
+               read_rows=2, verbose=False)
+
+    first = ingest_delta(write_drop("first.parquet", "2023-01-01"), **run)
+    assert (first["documents"], first["new"]) == (2, 2)
+    assert sorted(collection.chunks) == ["1_0", "1_1", "1_2", "2_0"]
+
+    embedder.encoded.clear()
+    second = ingest_delta(write_drop("second.parquet", "2023-03-01"), **run)
+    assert (second["changed"], second["unchanged"], second["deleted_chunks"]) == (1, 1, 3)
+    assert sorted(collection.chunks) == ["1_0", "1_1", "1_2", "2_0"]
+    assert sorted(embedder.encoded) == ["a", "b", "c"]
+
+    embedder.encoded.clear()
+    third = ingest_delta(write_drop("third.parquet", "2023-03-01"), **run)
+    assert third["unchanged"] == 2 and embedder.encoded == []
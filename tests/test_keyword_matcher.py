@@ -0,0 +1,35 @@
+from src.keyword_matcher import KeywordAutomaton, normalize
+
+TABLES = [
+    ("product", {"credit card": ["credit card", "visa"], "money transfer": ["money transfers", "wire"],
+                 "savings": ["savings account"]}),
+    ("intent", {"trend": ["trend", "over time"], "cause": ["cause", "why"]}),
+]
+
+
+def test_matches_whole_words_with_short_inflections():
+    automaton = KeywordAutomaton(TABLES)
+
+    assert automaton.classify("Why are Credit-Cards trending?") == {
+        "product": ["credit card"], "intent": ["trend", "cause"]}
+    assert automaton.classify("a money transfer, then wires") == {
+        "product": ["money transfer"], "intent": []}
+    assert automaton.classify("Wireless televisa because") == {"product": [], "intent": []}
+
+
+def test_names_are_reported_in_table_order_not_text_order():
+    automaton = KeywordAutomaton(TABLES)
+
+    assert automaton.classify("savings account over time vs visa")["product"] == ["credit card", "savings"]
+
+
+def test_overlapping_keywords_all_match_with_first_offsets():
+    automaton = KeywordAutomaton([("t", {"long": ["card fees"], "short": ["fees"], "other": ["card"]})])
+
+    found = automaton.scan("card fees, card fees")
+
+    assert found == {("t", "other"): 0, ("t", "long"): 0, ("t", "short"): 5}
+
+
+def test_normalize_pads_and_collapses_separators():
+    assert normalize("  Late__fee!!  charged ") == " late fee charged "
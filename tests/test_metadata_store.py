@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.metadata_store import MetadataStore, MetadataWriter, canonical_where, normalize_record
+
+RECORDS = [
+    {"id": "0", "Complaint ID": 11, "Product": "Credit card or prepaid card", "State": "CA",
+     "chunk_index": 0, "document": "first"},
+    {"chunk_id": "1", "complaint_id": "12", "product_category": "Mortgage", "state": "",
+     "Date received": "2023-01-05", "chunk_text": "second"},
+]
+
+
+def test_alias_spellings_collapse_into_the_schema():
+    assert normalize_record(RECORDS[0]) == {"chunk_id": "0", "complaint_id": "11", "product": "Credit card",
+                                            "state": "CA", "chunk_index": 0, "chunk_text": "first"}
+    assert canonical_where({"$or": [{"Product": "credit card"}, {"State": "CA"}]}) == \
+        {"$or": [{"product": "Credit card"}, {"state": "CA"}]}
+
+
+def test_written_store_opens_with_the_same_rows(tmp_path):
+    path = str(tmp_path / "metadata.arrow")
+    MetadataStore.from_records(RECORDS).write(path)
+
+    store = MetadataStore.open(path)
+
+    assert len(store) == 2
+    assert store.rows([1]) == [{"chunk_id": "1", "complaint_id": "12", "product": "Mortgage",
+                                "date_received": "2023-01-05", "chunk_text": "second"}]
+    assert store.lookup([0, 1], fields=("product", "state", "date_received")) == {
+        "product": ["Credit card", "Mortgage"], "state": ["CA", "Unknown"],
+        "date_received": ["Unknown", "2023-01-05"]}
+    np.testing.assert_array_equal(store.codes("state"), [0, -1])
+
+
+def test_writer_pages_add_category_values_first_seen_later(tmp_path):
+    path = str(tmp_path / "metadata.arrow")
+    with MetadataWriter(path) as writer:
+        writer.write([{"chunk_id": "0", "product": "Mortgage"}])  # no company, state or issue yet
+        writer.write([{"chunk_id": "1", "product": "Credit card", "company": "Acme", "state": "NY"}])
+        writer.write([{"chunk_id": "2", "product": "Mortgage", "company": "Beta"}])
+
+    store = MetadataStore.open(path)
+
+    assert store.lookup([0, 1, 2], fields=("product", "company", "state")) == {
+        "product": ["Mortgage", "Credit card", "Mortgage"],
+        "company": ["Unknown", "Acme", "Beta"], "state": ["Unknown", "NY", "Unknown"]}
+    assert writer.rows == 3
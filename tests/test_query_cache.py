@@ -0,0 +1,106 @@
+from src import query_cache
+from src.query_cache import (
+    QueryResultCache, SemanticAnswerCache, bump_collection_version, collection_version
+)
+
+
+class FakeCollection:
+    name = "complaints"
+
+    def __init__(self, count):
+        self._count = count
+
+    def count(self):
+        return self._count
+
+
+def test_keys_ignore_case_and_spacing():
+    cache = QueryResultCache(max_entries=4)
+    cache.put(cache.make_key("Late  Fees?", None, 5, "v1"), ["hit"])
+
+    assert cache.get(cache.make_key("late fees?", "", 5, "v1")) == ["hit"]
+    assert cache.get(cache.make_key("late fees?", None, 10, "v1")) is None
+    assert cache.report()["hit_rate"] == 50.0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryResultCache(max_entries=2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("a",))
+    cache.put(("c",), 3)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1 and cache.stats["evictions"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryResultCache(ttl_seconds=10)
+    cache.put(("a",), 1)
+
+    now[0] += 11
+    assert cache.get(("a",)) is None
+    assert cache.stats["expired"] == 1 and len(cache) == 0
+
+
+def test_get_or_compute_runs_compute_once():
+    cache, calls = QueryResultCache(), []
+
+    for _ in range(3):
+        cache.get_or_compute("q", None, 5, "v1", lambda: calls.append(1) or "result")
+
+    assert calls == [1]
+
+
+def test_ingest_bump_changes_the_version_and_drops_cached_results(tmp_path):
+    collection = FakeCollection(3)
+    before = collection_version(collection, str(tmp_path))
+    shared = query_cache.get_query_cache()
+    shared.put(shared.make_key("q", None, 5, before), "stale")
+    shared.put(shared.make_key("q", None, 5, "other:3:0"), "kept")
+
+    bump_collection_version(str(tmp_path), "complaints")
+
+    assert collection_version(collection, str(tmp_path)) == "complaints:3:1" != before
+    assert shared.get(shared.make_key("q", None, 5, before)) is None
+    assert shared.get(shared.make_key("q", None, 5, "other:3:0")) == "kept"
+    shared.invalidate()
+
+
+def test_paraphrase_close_enough_is_served_within_its_scope():
+    cache = SemanticAnswerCache(threshold=0.95)
+    scope = cache.make_scope("credit card", "complaints:3:0", False, False)
+    cache.put([1.0, 0.0, 0.0], scope, "answer", question="Why late fees?")
+
+    value, match = cache.get([0.99, 0.05, 0.0], scope)
+    assert value == "answer" and match["cached_question"] == "Why late fees?"
+    assert cache.get([0.0, 1.0, 0.0], scope) is None
+    assert cache.get([1.0, 0.0, 0.0], cache.make_scope("credit card", "complaints:3:0", True, False)) is None
+
+
+def test_answers_expire_and_invalidate_by_collection(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticAnswerCache(ttl_seconds=10, threshold=0.9)
+    old, other = cache.make_scope(None, "complaints:3:0"), cache.make_scope(None, "other:1:0")
+    cache.put([1.0, 0.0], old, "a")
+    cache.put([1.0, 0.0], other, "b")
+
+    cache.invalidate("complaints")
+    assert cache.get([1.0, 0.0], old) is None and cache.get([1.0, 0.0], other)[0] == "b"
+
+    now[0] += 11
+    assert cache.get([1.0, 0.0], other) is None
+    assert cache.report()["expired"] == 1
+
+
+def test_oldest_answer_is_evicted():
+    cache = SemanticAnswerCache(max_entries=2, threshold=0.99)
+    scope = cache.make_scope(None, "complaints:3:0")
+    for vector, value in (([1.0, 0.0], "x"), ([0.0, 1.0], "y"), ([-1.0, 0.0], "z")):
+        cache.put(vector, scope, value)
+
+    assert cache.get([1.0, 0.0], scope) is None
+    assert cache.get([0.0, 1.0], scope)[0] == "y" and len(cache) == 2
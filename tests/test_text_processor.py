@@ -0,0 +1,61 @@
+import random
+import re
+
+import pytest
+
+from src.text_processor import clean_query, clean_texts
+
+# clean_text_batch before the Arrow engine: these rules in order, each match -> ' '
+REFERENCE_RULES = [re.compile(pattern) for pattern in (
+    r'\S+@\S+',                   # Emails
+    r'http\S+|www\.\S+',          # URLs
+    r'\d{3}-\d{2}-\d{4}',         # SSN
+    r'\b\d{10,}\b',               # Long numbers
+    r'xxxx',                      # CFPB redaction placeholder
+    r'[^\w\s]',                   # Special chars
+    r'\s+',
+)]
+
+EDGE_CASES = [
+    'Email me at John.Doe@bank.com, or see http://x.y/z?q=1 and www.foo.com.',
+    'SSN 123-45-6789 and acct 12345678901234 on XX/XX/XXXX',
+    # An SSN or email removal gives the digits after it a word boundary
+    '123-45-67891234567890', 'a@b 1234567890 c', 'xxxx1234567890',
+    '$1234567890 1234567890 12345678901', '1234567890a 0987654321_',
+    'Café naïve “quoted” — don\'t İstanbul ß ΟΔΥΣΣΕΑΣ',
+    'ref 1234567890 end', 'wide　space line\x1cbreak',
+    '١٢٣٤٥٦٧٨٩٠ arabic-indic',
+    'a b@c d', '١٢٣-٤٥-٦٧٨٩ ssn', 'tab\tand\x0bvertical',
+    '', '   ',
+]
+
+ATOMS = ['I', 'was', 'charged', '$35.00', 'XX/XX/XXXX', 'Bank', 'a.b@c.com,', 'http://x.y/z?q=1',
+         'www.foo.com.', '123-45-6789', '12345678901234', '(xxxx)', 'café', '“q”', '—', "don't",
+         '\n', '\t', '1234567890.', 'x@', '@y', '_u_', 'Ünï', 'ß', 'İ', 'a-b', '123-45-67890',
+         'xxxx', '1234567890', ' ', '　', '\x0b', '\x1c', '٣' * 10, '́', 'ﬁ', 'Σ', 'ΣΑΣ']
+
+
+def reference_clean(text) -> str:
+    text = '' if text is None else str(text).lower()
+    for rule in REFERENCE_RULES:
+        text = rule.sub(' ', text)
+    return text.strip()
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_matches_sequential_re_rules(text):
+    assert clean_query(text) == reference_clean(text)
+
+
+def test_matches_sequential_re_rules_on_random_texts():
+    rng = random.Random(0)
+    texts = [rng.choice(['', ' ']).join(rng.choice(ATOMS) for _ in range(rng.randint(0, 25)))
+             for _ in range(5000)]
+
+    cleaned = clean_texts(texts, workers=2, chunk_rows=1000).to_pylist()
+
+    assert [c for c, t in zip(cleaned, texts) if c != reference_clean(t)] == []
+
+
+def test_nulls_become_empty():
+    assert clean_texts([None, 'Hello, World!']).to_pylist() == ['', 'hello world']
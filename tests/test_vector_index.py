@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.vector_index import ChromaIndex, FaissIndex, VectorIndex, build_faiss_index, matches_where
+
+
+class FakeCollection:
+    name = "complaints"
+
+    def count(self):
+        return 3
+
+
+class EmbeddedCollection:
+    """Chroma's count()/get(limit, offset) over random unit vectors; products start on row 3"""
+
+    def __init__(self, n, dim, seed=0):
+        self.embeddings = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+        self.embeddings /= np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+        self.metadatas = [{"complaint_id": str(i // 2)} if i < 3 else
+                          {"complaint_id": str(i // 2), "product": ["Mortgage", "Credit card"][i % 2]}
+                          for i in range(n)]
+
+    def count(self):
+        return len(self.embeddings)
+
+    def get(self, include=None, limit=None, offset=0):
+        rows = range(offset, min(offset + limit, self.count()))
+        return {"ids": [f"c{i}" for i in rows], "documents": [f"chunk {i}" for i in rows],
+                "metadatas": [self.metadatas[i] for i in rows],
+                "embeddings": self.embeddings[offset:offset + limit]}
+
+
+def faiss_paths(tmp_path):
+    return {"index_path": str(tmp_path / "index.faiss"), "metadata_path": str(tmp_path / "meta.arrow"),
+            "vectors_path": str(tmp_path / "vectors.npy"), "complaints_path": str(tmp_path / "complaints.npy")}
+
+
+def test_backends_must_implement_the_whole_interface():
+    class CountOnly(VectorIndex):
+        def count(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        VectorIndex()
+    with pytest.raises(TypeError):
+        CountOnly()
+    assert ChromaIndex(FakeCollection()).count() == 3
+
+
+def test_matches_where_supports_the_operators_the_rag_classes_use():
+    meta = {"product_category": "Credit card", "state": "CA"}
+
+    assert matches_where(meta, {"$or": [{"product_category": {"$in": ["Credit card"]}},
+                                        {"product": {"$in": ["Credit card"]}}]})
+    assert matches_where(meta, {"$and": [{"state": "CA"}, {"product_category": {"$ne": "Savings"}}]})
+    assert not matches_where(meta, {"state": {"$nin": ["CA", "NY"]}})
+    assert not matches_where(None, {"state": "CA"})
+
+
+def test_flat_export_searches_the_mapped_matrix_exactly(tmp_path):
+    pytest.importorskip("faiss")
+    collection = EmbeddedCollection(40, 8)
+    build_faiss_index(collection, mode="flat", page_size=3, verbose=False, **faiss_paths(tmp_path))
+
+    index = FaissIndex.load(**faiss_paths(tmp_path))
+    query = collection.embeddings[:2] + 0.1
+    results = index.query(query.tolist(), n_results=5)
+    filtered = index.query(query.tolist(), n_results=5, where={"product_category": "Credit card"})
+
+    assert index.index is None and isinstance(index.vectors, np.memmap)
+    unit = query / np.linalg.norm(query, axis=1, keepdims=True)
+    assert results["row_ids"] == np.argsort(-(unit @ collection.embeddings.T), axis=1)[:, :5].tolist()
+    assert all(m["product"] == "Credit card" for metas in filtered["metadatas"] for m in metas)
+    assert [len(ids) for ids in filtered["ids"]] == [5, 5]
+
+
+def test_ivfpq_export_rescores_its_shortlist_from_the_matrix(tmp_path):
+    pytest.importorskip("faiss")
+    collection = EmbeddedCollection(800, 16)
+    build_faiss_index(collection, mode="ivfpq", nlist=8, pq_m=4, page_size=100, verbose=False,
+                      **faiss_paths(tmp_path))
+
+    index = FaissIndex.load(**faiss_paths(tmp_path), nprobe=8, rerank_candidates=100)
+    results = index.query(collection.embeddings[:3].tolist(), n_results=5)
+
+    assert index.compressed and index.nprobe == 8
+    assert [rows[0] for rows in results["row_ids"]] == [0, 1, 2]
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert index.measure_recall(collection.embeddings[100:120].tolist(), k=5) >= 0.9